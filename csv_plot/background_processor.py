@@ -1,13 +1,50 @@
+import math
+import time
 from datetime import datetime
-from multiprocessing import Process
+from multiprocessing import Process, Value
 from multiprocessing.connection import Connection
 from pathlib import Path
-from typing import Any, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
 
 from .csv import selector
+from .csv.m4 import m4
+from .csv.selector import QueryCancelledError, Selection, _Selector
+from .csv.sparse_index import to_floats
+from .csv.tile_cache import BUDGET, TileCache
+from .shared_memory_ring import Header, Release, SharedMemoryRing
 
 MARGIN = 0.2
 
+# (visible start, visible stop, resolution), see `BackgroundProcessor`
+Request = Tuple[Optional[float], Optional[float], int]
+
+
+class Result(NamedTuple):
+    """A result sent by `BackgroundProcessor`.
+
+    generation: The number of the request answered. Requests are numbered in the
+                order they are processed
+    exact     : `False` if lines come from a coarser level than the one matching the
+                resolution. In this case, an exact result of the same generation
+                follows, unless it is abandoned (see `BackgroundProcessor`)
+    data      : Either `(xs, name_to_y)`, or a `Header` if results are written into a
+                `SharedMemoryRing`
+    """
+
+    generation: int
+    exact: bool
+    data: Union[Header, Tuple[np.ndarray, Dict[str, Selection.Y]]]
+
+
+# While idle, lines up to `PREFETCH_FACTOR` times the last pan are prefetched ahead
+PREFETCH_FACTOR = 4
+
+# While the file is still being processed (or followed), new levels (or new lines) are
+# looked for every `REFRESH_PERIOD` seconds
+REFRESH_PERIOD = 0.5
+
 
 class BackgroundProcessor(Process):
     """Offers a way to compute - in a background process - all data needed by pyqtgraph
@@ -19,6 +56,9 @@ class BackgroundProcessor(Process):
     If several items a present in the pipe, then `BackgroundSelector` will process only
     the last one.
 
+    Lines are reduced to the ones needed to draw exactly the same curves on the
+    requested resolution (number of pixels), with the M4 aggregation (see `m4`).
+
     Send `None` to the pipe to stop `BackgroundSelector`
 
     Usage:
@@ -32,23 +72,61 @@ class BackgroundProcessor(Process):
     background_processor.start()
 
     connection.send((None, None, 100))
-    connection.recv() == (
-        [1, 5, 9, 13, 17],
-        {
-            "b": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
-            "d": Selected.Y(mins=[4, 8, 12, 16, 20], maxs=[4, 8, 12, 16, 20]),
-        }
+    connection.recv() == Result(
+        generation=1,
+        exact=True,
+        data=(
+            array([1., 5., 9., 13., 17.]),
+            {
+                "b": Selection.Y(mins=array([2., 6., 10., 14., 18.]), maxs=...),
+                "d": Selection.Y(mins=array([4., 8., 12., 16., 20.]), maxs=...),
+            }
+        ),
     )
 
-    connection.send(4.5, 13.5, 100) == (
-        [5, 9, 13],
-        {
-            "b": Selected.Y(mins=[6, 10, 14], maxs=[6, 10, 14]),
-            "d": Selected.Y(mins=[8, 12, 16], maxs=[8, 12, 16]),
-        }
+    connection.send(4.5, 13.5, 100) == Result(
+        generation=2,
+        exact=True,
+        data=(
+            array([5., 9., 13.]),
+            {
+                "b": Selection.Y(mins=array([6., 10., 14.]), maxs=...),
+                "d": Selection.Y(mins=array([8., 12., 16.]), maxs=...),
+            }
+        ),
     )
 
+    Values of `x` are always sent as floats (timestamps for datetimes).
+
     connection.send(None)
+
+    If a `SharedMemoryRing` is given, results are written into it and only a `Header`
+    is sent through the pipe (see `SharedMemoryRing`). Results which can not be written
+    into the ring are still sent through the pipe.
+
+    Lines read from files are kept in a `TileCache` of `cache_budget` bytes, so
+    panning back and forth is mostly served from memory. Numbers of tiles read from the
+    cache and from files are available through `cache_hits` and `cache_misses`.
+
+    While waiting for the next request, lines likely to be requested next (around the
+    visible range, and on finer and coarser levels) are prefetched into this cache.
+
+    Queries are executed chunk by chunk. If a new request is received while a query
+    is running, the query is abandoned, so the latest request is always served first.
+
+    The file could still be processed while requests are served (see
+    `pad_and_sample`). Only ready levels are then read, and the last request is
+    served again each time new levels are ready.
+
+    If `follow` is set, lines could also be appended to levels while requests are
+    served (see `follow`). Levels are then kept refreshed (only new chunk files are
+    opened, see `LevelFiles`), and the last request is served again each time lines
+    have been appended.
+
+    If lines of the level matching the resolution are not all in cache, a first
+    (non exact) result is sent from a coarser level which is fast to read, then the
+    exact result is sent. If `latency_budget` is set and reading the exact level takes
+    longer, the exact result is abandoned and the coarse one is kept.
     """
 
     def __init__(
@@ -57,82 +135,332 @@ class BackgroundProcessor(Process):
         x_and_type: Tuple[str, type],
         ys: List[str],
         connection: Connection,
+        ring: Optional[SharedMemoryRing] = None,
+        cache_budget: int = BUDGET,
+        latency_budget: Optional[float] = None,
+        follow: bool = False,
     ) -> None:
         """Initializer
 
-        dir_path  : Directory where all the files (sampled and non sampled) are located.
-                    Non sampled path name's HAS to be `0.csv`
+        dir_path    : Directory where all the files (sampled and non sampled) are
+                      located. Non sampled path name's HAS to be `0.csv`
 
-        x_and_type: Name and the type of X value
-        ys        : Name of Ys types
-        connection: One side of the pipe
+        x_and_type  : Name and the type of X value
+        ys          : Name of Ys types
+        connection  : One side of the pipe
+        ring        : If set, the shared memory ring results are written into
+        cache_budget  : The maximum size, in bytes, of lines kept in cache
+        latency_budget: If set, the maximum time, in seconds, spent to read the exact
+                        level once a coarse result has been sent
+        follow        : If set, levels are kept refreshed even once all are ready
         """
         super().__init__()
         self.__dir_path = dir_path
         self.__x_and_type = x_and_type
         self.__ys = ys
         self.__connection = connection
+        self.__ring = ring
+        self.__cache_budget = cache_budget
+        self.__latency_budget = latency_budget
+        self.__follow = follow
+
+        # Items received while checking if the running query has to be cancelled
+        self.__received: List[Any] = []
+
+        self.__cache_hits = Value("q", 0)
+        self.__cache_misses = Value("q", 0)
+
+    @property
+    def cache_hits(self) -> int:
+        """The number of tiles read from the cache."""
+        return self.__cache_hits.value
+
+    @property
+    def cache_misses(self) -> int:
+        """The number of tiles read from files."""
+        return self.__cache_misses.value
+
+    def __recv_last(
+        self,
+        prefetching: Iterator[None],
+        pending: Optional[Request] = None,
+        sel: Optional[_Selector] = None,
+        last: Optional[Request] = None,
+    ) -> Optional[Request]:
+        """Wait for a request, then return the last request present in the pipe, or
+        `None` if a `None` is present in the pipe.
+
+        While waiting, `prefetching` is run step by step, until something is received.
+        `Release` items are handled on the fly.
+
+        If `pending` is set, it is returned if the pipe contains no other request.
+
+        While the file is still being processed (or if the file is followed), `sel` is
+        refreshed every `REFRESH_PERIOD` seconds. If new levels are ready (or if lines
+        have been appended), `last` is returned, so the last request is served again
+        with them.
+        """
+        request, has_request = pending, pending is not None
+
+        while not has_request or self.__poll():
+            if not has_request:
+                for _ in prefetching:
+                    if self.__poll():
+                        break
+
+                while (
+                    sel is not None
+                    and (self.__follow or not sel.is_complete)
+                    and not self.__poll(REFRESH_PERIOD)
+                ):
+                    if sel.refresh() and last is not None:
+                        return last
+
+            item = self.__recv()
+
+            if isinstance(item, Release):
+                self.__release(item)
+                continue
+
+            if item is None:
+                return None
+
+            request, has_request = item, True
+
+        return request
+
+    def __is_cancelled(self) -> bool:
+        """Return `True` if a request (or `None`) has been received since the running
+        query started. `Release` items are handled on the fly."""
+        while self.__connection.poll():
+            item = self.__connection.recv()
+
+            if isinstance(item, Release):
+                self.__release(item)
+            else:
+                self.__received.append(item)
+
+        return self.__received != []
+
+    def __poll(self, timeout: float = 0) -> bool:
+        return self.__received != [] or self.__connection.poll(timeout)
+
+    def __recv(self) -> Any:
+        return (
+            self.__received.pop(0)
+            if self.__received != []
+            else self.__connection.recv()
+        )
+
+    def __release(self, release: Release) -> None:
+        assert self.__ring is not None, "`Release` received without ring"
+        self.__ring.release(release.index)
+
+    def __prefetching(
+        self,
+        sel: _Selector,
+        previous_visible: Optional[Tuple[float, float]],
+        visible: Tuple[float, float],
+        resolution: int,
+    ) -> Iterator[None]:
+        """Prefetch lines which are likely to be requested next, yielding after each
+        tile read from disk.
+
+        Direction and velocity of the move between `previous_visible` and `visible`
+        decide what is prefetched first:
+        - Lines just next to the visible range in the direction of the pan, at the
+          current level. The faster the pan, the further.
+        - Lines of the level used once zoomed in (finer) or zoomed out (coarser)
+        - Lines just next to the visible range in the other direction, at the
+          current level
+        """
+        visible_start, visible_stop = visible
+        visible_range = visible_stop - visible_start
+        start, stop = self.__with_margin(visible_start, visible_stop)
+
+        if not visible_range > 0:
+            return
+
+        if previous_visible is not None and previous_visible[1] > previous_visible[0]:
+            previous_start, previous_stop = previous_visible
+            shift = (visible_start + visible_stop - previous_start - previous_stop) / 2
+            zoom = visible_range / (previous_stop - previous_start)
+        else:
+            shift, zoom = 0.0, 1.0
+
+        distance = min(
+            max(abs(shift) * PREFETCH_FACTOR, visible_range / 2), 2 * visible_range
+        )
+
+        after = (stop, stop + distance)
+        before = (start - distance, start)
+        ahead, behind = (before, after) if shift < 0 else (after, before)
+
+        level = sel.level_of(self.__to_x(start), self.__to_x(stop), resolution)
+
+        # When zooming out, the next range is expected to grow the same way
+        extension = (stop - start) * (max(zoom, 1) - 1) / 2
+        zoom_range = (start - extension, stop + extension)
+
+        if zoom < 1:
+            zoom_levels = [level - 1]
+        elif zoom > 1:
+            zoom_levels = [level + 1]
+        else:
+            zoom_levels = [level - 1, level + 1]
+
+        tasks = (
+            [(level, ahead)]
+            + [
+                (zoom_level, zoom_range)
+                for zoom_level in zoom_levels
+                if 0 <= zoom_level < sel.nb_levels
+            ]
+            + [(level, behind)]
+        )
+
+        for task_level, (task_start, task_stop) in tasks:
+            yield from sel.prefetch(
+                task_level, self.__to_x(task_start), self.__to_x(task_stop)
+            )
+
+    def __to_x(self, value: float) -> Any:
+        """Convert a float sent by the caller into a value of `x`."""
+        _, x_type = self.__x_and_type
+        return datetime.fromtimestamp(value) if x_type is not float else value
+
+    @staticmethod
+    def __with_margin(
+        visible_start_float: float, visible_stop_float: float
+    ) -> Tuple[float, float]:
+        """Return the visible range, extended by `MARGIN` on both sides."""
+        visible_range_with_margin = MARGIN * (visible_stop_float - visible_start_float)
+
+        return (
+            visible_start_float - visible_range_with_margin,
+            visible_stop_float + visible_range_with_margin,
+        )
+
+    def __send(
+        self,
+        generation: int,
+        exact: bool,
+        selected: Selection,
+        bucket_range: Optional[Tuple[float, float]],
+        nb_buckets: int,
+    ) -> None:
+        """Reduce `selected` (see `m4`), then send it as a `Result`.
+
+        bucket_range: The range covered by buckets. If `None`, the range of `selected`
+        """
+        xs = to_floats(selected.xs)
+
+        start_float, stop_float = (
+            bucket_range
+            if bucket_range is not None
+            else ((xs[0], xs[-1]) if len(xs) > 0 else (0, 0))
+        )
+
+        xs, name_to_y = m4(xs, selected.name_to_y, start_float, stop_float, nb_buckets)
+
+        header = self.__ring.write(xs, name_to_y) if self.__ring is not None else None
+        data = header if header is not None else (xs, name_to_y)
+
+        self.__connection.send(Result(generation, exact, data))
 
     def run(self) -> None:
-        with selector(self.__dir_path, self.__x_and_type, self.__ys) as sel:
-            _, x_type = self.__x_and_type
+        cache = TileCache(self.__cache_budget)
+
+        with selector(self.__dir_path, self.__x_and_type, self.__ys, cache) as sel:
+            prefetching: Iterator[None] = iter(())
+            previous_visible: Optional[Tuple[float, float]] = None
+            pending: Optional[Request] = None
+            last: Optional[Request] = None
+            generation = 0
 
             while True:
-                item: Optional[
-                    Tuple[Optional[float], Optional[float], int]
-                ] = self.__connection.recv()
+                item = self.__recv_last(prefetching, pending, sel, last)
+                pending = None
 
                 if item is None:
                     self.__connection.send(None)
                     return
 
-                while self.__connection.poll():
-                    item = self.__connection.recv()
-
-                    if item is None:
-                        self.__connection.send(None)
-                        return
+                last = item
 
                 visible_start_float, visible_stop_float, resolution = item
 
-                assert not (visible_start_float is None) != (
-                    visible_stop_float is None
-                ), (
-                    "`visible_start_float` and `visible_stop_float` must be both set "
-                    "to None or set to a value which is not None"
-                )
-
                 if visible_start_float is None and visible_stop_float is None:
-                    selected = sel[::resolution]
-                elif visible_start_float is not None and visible_stop_float is not None:
-                    visible_range = visible_stop_float - visible_start_float
-                    visible_range_with_margin = MARGIN * visible_range
-
-                    start_float = visible_start_float - visible_range_with_margin
-                    stop_float = visible_stop_float + visible_range_with_margin
+                    start, stop = None, None
 
-                    start, stop = (
-                        (
-                            datetime.fromtimestamp(start_float),
-                            datetime.fromtimestamp(stop_float),
-                        )
-                        if x_type is not float
-                        else (start_float, stop_float)
+                    # One bucket per pixel, the whole file being visible
+                    bucket_range = None
+                    nb_buckets = resolution
+                elif visible_start_float is not None and visible_stop_float is not None:
+                    bucket_range = self.__with_margin(
+                        visible_start_float, visible_stop_float
                     )
 
-                    selected = sel[start:stop:resolution]  # type: ignore
+                    start_float, stop_float = bucket_range
+                    start, stop = self.__to_x(start_float), self.__to_x(stop_float)
+
+                    # One bucket per pixel, margins included
+                    nb_buckets = math.ceil(resolution * (1 + 2 * MARGIN))
                 else:
                     raise ValueError(
                         "`visible_start_float` and `visible_stop_float` must be both "
                         "set to None or set to a value which is not None"
                     )
 
-                first_x, *_ = selected.xs
+                generation += 1
+                level = sel.level_of(start, stop, resolution)
+                coarse_level = sel.coarse_level_of(start, stop, resolution, level)
+
+                try:
+                    # Any request received while the query runs supersedes it
+                    if coarse_level is not None:
+                        selected = sel.select(
+                            start, stop, resolution, self.__is_cancelled, coarse_level
+                        )
+
+                        self.__send(
+                            generation, False, selected, bucket_range, nb_buckets
+                        )
+
+                    # The exact level is abandoned if it is too long to read, but only
+                    # if a coarse result has been sent
+                    deadline = (
+                        time.monotonic() + self.__latency_budget
+                        if coarse_level is not None
+                        and self.__latency_budget is not None
+                        else math.inf
+                    )
+
+                    selected = sel.select(
+                        start,
+                        stop,
+                        resolution,
+                        lambda: self.__is_cancelled() or time.monotonic() > deadline,
+                        level,
+                    )
 
-                xs = (
-                    [x.timestamp() for x in cast(List[datetime], selected.xs)]
-                    if isinstance(first_x, datetime)
-                    else cast(List[float], selected.xs)
-                )
+                    self.__send(generation, True, selected, bucket_range, nb_buckets)
+                except QueryCancelledError:
+                    if self.__received != []:
+                        pending = item
+                        continue
+
+                if visible_start_float is not None and visible_stop_float is not None:
+                    visible = visible_start_float, visible_stop_float
+
+                    prefetching = self.__prefetching(
+                        sel, previous_visible, visible, resolution
+                    )
+
+                    previous_visible = visible
+                else:
+                    prefetching = iter(())
+                    previous_visible = None
 
-                self.__connection.send((xs, selected.name_to_y))
+                self.__cache_hits.value = cache.hits
+                self.__cache_misses.value = cache.misses
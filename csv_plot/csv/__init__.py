@@ -1,2 +1,12 @@
-from .pad_and_sample import pad_and_sample, pseudo_hash
+from .pad_and_sample import (
+    SAMPLING_PERIOD,
+    HashMode,
+    Storage,
+    find_processed_prefix,
+    follow,
+    get_dir_path,
+    get_string,
+    pad_and_sample,
+    pseudo_hash,
+)
 from .selector import selector
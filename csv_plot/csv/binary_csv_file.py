@@ -0,0 +1,440 @@
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, cast
+
+import numpy as np
+
+from .gettable import Gettable
+from .padded_csv_file import ColumnNotFoundError, cast_column
+from .padded_text_file import PaddedTextFile
+from .sorted_padded_csv_file import _SortedPaddedCSVFile
+
+BATCH_SIZE = 65536
+
+# Suffix of files written by `to_columns`, following the convention
+# <int>.<column>.column.npy
+COLUMN_SUFFIX = ".column.npy"
+
+
+class ColumnArrays:
+    """The columns of a chunk, each stored in its own array (see `to_columns`).
+
+    It behaves like a structured array whose fields are these columns, so it could be
+    given to `_BinaryCSVFile`: `column_arrays[<column>]` is the array of a column, and
+    `column_arrays[start:stop]` is a view on lines between `start` and `stop`.
+
+    Only arrays of requested columns have to be loaded.
+    """
+
+    def __init__(self, column_to_array: Dict[str, np.ndarray]) -> None:
+        """Constructor.
+
+        column_to_array: For each column, its (1-D) array. All arrays have the same
+                         length.
+        """
+        self.__column_to_array = column_to_array
+
+        self.dtype = np.dtype(
+            [(column, array.dtype) for column, array in column_to_array.items()]
+        )
+
+    def __len__(self) -> int:
+        return min((len(array) for array in self.__column_to_array.values()), default=0)
+
+    def __getitem__(
+        self, column_or_slice: Union[str, slice]
+    ) -> Union[np.ndarray, "ColumnArrays"]:
+        if isinstance(column_or_slice, str):
+            return self.__column_to_array[column_or_slice]
+
+        return ColumnArrays(
+            {
+                column: array[column_or_slice]
+                for column, array in self.__column_to_array.items()
+            }
+        )
+
+
+class _BinaryCSVFile(Gettable):
+    """Represent a binary CSV file, where lines are reachable with O(1) complexity.
+
+    A binary CSV file is a list of `.npy` files (one per chunk), each containing a
+    structured array where every CSV column is a typed field.
+    It behaves exactly like `_PaddedCSVFile`, but nothing has to be parsed when
+    values are read: getting a slice of lines is a slice of a memory mapped array.
+
+    Usage:
+    binary_csv_file = _BinaryCSVFile(<arrays>, <column_and_type_tuples>)
+
+    Example: With the following file represented by <arrays>:
+    a,c,d,e
+    1,2,3,4
+    5,6,7,8
+    9,10,11,12
+    13,14,15,16
+    17,18,19,20
+
+    binary_csv_file = _BinaryCSVFile(<arrays>, [("e", int), ("c", int)])
+
+    # Get the number of lines
+    len(binary_csv_file) # = 5
+
+    # Get the third line of the file
+    binary_csv_file[2] # = [12, 10]
+
+    # Get all lines between the third line (included) and the last line (excluded)
+    binary_csv_file[2:-1] # = [[12, 10], [16, 14]]
+    """
+
+    def __init__(
+        self,
+        arrays: List[Union[np.ndarray, "ColumnArrays"]],
+        columns_and_types: List[Tuple[str, type]],
+        unwrap_if_one_column=False,
+    ) -> None:
+        """Constructor.
+
+        arrays: A list of structured arrays (one per chunk), sharing the same fields,
+                or of `ColumnArrays`
+        columns_and_types: A list of tuples where each tuple has:
+                           - The name of the column
+                           - The type of the column
+        unwrap_if_one_column: Unwrap if only one column unwrap result.
+                              Exemple: Instead of returning [[4], [5], [2]] return
+                                       [4, 5, 2]
+        """
+        if columns_and_types == []:
+            raise ValueError("`column_and_type` is an empty list")
+
+        columns, _ = zip(*columns_and_types)
+        first_array, *_ = arrays
+
+        if not set(columns) <= set(first_array.dtype.names):
+            raise ColumnNotFoundError(
+                "At least one column specified in `column_to_type` in not present in "
+                "the file"
+            )
+
+        self.__arrays = arrays
+        self.__columns_and_types = columns_and_types
+        self.__starts = [0] + list(accumulate(len(array) for array in arrays))
+        self.__len = self.__starts[-1]
+
+        _, *others = columns_and_types
+        self.__has_to_unwrap = unwrap_if_one_column and others == []
+
+    def __len__(self):
+        """Return the number of lines of the file."""
+        return self.__len
+
+    def __getitem__(
+        self, line_number_or_slice: Union[int, slice]
+    ) -> Union[Any, List, List[List]]:
+        """Get given values or a given slice of values.
+
+        line_number_or_slice: The line number or the slice where values will be
+                              retrieved
+        """
+
+        def handle_line_number(line_number: int) -> Union[Any, List]:
+            real_line_number = (
+                line_number if line_number >= 0 else self.__len + line_number
+            )
+
+            if not 0 <= real_line_number < self.__len:
+                raise IndexError("list index out of range")
+
+            columns = self.columns(real_line_number, real_line_number + 1)
+            items = [value for column in columns for value in column.tolist()]
+            return items[0] if self.__has_to_unwrap else items
+
+        def handle_slice(slice: slice) -> List[Union[Any, List]]:
+            columns = [
+                column.tolist() for column in self.columns(slice.start, slice.stop)
+            ]
+
+            if self.__has_to_unwrap:
+                column, *_ = columns
+                return column
+
+            return [list(row) for row in zip(*columns)]
+
+        if isinstance(line_number_or_slice, int):
+            return handle_line_number(line_number_or_slice)
+        elif isinstance(line_number_or_slice, slice):
+            return handle_slice(line_number_or_slice)
+
+    def get(
+        self, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> Iterator[Union[Any, List]]:
+        """Return an iterator on a given slice of lines.
+
+        start: The first line of slice (included)
+        stop : The last line of slice (excluded)
+        """
+        real_start, real_stop, _ = slice(start, stop).indices(self.__len)
+
+        for batch_start in range(real_start, real_stop, BATCH_SIZE):
+            batch_stop = min(batch_start + BATCH_SIZE, real_stop)
+            yield from self[batch_start:batch_stop]
+
+    def columns(
+        self,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        step: Optional[int] = None,
+    ) -> List[np.ndarray]:
+        """Return, for each requested column, an array containing the values of lines
+        between `start` (included) and `stop` (excluded).
+
+        start: The first line of slice (included)
+        stop : The last line of slice (excluded)
+        step : If set, only one line every `step` lines is returned
+        """
+        real_start, real_stop, real_step = slice(start, stop, step).indices(self.__len)
+        parts = self.__parts(real_start, real_stop)
+
+        if real_step != 1:
+            parts_starts = [0] + list(accumulate(len(part) for part in parts))
+
+            parts = [
+                part[-part_start % real_step :: real_step]
+                for part, part_start in zip(parts, parts_starts)
+            ]
+
+        return [
+            cast_column(np.concatenate([part[column] for part in parts]), type)
+            for column, type in self.__columns_and_types
+        ]
+
+    def __parts(self, start: int, stop: int) -> List[np.ndarray]:
+        """Return views on lines between `start` (included) and `stop` (excluded), one
+        view per chunk containing at least one of these lines."""
+        if start >= stop:
+            first_array, *_ = self.__arrays
+            return [first_array[0:0]]
+
+        first_block = bisect_right(self.__starts, start) - 1
+        last_block = bisect_right(self.__starts, stop - 1) - 1
+
+        return [
+            self.__arrays[block][
+                max(start - self.__starts[block], 0) : stop - self.__starts[block]
+            ]
+            for block in range(first_block, last_block + 1)
+        ]
+
+
+def is_castable_to_float(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def get_dtype_and_indexes(
+    padded_path: Path, x: str, all_numeric: bool
+) -> Tuple[np.dtype, List[int]]:
+    """Get the dtype of the binary version of the padded CSV file (or first chunk of
+    padded CSV file) pointed by `padded_path`, and the indexes of the CSV columns
+    corresponding to each field of this dtype.
+
+    The `x` column is stored as float64 if it is castable to float, else as a fixed
+    width bytes string.
+    Other columns are stored as float64. Columns which are not castable to float are
+    dropped, except if `all_numeric` is set.
+    """
+    with padded_path.open() as file_descriptor:
+        padded_text_file = PaddedTextFile(
+            file_descriptor, padded_path.stat().st_size, offset=0
+        )
+
+        headers = cast(str, padded_text_file[0]).split(",")
+        first_values = cast(str, padded_text_file[1]).split(",")
+
+    def get_field_type(header: str, value: str) -> Optional[str]:
+        if header == x:
+            return (
+                "<f8"
+                if is_castable_to_float(value)
+                else f"S{padded_text_file.line_size}"
+            )
+
+        return "<f8" if all_numeric or is_castable_to_float(value) else None
+
+    fields = [
+        (index, header, get_field_type(header, value))
+        for index, (header, value) in enumerate(zip(headers, first_values))
+    ]
+
+    dtype = np.dtype([(header, type) for _, header, type in fields if type is not None])
+
+    return dtype, [index for index, _, type in fields if type is not None]
+
+
+def read_records(
+    padded_text_file: PaddedTextFile,
+    dtype: np.dtype,
+    indexes: List[int],
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    """Return lines of `padded_text_file` between `start` (included) and `stop`
+    (excluded) as a structured array of type `dtype` (see `get_dtype_and_indexes`)."""
+    rows = [
+        tuple(values[index] for index in indexes)
+        for values in (line.split(",") for line in padded_text_file[start:stop])
+    ]
+
+    return np.array(rows, dtype=dtype)
+
+
+def to_binary(
+    padded_path: Path,
+    binary_path: Path,
+    dtype: np.dtype,
+    indexes: List[int],
+    has_header: bool,
+) -> None:
+    """Convert the padded CSV file pointed by `padded_path` into a `.npy` file
+    containing a structured array of type `dtype`, then remove `padded_path`.
+
+    padded_path: The path of the padded CSV file (or chunk of padded CSV file)
+    binary_path: The path of the output `.npy` file
+    dtype      : The structured dtype of the output array
+    indexes    : The indexes of CSV columns corresponding to each field of `dtype`
+    has_header : Whether the first line of `padded_path` is a header
+
+    `dtype` and `indexes` are given by `get_dtype_and_indexes`.
+    """
+    with padded_path.open() as file_descriptor:
+        padded_text_file = PaddedTextFile(
+            file_descriptor, padded_path.stat().st_size, offset=1 if has_header else 0
+        )
+
+        array = np.lib.format.open_memmap(
+            binary_path, mode="w+", dtype=dtype, shape=(len(padded_text_file),)
+        )
+
+        for start in range(0, len(padded_text_file), BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, len(padded_text_file))
+            array[start:stop] = read_records(
+                padded_text_file, dtype, indexes, start, stop
+            )
+
+        array.flush()
+        del array
+
+    padded_path.unlink()
+
+
+def get_column_path(path: Path, index: int, column: str) -> Path:
+    """Return the path of the file of `column` for the chunk `index` of the level
+    located in `path` (see `to_columns`)."""
+    return path / f"{index}.{column}{COLUMN_SUFFIX}"
+
+
+def get_column_paths(path: Path, column: str) -> List[Path]:
+    """Return paths of files of `column` of the level located in `path` (see
+    `to_columns`), sorted by chunk."""
+    suffix = f".{column}{COLUMN_SUFFIX}"
+
+    return sorted(
+        (
+            item
+            for item in path.iterdir()
+            if item.name.endswith(suffix) and item.name[: -len(suffix)].isdigit()
+        ),
+        key=lambda item: int(item.name[: -len(suffix)]),
+    )
+
+
+def to_columns(
+    padded_path: Path, dtype: np.dtype, indexes: List[int], has_header: bool
+) -> None:
+    """Convert the padded CSV file pointed by `padded_path`, named <int>.csv, into one
+    `.npy` file per field of `dtype`, named <int>.<field>.column.npy and containing a
+    (1-D) array of the type of this field, then remove `padded_path`.
+
+    Values of a column are contiguous, so reading some columns out of many only reads
+    files of these columns (see `ColumnArrays`).
+
+    padded_path: The path of the padded CSV file (or chunk of padded CSV file)
+    dtype      : The structured dtype, as given by `get_dtype_and_indexes`
+    indexes    : The indexes of CSV columns corresponding to each field of `dtype`
+    has_header : Whether the first line of `padded_path` is a header
+    """
+    with padded_path.open() as file_descriptor:
+        padded_text_file = PaddedTextFile(
+            file_descriptor, padded_path.stat().st_size, offset=1 if has_header else 0
+        )
+
+        column_to_array = {
+            column: np.lib.format.open_memmap(
+                get_column_path(padded_path.parent, int(padded_path.stem), column),
+                mode="w+",
+                dtype=dtype[column],
+                shape=(len(padded_text_file),),
+            )
+            for column in dtype.names
+        }
+
+        for start in range(0, len(padded_text_file), BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, len(padded_text_file))
+            records = read_records(padded_text_file, dtype, indexes, start, stop)
+
+            for column, array in column_to_array.items():
+                array[start:stop] = records[column]
+
+        for array in column_to_array.values():
+            array.flush()
+
+        del column_to_array
+
+    padded_path.unlink()
+
+
+def load_column_arrays(path: Path, index: int, columns: List[str]) -> ColumnArrays:
+    """Return, as memory mapped arrays, `columns` of the chunk `index` of the level
+    located in `path` (see `to_columns`). Columns without file are ignored."""
+    column_paths = [
+        (column, get_column_path(path, index, column)) for column in columns
+    ]
+
+    return ColumnArrays(
+        {
+            column: np.load(column_path, mmap_mode="r")
+            for column, column_path in column_paths
+            if column_path.exists()
+        }
+    )
+
+
+def sorted_binary_csv_file_of(
+    arrays: List[Union[np.ndarray, ColumnArrays]],
+    x_and_type: Tuple[str, type],
+    ys: List[str],
+    index_dir_path: Optional[Path] = None,
+    x_file: Optional[Gettable] = None,
+) -> _SortedPaddedCSVFile:
+    """Represent a binary CSV file with one sorted column, where all lines are
+    reachable through the sorted column with O(log(n)) complexity.
+
+    It behaves exactly like a `_SortedPaddedCSVFile` built from padded CSV files, but
+    lines are read from already loaded `arrays` (one per chunk, see `to_binary` and
+    `ColumnArrays`).
+
+    index_dir_path: See `_SortedPaddedCSVFile`
+    x_file        : If set, values of `x` are read from it instead of from `arrays`
+    """
+    return _SortedPaddedCSVFile.from_gettables(
+        (
+            x_file
+            if x_file is not None
+            else _BinaryCSVFile(arrays, [x_and_type], unwrap_if_one_column=True)
+        ),
+        _BinaryCSVFile(arrays, [(y, float) for y in ys]),
+        index_dir_path=index_dir_path,
+    )
@@ -0,0 +1,113 @@
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .binary_csv_file import BATCH_SIZE, _BinaryCSVFile
+from .gettable import Gettable
+from .indexed_text_file import IndexedTextFile, get_offsets_path
+from .padded_text_file import PaddedTextFile
+
+EPOCH_X_SUFFIX = ".x.npy"
+
+
+def parse_date_time(value: str, date_time_formats: List[str]) -> datetime:
+    """Parse `value` with the first format of `date_time_formats` matching it."""
+    for date_time_format in date_time_formats:
+        try:
+            return datetime.strptime(value, date_time_format)
+        except ValueError:
+            pass
+
+    raise ValueError(
+        f"time data '{value}' does not match any format in {date_time_formats}"
+    )
+
+
+def to_epoch_x(
+    padded_path: Path,
+    epoch_x_path: Path,
+    x: str,
+    x_index: int,
+    date_time_formats: List[str],
+    has_header: bool,
+) -> None:
+    """Parse the `x` column of the padded CSV file pointed by `padded_path` as
+    datetimes, and write the corresponding epoch seconds into a `.npy` file containing
+    a structured array with the only float64 field `x`.
+
+    padded_path      : The path of the padded CSV file (or chunk of padded CSV file),
+                       or of the indexed one if its offsets are written next to it
+                       (see `write_indexed`)
+    epoch_x_path     : The path of the output `.npy` file
+    x                : The name of the `x` column
+    x_index          : The index of the `x` column in the CSV file
+    date_time_formats: The formats the `x` column could be written with
+    has_header       : Whether the first line of `padded_path` is a header
+
+    Once done, the `x` column of this chunk has never to be parsed again.
+    """
+    dtype = np.dtype([(x, "<f8")])
+
+    offsets_path = get_offsets_path(padded_path)
+    offset = 1 if has_header else 0
+
+    with padded_path.open() as file_descriptor:
+        padded_text_file: Gettable = (
+            IndexedTextFile(file_descriptor, np.load(offsets_path), offset)
+            if offsets_path.exists()
+            else PaddedTextFile(
+                file_descriptor, padded_path.stat().st_size, offset=offset
+            )
+        )
+
+        array = np.lib.format.open_memmap(
+            epoch_x_path, mode="w+", dtype=dtype, shape=(len(padded_text_file),)
+        )
+
+        # Lines are in general all written with the same format, so the last
+        # matching format is tried first
+        formats = list(date_time_formats)
+
+        def parse(value: str) -> float:
+            for index, date_time_format in enumerate(formats):
+                try:
+                    date_time = datetime.strptime(value, date_time_format)
+                except ValueError:
+                    continue
+
+                formats.insert(0, formats.pop(index))
+                return date_time.timestamp()
+
+            return parse_date_time(value, date_time_formats).timestamp()
+
+        for start in range(0, len(padded_text_file), BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, len(padded_text_file))
+
+            array[x][start:stop] = [
+                parse(line.split(",")[x_index].strip())
+                for line in padded_text_file.get(start, stop)
+            ]
+
+        array.flush()
+        del array
+
+
+def get_epoch_x_paths(path: Path) -> List[Path]:
+    """Return paths of epoch files of the level located in `path` (see `to_epoch_x`),
+    sorted by chunk."""
+    return sorted(
+        path.glob(f"*{EPOCH_X_SUFFIX}"),
+        key=lambda item: int(item.name[: -len(EPOCH_X_SUFFIX)]),
+    )
+
+
+def epoch_x_file_of(arrays: List[np.ndarray], x: str) -> Optional[_BinaryCSVFile]:
+    """Return the `x` column of a level, as epoch seconds, from already loaded
+    `arrays` (one per chunk, see `to_epoch_x`), or `None` if it has not been
+    computed."""
+    if arrays == []:
+        return None
+
+    return _BinaryCSVFile(arrays, [(x, float)], unwrap_if_one_column=True)
@@ -0,0 +1,104 @@
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Collection, List, NamedTuple, Optional
+
+from .pad_and_sample import SOURCE_FILE_NAME, TMP_DIR_PREFIX, read_source
+
+# Touched into an entry each time it is used, so least recently used entries are
+# evicted first (see `prune`)
+LAST_ACCESS_FILE_NAME = "LAST_ACCESS"
+
+
+class Entry(NamedTuple):
+    """A directory of the files cache, where a CSV file has been padded and sampled
+    (see `pad_and_sample`).
+
+    path       : The directory
+    size       : The size, in bytes, of all files of the directory
+    last_access: When the entry has been used for the last time
+    source_path: The processed CSV file, if known
+    """
+
+    path: Path
+    size: int
+    last_access: datetime
+    source_path: Optional[Path]
+
+
+def touch(dir_path: Path) -> None:
+    """Record that the entry located in `dir_path` is used now, if it exists."""
+    if dir_path.exists():
+        (dir_path / LAST_ACCESS_FILE_NAME).touch()
+
+
+def get_size(path: Path) -> int:
+    """Return the size, in bytes, of all files located in `path`."""
+    return sum(
+        os.lstat(os.path.join(dir_name, file_name)).st_size
+        for dir_name, _, file_names in os.walk(path)
+        for file_name in file_names
+    )
+
+
+def get_entry(dir_path: Path) -> Entry:
+    """Return the entry located in `dir_path`."""
+    last_access_path = dir_path / LAST_ACCESS_FILE_NAME
+
+    last_access = (
+        (last_access_path if last_access_path.exists() else dir_path).stat().st_mtime
+    )
+
+    source_path = (
+        Path(read_source(dir_path)["path"])
+        if (dir_path / SOURCE_FILE_NAME).exists()
+        else None
+    )
+
+    return Entry(
+        dir_path, get_size(dir_path), datetime.fromtimestamp(last_access), source_path
+    )
+
+
+def get_entries(files_dir: Path) -> List[Entry]:
+    """Return all entries of the files cache located in `files_dir`, from the least
+    recently used to the most recently used one.
+
+    Temporary directories of lines being appended (see `append`) are not entries.
+    """
+    if not files_dir.exists():
+        return []
+
+    entries = [
+        get_entry(path)
+        for path in files_dir.iterdir()
+        if path.is_dir() and not path.name.startswith(TMP_DIR_PREFIX)
+    ]
+    return sorted(entries, key=lambda entry: entry.last_access)
+
+
+def prune(files_dir: Path, budget: int, keep: Collection[Path] = ()) -> List[Entry]:
+    """Remove least recently used entries of the files cache located in `files_dir`,
+    until all entries fit into `budget` bytes. Entries located in `keep` are never
+    removed.
+
+    Return removed entries.
+    """
+    entries = get_entries(files_dir)
+    size = sum(entry.size for entry in entries)
+    removed_entries = []
+
+    for entry in entries:
+        if size <= budget:
+            break
+
+        if entry.path in keep:
+            continue
+
+        # The entry could be removed concurrently by another process
+        shutil.rmtree(entry.path, ignore_errors=True)
+        size -= entry.size
+        removed_entries.append(entry)
+
+    return removed_entries
@@ -0,0 +1,144 @@
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .gettable import Gettable
+from .padded_text_file import OffsetError, SplittedMmapPaddedTextFile
+from .splitted_gettable import SplittedGettable
+
+# Suffix of files written by `write_indexed`, following the convention
+# <int>.offsets.npy
+OFFSETS_SUFFIX = ".offsets.npy"
+
+BATCH_SIZE = 65536
+
+
+class IndexedTextFile(Gettable):
+    """Represent a text file whose lines are not padded, where lines are reachable with
+    O(1) complexity through the byte offset of each line (see `write_indexed`).
+
+    It behaves like `MmapPaddedTextFile`: getting a slice of lines returns a NumPy
+    array (of type `S<longest line size>`) of raw lines, which could be split with
+    `split_lines`.
+
+    Usage:
+    indexed_text_file = IndexedTextFile(<file_descriptor>, <offsets>, <offset>)
+
+    # Get the third line of the file
+    indexed_text_file[2] # = "5,y,6,7,8"
+
+    # Get lines between the third line (included) and the last line (excluded)
+    indexed_text_file[2:-1] # = array([b"5,y,6,7,8", ...], dtype="|S11")
+    """
+
+    def __init__(self, file_descriptor: IO, offsets: np.ndarray, offset: int) -> None:
+        """Constructor.
+
+        file_descriptor: The file descriptor pointing to the text file
+        offsets        : The byte offset of the start of each line, followed by the
+                         size of the file (see `write_indexed`)
+        offset         : The number of first line(s) to skip. Must be >= 0
+
+        If not 0 <= `offset` <= number of lines, an `OffsetError` is raised.
+        """
+        nb_lines = len(offsets) - 1
+
+        if not 0 <= offset <= nb_lines:
+            raise OffsetError(f"Offset must be in [0;{nb_lines}]")
+
+        self.__buffer = (
+            mmap(file_descriptor.fileno(), 0, access=ACCESS_READ)
+            if offsets[-1] > 0
+            else b""
+        )
+
+        self.__offsets = offsets
+        self.__offset = offset
+        self.__len = nb_lines - offset
+
+    def __len__(self) -> int:
+        """Return the number of lines of the file."""
+        return self.__len
+
+    def __getitem__(
+        self, line_number_or_slice: Union[int, slice]
+    ) -> Union[str, np.ndarray]:
+        """Get a given line or a given slice of lines.
+
+        line_number_or_slice: The line number or the slice where lines will be retrieved
+        """
+        if isinstance(line_number_or_slice, slice):
+            start, stop, step = line_number_or_slice.indices(self.__len)
+
+            if start >= stop:
+                return np.empty(0, dtype="S1")
+
+            lines = self.__read(start, stop).split(b"\n")[:-1]
+            return np.array(lines[::step], dtype=bytes)
+
+        line_number = line_number_or_slice
+
+        real_line_number = line_number if line_number >= 0 else self.__len + line_number
+
+        if not 0 <= real_line_number < self.__len:
+            raise IndexError("list index out of range")
+
+        return self.__read(real_line_number, real_line_number + 1).decode().rstrip()
+
+    def get(
+        self, start: Optional[int] = None, stop: Optional[int] = None
+    ) -> Iterator[str]:
+        """Return an iterator on a given slice of lines.
+
+        start: The first line of slice (included)
+        stop : The last line of slice (excluded)
+        """
+        real_start, real_stop, _ = slice(start, stop).indices(self.__len)
+
+        for batch_start in range(real_start, real_stop, BATCH_SIZE):
+            batch_stop = min(batch_start + BATCH_SIZE, real_stop)
+
+            for line in self.__read(batch_start, batch_stop).split(b"\n")[:-1]:
+                yield line.decode().rstrip()
+
+    def __read(self, start: int, stop: int) -> bytes:
+        """Return raw bytes of lines between `start` (included) and `stop`
+        (excluded)."""
+        return self.__buffer[
+            self.__offsets[start + self.__offset] : self.__offsets[stop + self.__offset]
+        ]
+
+
+class SplittedIndexedTextFile(SplittedMmapPaddedTextFile):
+    """Splitted Indexed Text File
+
+    Getting a slice of lines returns a NumPy array (see `IndexedTextFile`).
+    """
+
+    def __init__(
+        self,
+        files_descriptor_and_offsets: List[Tuple[IO, np.ndarray]],
+        offset: int,
+    ):
+        """Initializer.
+
+        files_descriptor_and_offsets:
+            A list of tuple (<file descriptor>, <offsets of lines of corresponding
+            file>)
+
+        offset: The offset to apply to the first file descriptor
+        """
+        indexed_text_files = [
+            IndexedTextFile(file_descriptor, offsets, offset=0)
+            for file_descriptor, offsets in files_descriptor_and_offsets
+        ]
+
+        SplittedGettable.__init__(self, indexed_text_files, offset)  # type: ignore
+
+
+def get_offsets_path(path: Path) -> Path:
+    """Return the path of the offsets of the text file pointed by `path`, named
+    <int>.csv (see `write_indexed`)."""
+    return path.with_name(f"{path.stem}{OFFSETS_SUFFIX}")
@@ -0,0 +1,423 @@
+from pathlib import Path
+from typing import IO, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .binary_csv_file import (
+    ColumnArrays,
+    get_column_path,
+    get_column_paths,
+    load_column_arrays,
+    sorted_binary_csv_file_of,
+)
+from .epoch_x import epoch_x_file_of, get_epoch_x_paths
+from .gettable import Gettable
+from .indexed_text_file import get_offsets_path
+from .pad_and_sample import OVERVIEW_DIR_NAME, READY_FILE_NAME, SUCCESS_FILE_NAME
+from .padded_text_file import read_field_widths
+from .sorted_padded_csv_file import _SortedPaddedCSVFile
+
+# The level of the overview (see `pad_and_sample`), used while no other level is ready
+OVERVIEW_LEVEL = -1
+
+# All levels from the finest to the coarsest one (`None` if not ready yet), the
+# overview (`None` if not ready, or not needed any more), and for each level whose
+# lines changed since the previous call, the number of the first changed line
+Levels = Tuple[
+    List[Optional[_SortedPaddedCSVFile]], Optional[_SortedPaddedCSVFile], Dict[int, int]
+]
+
+# A chunk file is identified by its path, its inode, its size and its modification time
+ChunkKey = Tuple[Path, int, int, int]
+
+
+class TextChunk(NamedTuple):
+    """An opened chunk of a padded CSV file (see `_SortedPaddedCSVFile`).
+
+    file_descriptor_1: A first file descriptor to the file
+    file_descriptor_2: A second (and distinct) file descriptor to the file
+    size             : The size (in bytes) of the file
+    offsets          : The offsets of lines, if they are not padded (see
+                       `write_indexed`)
+    field_widths     : The widths of fields, if they are padded (see
+                       `FieldsPaddedTextFile`)
+    """
+
+    file_descriptor_1: IO
+    file_descriptor_2: IO
+    size: int
+    offsets: Optional[np.ndarray]
+    field_widths: Optional[List[int]]
+
+
+# An opened chunk: a `TextChunk` for padded CSV files, a memory mapped array for
+# binary and epoch files, and memory mapped arrays of requested columns for column
+# files (see `to_columns`)
+Chunk = Union[TextChunk, np.ndarray, ColumnArrays]
+
+
+class OpenedLevel(NamedTuple):
+    """A level opened by `LevelFiles`.
+
+    version   : The version of the directory the level has been opened at
+    chunk_keys: The keys of chunk files of the level
+    epoch_keys: The keys of epoch files of the level (see `to_epoch_x`)
+    spcf      : The opened level
+    """
+
+    version: Optional[int]
+    chunk_keys: List[ChunkKey]
+    epoch_keys: List[ChunkKey]
+    spcf: _SortedPaddedCSVFile
+
+
+class LevelFiles:
+    """Open levels written by `pad_and_sample` into a directory, and open them again
+    once they changed (see `follow`).
+
+    Files of chunks are kept opened between calls, so opening again a level whose
+    lines have been appended only opens files of new (or rewritten) chunks.
+
+    The directory is considered consistent only while its `SUCCESS` file exists (see
+    `append`): opened levels are kept as is while it is being modified, and a level is
+    opened again only once the `SUCCESS` file has been touched again.
+
+    Usage:
+    ======
+
+    with LevelFiles(dir_path, ("a", float), ["b"], ["b_min", "b_max"]) as level_files:
+        all_spcfs, overview, level_to_first_changed_line = level_files.open()
+        ...
+        # Once lines have been appended
+        all_spcfs, overview, level_to_first_changed_line = level_files.open()
+    """
+
+    def __init__(
+        self,
+        dir_path: Path,
+        x_and_type: Tuple[str, type],
+        ys: List[str],
+        sampled_ys: List[str],
+    ) -> None:
+        """Initializer.
+
+        dir_path  : The directory written by `pad_and_sample`
+        x_and_type: The name and the type of `x`
+        ys        : The names of ys of the non sampled level
+        sampled_ys: The names of ys of sampled levels
+        """
+        self.__dir_path = dir_path
+        self.__x_and_type = x_and_type
+        self.__ys = ys
+        self.__sampled_ys = sampled_ys
+
+        self.__key_to_chunk: Dict[ChunkKey, Chunk] = {}
+        self.__level_to_opened: Dict[int, OpenedLevel] = {}
+        self.__version: Optional[int] = None
+
+    def __enter__(self) -> "LevelFiles":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close all files of chunks."""
+        self.__level_to_opened = {}
+        self.__close_unused_chunks()
+
+    def open(self) -> Levels:
+        """Return levels of the directory, opening the ones which became ready or which
+        changed since the previous call."""
+        version = self.__get_version()
+        level_to_opened = self.__open_levels(version)
+
+        if level_to_opened is None or (
+            version is not None and self.__get_version() != version
+        ):
+            # The directory has been modified while opening levels
+            level_to_opened = self.__level_to_opened
+        else:
+            self.__version = version
+
+        level_to_first_changed_line = {
+            level: self.__get_first_changed_line(
+                level, self.__level_to_opened[level], opened
+            )
+            for level, opened in level_to_opened.items()
+            if level in self.__level_to_opened
+            and opened is not self.__level_to_opened[level]
+        }
+
+        self.__level_to_opened = level_to_opened
+        self.__close_unused_chunks()
+
+        def spcf_of(level: int) -> Optional[_SortedPaddedCSVFile]:
+            opened = level_to_opened.get(level)
+            return opened.spcf if opened is not None else None
+
+        nb_levels = max(level_to_opened, default=-1) + 1
+
+        return (
+            [spcf_of(level) for level in range(nb_levels)],
+            spcf_of(OVERVIEW_LEVEL),
+            {
+                level: line
+                for level, line in level_to_first_changed_line.items()
+                if line is not None
+            },
+        )
+
+    def __open_levels(self, version: Optional[int]) -> Optional[Dict[int, OpenedLevel]]:
+        """Return all opened levels, opening the ones which became ready or which changed
+        since the previous call, or `None` if the directory is being modified."""
+        if version is None and self.__version is not None:
+            # The `SUCCESS` file has been removed by `append`
+            return None
+
+        level_to_opened = dict(self.__level_to_opened)
+
+        level_paths = (
+            sorted(
+                (path for path in self.__dir_path.iterdir() if path.name.isdigit()),
+                key=lambda path: int(path.name),
+            )
+            if self.__dir_path.exists()
+            else []
+        )
+
+        # Coarsest levels are written first, so missing levels are finer ones
+        nb_levels = int(level_paths[-1].name) + 1 if level_paths != [] else 0
+
+        try:
+            for level in range(nb_levels):
+                self.__open_level(level_to_opened, level, version)
+
+            is_complete = nb_levels > 0 and all(
+                level in level_to_opened for level in range(nb_levels)
+            )
+
+            if is_complete:
+                level_to_opened.pop(OVERVIEW_LEVEL, None)
+            else:
+                self.__open_level(level_to_opened, OVERVIEW_LEVEL, version)
+        except OSError:
+            # Files have been removed while opening them
+            return None
+
+        return level_to_opened
+
+    def __get_version(self) -> Optional[int]:
+        """Return the modification time of the `SUCCESS` file, if it exists."""
+        try:
+            return (self.__dir_path / SUCCESS_FILE_NAME).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def __get_path(self, level: int) -> Path:
+        return self.__dir_path / (
+            OVERVIEW_DIR_NAME if level == OVERVIEW_LEVEL else str(level)
+        )
+
+    def __open_level(
+        self,
+        level_to_opened: Dict[int, OpenedLevel],
+        level: int,
+        version: Optional[int],
+    ) -> None:
+        """Open `level` into `level_to_opened` if it is ready, and if it is not
+        opened yet or if the directory changed since it has been opened."""
+        opened = level_to_opened.get(level)
+
+        if opened is not None and (version is None or opened.version == version):
+            return
+
+        path = self.__get_path(level)
+
+        # Directories without overview are written without `READY` files
+        is_ready = (path / READY_FILE_NAME).exists() or (
+            path.exists() and not (self.__dir_path / OVERVIEW_DIR_NAME).exists()
+        )
+
+        if not is_ready:
+            return
+
+        x, _ = self.__x_and_type
+        columns = [x] + (self.__ys if level == 0 else self.__sampled_ys)
+
+        def load_text(chunk_path: Path, size: int) -> Chunk:
+            offsets_path = get_offsets_path(chunk_path)
+
+            return TextChunk(
+                chunk_path.open(),
+                chunk_path.open(),
+                size,
+                (
+                    np.load(offsets_path, mmap_mode="r")
+                    if offsets_path.exists()
+                    else None
+                ),
+                read_field_widths(chunk_path),
+            )
+
+        def load_binary(chunk_path: Path, _: int) -> Chunk:
+            return np.load(chunk_path, mmap_mode="r")
+
+        def load_columns(chunk_path: Path, _: int) -> Chunk:
+            # A chunk of column files is identified by its file of `x`
+            index = int(chunk_path.name.split(".")[0])
+            return load_column_arrays(chunk_path.parent, index, columns)
+
+        if (path / "0.npy").exists():
+            chunk_paths = sorted(
+                (item for item in path.glob("*.npy") if item.stem.isdigit()),
+                key=lambda item: int(item.stem),
+            )
+
+            is_binary, load = True, load_binary
+        elif get_column_path(path, 0, x).exists():
+            chunk_paths = get_column_paths(path, x)
+            is_binary, load = True, load_columns
+        else:
+            chunk_paths = sorted(path.glob("*.csv"), key=lambda item: int(item.stem))
+            is_binary, load = False, load_text
+
+        chunk_keys = [self.__open_chunk(path, load) for path in chunk_paths]
+
+        epoch_keys = [
+            self.__open_chunk(path, load_binary) for path in get_epoch_x_paths(path)
+        ]
+
+        if (
+            opened is not None
+            and opened.chunk_keys == chunk_keys
+            and opened.epoch_keys == epoch_keys
+        ):
+            level_to_opened[level] = opened._replace(version=version)
+            return
+
+        level_to_opened[level] = OpenedLevel(
+            version,
+            chunk_keys,
+            epoch_keys,
+            self.__build(level, chunk_keys, epoch_keys, is_binary, index_dir_path=path),
+        )
+
+    def __open_chunk(self, path: Path, load: Callable[[Path, int], Chunk]) -> ChunkKey:
+        """Open the chunk file pointed by `path` with `load` (called with its path and
+        its size), if it has not been opened yet."""
+        stat = path.stat()
+        key = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        if key not in self.__key_to_chunk:
+            self.__key_to_chunk[key] = load(path, stat.st_size)
+
+        return key
+
+    def __build(
+        self,
+        level: int,
+        chunk_keys: List[ChunkKey],
+        epoch_keys: List[ChunkKey],
+        is_binary: bool,
+        index_dir_path: Optional[Path] = None,
+    ) -> _SortedPaddedCSVFile:
+        x, _ = self.__x_and_type
+        ys = self.__ys if level == 0 else self.__sampled_ys
+        chunks = [self.__key_to_chunk[key] for key in chunk_keys]
+        x_file = epoch_x_file_of([self.__key_to_chunk[key] for key in epoch_keys], x)
+
+        return (
+            sorted_binary_csv_file_of(
+                chunks, self.__x_and_type, ys, index_dir_path, x_file  # type: ignore
+            )
+            if is_binary
+            else self.__build_text(chunks, ys, index_dir_path, x_file)  # type: ignore
+        )
+
+    def __build_text(
+        self,
+        chunks: List[TextChunk],
+        ys: List[str],
+        index_dir_path: Optional[Path],
+        x_file: Optional[Gettable],
+    ) -> _SortedPaddedCSVFile:
+        offsets = [chunk.offsets for chunk in chunks]
+        field_widths = [chunk.field_widths for chunk in chunks]
+
+        return _SortedPaddedCSVFile(
+            [chunk[:3] for chunk in chunks],
+            self.__x_and_type,
+            ys,
+            index_dir_path=index_dir_path,
+            x_file=x_file,
+            offsets=(
+                offsets  # type: ignore
+                if chunks != [] and all(item is not None for item in offsets)
+                else None
+            ),
+            field_widths=(
+                field_widths  # type: ignore
+                if chunks != [] and all(item is not None for item in field_widths)
+                else None
+            ),
+        )
+
+    def __get_first_changed_line(
+        self, level: int, previous: OpenedLevel, current: OpenedLevel
+    ) -> Optional[int]:
+        """Return the number of the first line which changed between `previous` and
+        `current` openings of a level, or `None` if no line changed."""
+        if (
+            previous.chunk_keys == current.chunk_keys
+            and previous.epoch_keys == current.epoch_keys
+        ):
+            return None
+
+        def nb_common(keys_1: List[ChunkKey], keys_2: List[ChunkKey]) -> int:
+            return next(
+                (
+                    index
+                    for index, (key_1, key_2) in enumerate(zip(keys_1, keys_2))
+                    if key_1 != key_2
+                ),
+                min(len(keys_1), len(keys_2)),
+            )
+
+        nb_common_chunks = nb_common(previous.chunk_keys, current.chunk_keys)
+
+        if previous.epoch_keys != [] or current.epoch_keys != []:
+            nb_common_chunks = min(
+                nb_common_chunks, nb_common(previous.epoch_keys, current.epoch_keys)
+            )
+
+        if nb_common_chunks == 0:
+            return 0
+
+        common_keys = current.chunk_keys[:nb_common_chunks]
+        is_binary = not isinstance(self.__key_to_chunk[common_keys[0]], TextChunk)
+
+        return len(
+            self.__build(
+                level,
+                common_keys,
+                current.epoch_keys[:nb_common_chunks],
+                is_binary,
+            )
+        )
+
+    def __close_unused_chunks(self) -> None:
+        used_keys = {
+            key
+            for opened in self.__level_to_opened.values()
+            for key in opened.chunk_keys + opened.epoch_keys
+        }
+
+        unused_keys = [key for key in self.__key_to_chunk if key not in used_keys]
+
+        for key in unused_keys:
+            chunk = self.__key_to_chunk.pop(key)
+
+            if isinstance(chunk, TextChunk):
+                chunk.file_descriptor_1.close()
+                chunk.file_descriptor_2.close()
@@ -0,0 +1,80 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .selector import Selection
+
+# A bucket keeps at most first, last, min and max lines of each curve
+NB_LINES_PER_BUCKET = 4
+
+
+def first_indexes_of(
+    values: np.ndarray, starts: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """Return, for each segment of `values` beginning at `starts`, the index of the
+    first value equal to the corresponding `target`.
+
+    Segments where no value equals the target (only NaN values) are ignored.
+    """
+    lengths = np.diff(np.append(starts, len(values)))
+    positions = np.flatnonzero(values == np.repeat(targets, lengths))
+
+    if len(positions) == 0:
+        return positions
+
+    first_positions = np.searchsorted(positions, starts)
+    return np.unique(positions[np.minimum(first_positions, len(positions) - 1)])
+
+
+def m4(
+    xs: np.ndarray,
+    name_to_y: Dict[str, Selection.Y],
+    start: float,
+    stop: float,
+    nb_buckets: int,
+) -> Tuple[np.ndarray, Dict[str, Selection.Y]]:
+    """Reduce lines to the ones needed to draw curves exactly the same way on
+    `nb_buckets` pixels between `start` and `stop` (M4 aggregation).
+
+    For each pixel, only the first and the last lines are kept, plus, for each curve
+    (`mins` and `maxs` of each `y`), the lines where the curve reaches its minimum and
+    its maximum. Lines are kept for all `ys` at once, so `xs` stays shared.
+
+    xs        : Sorted values of `x`, as floats
+    name_to_y : `mins` and `maxs` of each `y`, corresponding to `xs`
+    start     : The value of `x` corresponding to the left side of the first pixel
+    stop      : The value of `x` corresponding to the right side of the last pixel
+    nb_buckets: The number of pixels between `start` and `stop`
+
+    If there are not more lines than what M4 would keep, lines are returned as is.
+    """
+    if len(xs) <= NB_LINES_PER_BUCKET * nb_buckets or not stop > start:
+        return xs, name_to_y
+
+    buckets = np.clip(
+        ((xs - start) * (nb_buckets / (stop - start))).astype(np.int64),
+        0,
+        nb_buckets - 1,
+    )
+
+    starts = np.append(0, np.flatnonzero(np.diff(buckets)) + 1)
+    stops = np.append(starts[1:], len(xs))
+
+    indexes: List[np.ndarray] = [starts, stops - 1]
+
+    for y in name_to_y.values():
+        curves = [y.mins] if y.maxs is y.mins else [y.mins, y.maxs]
+
+        for curve in curves:
+            indexes += [
+                first_indexes_of(curve, starts, np.fmin.reduceat(curve, starts)),
+                first_indexes_of(curve, starts, np.fmax.reduceat(curve, starts)),
+            ]
+
+    kept = np.unique(np.concatenate(indexes))
+
+    def keep(y: Selection.Y) -> Selection.Y:
+        mins = y.mins[kept]
+        return Selection.Y(mins=mins, maxs=mins if y.maxs is y.mins else y.maxs[kept])
+
+    return xs[kept], {name: keep(y) for name, y in name_to_y.items()}
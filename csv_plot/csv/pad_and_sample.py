@@ -1,12 +1,127 @@
 import hashlib
+import json
 import os
+import shutil
+import time
+from enum import Enum
 from multiprocessing import Pool
 from pathlib import Path
-from typing import IO, Dict, List, Optional, Set, Tuple
+from tempfile import TemporaryDirectory
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+from fast_pad_and_sample import field_widths as fast_field_widths
 from fast_pad_and_sample import pad as fast_pad
+from fast_pad_and_sample import pad_columns as fast_pad_columns
+from fast_pad_and_sample import pad_fields as fast_pad_fields
 from fast_pad_and_sample import sample as fast_sample
-from fast_pad_and_sample import sample_sampled as fast_sample_sampled
+from fast_pad_and_sample import sample_levels as fast_sample_levels
+from fast_pad_and_sample import write_indexed as fast_write_indexed
+
+from .binary_csv_file import (
+    get_column_path,
+    get_dtype_and_indexes,
+    is_castable_to_float,
+    to_binary,
+    to_columns,
+)
+from .epoch_x import EPOCH_X_SUFFIX, to_epoch_x
+from .indexed_text_file import OFFSETS_SUFFIX, get_offsets_path
+from .padded_text_file import write_field_widths
+from .padded_csv_file import ColumnNotFoundError
+from .sparse_index import INDEX_FILE_NAME, SPACING_FILE_NAME, truncate_sparse_index
+
+# Number of lines of a level merged into one line of the next (sampled) level, if not
+# specified (see `pad_and_sample`)
+SAMPLING_PERIOD = 2
+
+# Written into a level directory once all its files are written (see
+# `pad_and_sample`)
+READY_FILE_NAME = "READY"
+
+# Written into the directory once all levels are written, and touched again each time
+# levels are extended (see `follow`)
+SUCCESS_FILE_NAME = "SUCCESS"
+
+# Directory of the coarse overview, built from lines spread over the whole file
+OVERVIEW_DIR_NAME = "overview"
+NB_OVERVIEW_LINES = 4096
+
+# Describe which region of which file has been processed (see `find_processed_prefix`)
+SOURCE_FILE_NAME = "source.json"
+
+# Files written by `append` are first written into the staging directory, then
+# committed by writing the staging file, which lists files to remove (see
+# `commit_staging`)
+STAGING_DIR_NAME = "staging"
+STAGING_FILE_NAME = "staging.json"
+
+# Prefix of temporary directories written next to processed directories while lines
+# are appended (see `append`), which are not processed directories themselves
+TMP_DIR_PREFIX = ".tmp-"
+
+# Describe which columns of the file have been kept, and how levels have been sampled
+# (see `write_metadata`)
+METADATA_FILE_NAME = "metadata.json"
+
+# Number of bytes read at the beginning and at the end of a region to fingerprint it
+FINGERPRINT_SIZE = 1024 * 1024
+
+# Number and size of blocks read, spread over the whole file, to hash its content (see
+# `content_hash`)
+NB_HASH_BLOCKS = 16
+HASH_BLOCK_SIZE = 64 * 1024
+
+# While following a file, it is checked for appended lines every `FOLLOW_PERIOD`
+# seconds, and at most `MAX_FOLLOW_SIZE` appended bytes are processed at once
+FOLLOW_PERIOD = 1.0
+MAX_FOLLOW_SIZE = 16 * 1024 * 1024
+
+# While following a file, the last chunk is processed again with appended lines as long
+# as it stays smaller than `MAX_GROWING_CHUNK_SIZE` bytes, so levels do not end up
+# with one tiny chunk per update
+MAX_GROWING_CHUNK_SIZE = 4 * 1024 * 1024
+
+# While following a file, previous chunks are also processed again with appended lines
+# as long as they are not bigger than following ones, so the number of chunks, and so
+# of files opened to display levels (see `LevelFiles`), only grows logarithmically.
+# Each update processes at most `MAX_EXTEND_SIZE` bytes though (appended ones
+# included), so bigger chunks are not merged any more: their number grows linearly,
+# but the cost of an update stays bounded
+MAX_EXTEND_SIZE = 64 * 1024 * 1024
+
+
+class Storage(str, Enum):
+    """How padded and sampled files are stored on disk.
+
+    Text   : Whitespace padded CSV files
+    Binary : Typed binary records (`.npy` files), read without any parsing
+    Columns: One typed binary file (`.npy` file) per column and per chunk, so only
+             files of plotted columns are read
+    Indexed: CSV files whose lines are not padded, with the byte offset of each line
+             (`.offsets.npy` files), so a long line does not make every line longer
+    Fields : Padded CSV files where each field is padded to the width of its column
+             (`.widths.json` files), so a column is read without splitting lines
+    """
+
+    Text = "text"
+    Binary = "binary"
+    Columns = "columns"
+    Indexed = "indexed"
+    Fields = "fields"
+
+
+class HashMode(str, Enum):
+    """How a file is identified, to find where it has already been padded and sampled.
+
+    Metadata: Its size and its last modification date (see `pseudo_hash`). A copied,
+              restored or touched file is processed again.
+    Content : Its size and blocks of its content (see `content_hash`). Identical
+              content is processed only once, wherever it is located.
+    """
+
+    Metadata = "metadata"
+    Content = "content"
 
 
 def pseudo_hash(path: Path, string: str = "") -> str:
@@ -21,6 +136,268 @@ def pseudo_hash(path: Path, string: str = "") -> str:
     return str(hashlib.md5(bytes(string, "utf-8")).hexdigest())
 
 
+def content_hash(path: Path, string: str = "") -> str:
+    """Compute a hash based on :
+    - The file size
+    - `NB_HASH_BLOCKS` blocks of `HASH_BLOCK_SIZE` bytes: the first one, the last one,
+      and blocks at regular offsets between them
+    - A given string
+
+    Unlike `pseudo_hash`, it does not depend on where the file is located nor on when
+    it has been modified. Only a few blocks are read, so it is fast even for huge
+    files, but a modification outside of these blocks is not detected.
+    """
+    size = os.path.getsize(path)
+    md5 = hashlib.md5(bytes(f"{size}-{string}", "utf-8"))
+    last_offset = max(size - HASH_BLOCK_SIZE, 0)
+
+    offsets = sorted(
+        {last_offset * index // (NB_HASH_BLOCKS - 1) for index in range(NB_HASH_BLOCKS)}
+    )
+
+    with path.open("rb") as file_descriptor:
+        for offset in offsets:
+            file_descriptor.seek(offset)
+            md5.update(file_descriptor.read(HASH_BLOCK_SIZE))
+
+    return md5.hexdigest()
+
+
+def get_hash(path: Path, string: str, hash_mode: HashMode) -> str:
+    """Compute the hash of the file pointed by `path` as requested by `hash_mode`."""
+    return (
+        content_hash(path, string)
+        if hash_mode is HashMode.Content
+        else pseudo_hash(path, string)
+    )
+
+
+def get_string(
+    x: str,
+    storage: Storage = Storage.Text,
+    date_time_formats: Optional[List[str]] = None,
+    period: int = SAMPLING_PERIOD,
+) -> str:
+    """Get the string identifying how a file is padded and sampled (see
+    `pseudo_hash`)."""
+    string = x if storage is Storage.Text else f"{x}-{storage.value}"
+
+    if date_time_formats is not None:
+        string = "-".join([string, *date_time_formats])
+
+    # Files sampled with the default period keep their previous directory
+    if period != SAMPLING_PERIOD:
+        string = f"{string}-period{period}"
+
+    return string
+
+
+def get_dir_path(
+    source_csv_file_path: Path,
+    dest_dir_path: Path,
+    x: str,
+    storage: Storage = Storage.Text,
+    date_time_formats: Optional[List[str]] = None,
+    hash_mode: HashMode = HashMode.Metadata,
+    period: int = SAMPLING_PERIOD,
+) -> Path:
+    """Get the directory where `source_csv_file_path`, padded and sampled with `x`
+    (parsed with `date_time_formats` if set) every `period` lines and stored as
+    `storage`, is located.
+
+    The directory is named after the hash of the file (see `HashMode`)."""
+    string = get_string(x, storage, date_time_formats, period)
+    return dest_dir_path / get_hash(source_csv_file_path, string, hash_mode)
+
+
+def fingerprint(path: Path, size: int) -> str:
+    """Compute a fingerprint of the first `size` bytes of the file pointed by `path`,
+    based on the first and the last `FINGERPRINT_SIZE` bytes of this region.
+
+    (Real hash is too long to compute for big file.)
+    """
+    with path.open("rb") as file_descriptor:
+        head = file_descriptor.read(min(size, FINGERPRINT_SIZE))
+        file_descriptor.seek(max(size - FINGERPRINT_SIZE, 0))
+        tail = file_descriptor.read(size - file_descriptor.tell())
+
+    return hashlib.md5(b"-".join([bytes(str(size), "utf-8"), head, tail])).hexdigest()
+
+
+def write_source(
+    dir_path: Path, source_path: Path, string: str, size: int, chunk_starts: List[int]
+) -> None:
+    """Record into `dir_path` that the first `size` bytes of `source_path` have been
+    processed there, padded and sampled as described by `string`.
+
+    chunk_starts: For each chunk, the byte index in `source_path` of its first line
+                  (not counting the header)
+    """
+    with (dir_path / SOURCE_FILE_NAME).open("w") as file_descriptor:
+        json.dump(
+            {
+                "path": str(source_path.resolve()),
+                "string": string,
+                "size": size,
+                "fingerprint": fingerprint(source_path, size),
+                "chunk_starts": chunk_starts,
+            },
+            file_descriptor,
+        )
+
+
+def read_source(dir_path: Path) -> Dict[str, Any]:
+    """Return what has been recorded into `dir_path` by `write_source`."""
+    with (dir_path / SOURCE_FILE_NAME).open() as file_descriptor:
+        return json.load(file_descriptor)
+
+
+def write_metadata(
+    dir_path: Path, columns: Optional[List[str]], period: int = SAMPLING_PERIOD
+) -> None:
+    """Record into `dir_path` that only `columns` of the CSV file have been kept
+    (`None` if all columns have been kept), and that each level has been sampled
+    every `period` lines of the previous one."""
+    with (dir_path / METADATA_FILE_NAME).open("w") as file_descriptor:
+        json.dump({"columns": columns, "period": period}, file_descriptor)
+
+
+def read_metadata(dir_path: Path) -> Dict[str, Any]:
+    """Return what has been recorded into `dir_path` by `write_metadata`.
+
+    Directories written without it kept all columns, and were sampled every
+    `SAMPLING_PERIOD` lines.
+    """
+    metadata_path = dir_path / METADATA_FILE_NAME
+    metadata: Dict[str, Any] = {"columns": None, "period": SAMPLING_PERIOD}
+
+    if metadata_path.exists():
+        with metadata_path.open() as file_descriptor:
+            metadata.update(json.load(file_descriptor))
+
+    return metadata
+
+
+def has_columns(
+    processed_columns: Optional[List[str]], columns: Optional[List[str]]
+) -> bool:
+    """Return `True` if `processed_columns` contain all `columns` (`None` meaning all
+    columns of the file)."""
+    if processed_columns is None:
+        return True
+
+    return columns is not None and set(columns) <= set(processed_columns)
+
+
+def merge_columns(
+    columns_1: Optional[List[str]], columns_2: Optional[List[str]]
+) -> Optional[List[str]]:
+    """Return columns contained either in `columns_1` or in `columns_2` (`None` meaning
+    all columns of the file)."""
+    if columns_1 is None or columns_2 is None:
+        return None
+
+    return sorted(set(columns_1) | set(columns_2))
+
+
+def get_column_indexes(
+    source_path: Path, columns: Optional[List[str]]
+) -> Optional[List[int]]:
+    """Return sorted indexes, in the header of `source_path`, of `columns` (`None` if
+    all columns are kept)."""
+    if columns is None:
+        return None
+
+    with source_path.open() as file_descriptor:
+        headers = file_descriptor.readline().rstrip().split(",")
+
+    missing_columns = set(columns) - set(headers)
+
+    if missing_columns != set():
+        raise ColumnNotFoundError(
+            f"Columns {sorted(missing_columns)} not found in {source_path}"
+        )
+
+    return [index for index, header in enumerate(headers) if header in columns]
+
+
+def get_chunk_starts(source_path: Path, chunks: List[Tuple[int, int]]) -> List[int]:
+    """Return, for each of `chunks` of `source_path` (see `compute_chunks`), the byte
+    index of its first line (not counting the header)."""
+    with source_path.open("rb") as file_descriptor:
+        header_size = len(file_descriptor.readline())
+
+    return [max(start, header_size) for start, _ in chunks]
+
+
+def find_processed_prefix(
+    source_path: Path,
+    dest_dir_path: Path,
+    string: str,
+    columns: Optional[List[str]] = None,
+) -> Optional[Tuple[Path, int]]:
+    """Find, in `dest_dir_path`, the directory where the longest prefix of
+    `source_path` has already been processed as described by `string`, keeping at
+    least `columns` (see `write_metadata`).
+
+    A prefix is only considered if it still matches the beginning of `source_path`
+    (see `fingerprint`), and if it ends with a complete line.
+
+    Return the directory and the size of the prefix, or `None` if not found.
+    """
+    size = source_path.stat().st_size
+    candidates = []
+
+    for source_file_path in dest_dir_path.glob(f"*/{SOURCE_FILE_NAME}"):
+        dir_path = source_file_path.parent
+        source = read_source(dir_path)
+
+        if source["path"] != str(source_path.resolve()) or source["string"] != string:
+            continue
+
+        # An interrupted `append` could have to be completed
+        recover_staging(dir_path)
+
+        if not (dir_path / SUCCESS_FILE_NAME).exists():
+            continue
+
+        source = read_source(dir_path)
+
+        if not 0 < source["size"] <= size or not has_columns(
+            read_metadata(dir_path)["columns"], columns
+        ):
+            continue
+
+        with source_path.open("rb") as file_descriptor:
+            file_descriptor.seek(source["size"] - 1)
+            ends_with_new_line = file_descriptor.read(1) == b"\n"
+
+        if (
+            ends_with_new_line
+            and fingerprint(source_path, source["size"]) == source["fingerprint"]
+        ):
+            candidates.append((source["size"], dir_path))
+
+    if candidates == []:
+        return None
+
+    prefix_size, dir_path = max(candidates)
+    return dir_path, prefix_size
+
+
+def starmap(nb_workers: int, function: Callable, arguments: List[Tuple]) -> List:
+    """Call `function` with each item of `arguments`, spread over `nb_workers`
+    processes. With only one worker, calls are done in the current process.
+
+    Return results of all calls.
+    """
+    if nb_workers == 1:
+        return [function(*item) for item in arguments]
+
+    with Pool(nb_workers) as pool:
+        return pool.starmap(function, arguments)
+
+
 def compute_chunks(file_path: Path, nb_chunks: int) -> List[Tuple[int, int]]:
     """Take a `file_descriptor` to a (non padded) text file, the file size and a
     number of chunks. Outputs a list of tuple.
@@ -68,43 +445,165 @@ def compute_chunks(file_path: Path, nb_chunks: int) -> List[Tuple[int, int]]:
     return list(zip(new_lines_byte_index[:-1], new_lines_byte_index[1:]))
 
 
-def are_files_fully_sampled(dir_path: Path) -> bool:
-    paths = sorted(dir_path.glob("*.csv"), key=lambda item: int(item.stem))
+def pad(
+    input_path: Path,
+    output_path: Path,
+    start_byte: Optional[int] = None,
+    stop_byte: Optional[int] = None,
+    indexes: Optional[List[int]] = None,
+    field_widths: Optional[List[int]] = None,
+    width: Optional[int] = None,
+) -> None:
+    """Pad the text file (in place) pointed by `input_path` with white spaces.
 
-    for index, path in enumerate(paths):
-        with path.open() as lines:
-            if index == 0:
-                next(lines)
+    input_path: The path of the input file
+    output_path: The path of the output file. If not provided, will replace the input
+                 file
+    indexes: If set, sorted indexes of the only columns to write (see
+             `get_column_indexes`)
+    field_widths: If set, each field is padded to its width instead of each line to
+                  the length of the longest line (see `get_field_widths`), and widths
+                  are written next to `output_path` (see `FieldsPaddedTextFile`)
+    width: If set, the length of padded lines, already measured (see `sample`), so
+           lines are read only once
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    real_width = -1 if width is None else width
 
-            next(lines)
+    real_start_byte = 0 if start_byte is None else start_byte
+    real_stop_byte = input_path.stat().st_size if stop_byte is None else stop_byte
 
-            try:
-                next(lines)
-                return False
-            except StopIteration:
-                pass
+    if field_widths is not None:
+        fast_pad_fields(
+            str(input_path),
+            str(output_path),
+            real_start_byte,
+            real_stop_byte,
+            get_field_indexes(input_path, real_start_byte, indexes),
+            field_widths,
+        )
 
-    return True
+        write_field_widths(output_path, field_widths)
+    elif indexes is None:
+        fast_pad(
+            str(input_path),
+            str(output_path),
+            real_start_byte,
+            real_stop_byte,
+            real_width,
+        )
+    else:
+        fast_pad_columns(
+            str(input_path),
+            str(output_path),
+            real_start_byte,
+            real_stop_byte,
+            indexes,
+            real_width,
+        )
 
 
-def pad(
+def write_indexed(
     input_path: Path,
     output_path: Path,
     start_byte: Optional[int] = None,
     stop_byte: Optional[int] = None,
+    indexes: Optional[List[int]] = None,
 ) -> None:
-    """Pad the text file (in place) pointed by `input_path` with white spaces.
+    """Write the lines of the text file pointed by `input_path`, without trailing white
+    spaces, into `output_path`, named <int>.csv, and the byte offset of the start of
+    each written line, followed by the size of the written file, into a `.npy` file
+    containing an uint64 array, named <int>.offsets.npy.
 
-    input_path: The path of the input file
-    output_path: The path of the output file. If not provided, will replace the input
-                 file
+    Lines are then reachable with O(1) complexity through these offsets (see
+    `IndexedTextFile`), while a long line does not make every line longer.
+
+    indexes: If set, sorted indexes of the only columns to write (see
+             `get_column_indexes`)
     """
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     real_start_byte = 0 if start_byte is None else start_byte
     real_stop_byte = input_path.stat().st_size if stop_byte is None else stop_byte
 
-    fast_pad(str(input_path), str(output_path), real_start_byte, real_stop_byte)
+    offsets = fast_write_indexed(
+        str(input_path), str(output_path), real_start_byte, real_stop_byte, indexes
+    )
+
+    np.save(get_offsets_path(output_path), np.frombuffer(offsets, dtype=np.uint64))
+
+
+def get_field_indexes(
+    input_path: Path, start_byte: int, indexes: Optional[List[int]]
+) -> List[int]:
+    """Return `indexes` if set, else indexes of all fields of the line starting at
+    `start_byte` in the text file pointed by `input_path`."""
+    if indexes is not None:
+        return indexes
+
+    with input_path.open("rb") as file_descriptor:
+        file_descriptor.seek(start_byte)
+        return list(range(file_descriptor.readline().count(b",") + 1))
+
+
+def get_field_widths(
+    input_path: Path,
+    start_byte: Optional[int] = None,
+    stop_byte: Optional[int] = None,
+    indexes: Optional[List[int]] = None,
+) -> List[int]:
+    """Return the length of the longest value of each field (of each field of
+    `indexes` if set) of lines of the text file pointed by `input_path` between
+    `start_byte` and `stop_byte`."""
+    real_start_byte = 0 if start_byte is None else start_byte
+    real_stop_byte = input_path.stat().st_size if stop_byte is None else stop_byte
+
+    return fast_field_widths(
+        str(input_path),
+        real_start_byte,
+        real_stop_byte,
+        get_field_indexes(input_path, real_start_byte, indexes),
+    )
+
+
+def pad_chunks(
+    nb_workers: int, arguments: List[Tuple], storage: Storage = Storage.Text
+) -> None:
+    """Pad chunks (see `pad`), where each item of `arguments` is a tuple (<input path>,
+    <output path>, <start byte>, <stop byte>, <indexes>).
+
+    If `storage` is `Storage.Fields`, widths of fields are computed for each chunk
+    then merged for each output directory (a level), so each field is padded to the
+    width of its column over all chunks of its level. If `storage` is
+    `Storage.Indexed`, chunks are written without padding (see `write_indexed`).
+    """
+    if storage is Storage.Indexed:
+        starmap(nb_workers, write_indexed, arguments)
+        return
+
+    if storage is Storage.Fields:
+        all_field_widths = starmap(
+            nb_workers,
+            get_field_widths,
+            [
+                (input_path, start_byte, stop_byte, indexes)
+                for input_path, _, start_byte, stop_byte, indexes in arguments
+            ],
+        )
+
+        level_to_field_widths: Dict[Path, List[int]] = {}
+
+        for (_, output_path, *_), field_widths in zip(arguments, all_field_widths):
+            level_path = output_path.parent
+            merged = level_to_field_widths.get(level_path, field_widths)
+            level_to_field_widths[level_path] = list(map(max, merged, field_widths))
+
+        arguments = [
+            argument + (level_to_field_widths[argument[1].parent],)
+            for argument in arguments
+        ]
+
+    starmap(nb_workers, pad, arguments)
 
 
 def sample(
@@ -114,9 +613,21 @@ def sample(
     period: int,
     start_byte: Optional[int] = None,
     stop_byte: Optional[int] = None,
-) -> None:
+    columns: Optional[List[str]] = None,
+    pad_indexes: Optional[List[int]] = None,
+    by_field: bool = False,
+) -> Tuple[int, List[int]]:
     """Sample a CSV file every `period` line.
 
+    If `columns` is set, other columns are not written.
+
+    While lines are read, they are also measured, so they could then be padded
+    without being read twice (see `pad`). `pad_indexes` and `by_field` are the
+    `indexes` which will be padded, and whether fields will be padded instead of lines.
+
+    Return the number of written lines (without the header), and the length of the
+    longest (padded) line, or the width of each field if `by_field` is set.
+
     Example:
     With the following CSV corresponding to `source_path`:
     x,a,b,c,d
@@ -162,6 +673,7 @@ def sample(
             index
             for index, value in enumerate(first_line_values)
             if not has_to_be_excluded(value)
+            and (columns is None or headers[index] in columns)
         }.union({x_index})
 
         y_indexes = indexes - {x_index}
@@ -185,7 +697,7 @@ def sample(
         right - left for left, right in zip(sorted_indexes[:-1], sorted_indexes[1:])
     ]
 
-    fast_sample(
+    return fast_sample(
         str(source_path),
         str(dest_path),
         sorted_indexes.index(x_index),
@@ -194,13 +706,29 @@ def sample(
         period,
         len(not_stripped_header_line) if real_start_byte == 0 else real_start_byte,
         real_stop_byte,
+        real_start_byte,
+        pad_indexes,
+        by_field,
     )
 
 
-def sample_sampled(
-    source_path: Path, dest_path: Path, period: int, has_header: bool
+def get_nb_levels(nb_lines: int, period: int) -> int:
+    """Return the number of sampled levels needed, if the finest one contains
+    `nb_lines` lines, so the coarsest one contains only one line."""
+    nb_levels = 1
+
+    while nb_lines > 1:
+        nb_lines = -(-nb_lines // period)
+        nb_levels += 1
+
+    return nb_levels
+
+
+def sample_levels(
+    source_path: Path, dest_paths: List[Path], period: int, has_header: bool
 ) -> None:
-    """Sample an already sampled CSV file every `period` line.
+    """Sample an already sampled CSV file every `period` line into `dest_paths[0]`,
+    which is sampled every `period` line into `dest_paths[1]`, and so on.
 
     Example:
     With the following CSV corresponding to `source_path`:
@@ -209,134 +737,932 @@ def sample_sampled(
     9,10.0,14.0,12.0,16.0
     17,18.0,18.0,20.0,20.0
 
-    With period == 2,
-
-    The CSV file written in `dest_path` will be:
+    With period == 2, the CSV file written in `dest_paths[0]` will be:
     a,b_min,b_max,d_min,d_max
-    1,2.0,14.0,4.0,16.0
-    17,18.0,18.0,20.0,20.0
-    """
-    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    1,2.000000,14.000000,4.000000,16.000000
+    17,18.000000,18.000000,20.000000,20.000000
 
-    with source_path.open() as source_file, dest_path.open("w") as dest_file:
+    All files are written while `source_path` is read only once.
+    """
+    with source_path.open() as source_file:
         line = next(source_file)
-        str_values = line.split(",")
-        _, *y_values = str_values
-        nb_y_values = len(y_values)
-        assert nb_y_values % 2 == 0
 
-        if has_header:
-            dest_file.write(line)
+    _, *y_values = line.split(",")
+    nb_y_values = len(y_values)
+    assert nb_y_values % 2 == 0
+
+    for dest_path in dest_paths:
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        dest_path.write_text(line if has_header else "")
 
-    fast_sample_sampled(
-        str(source_path), str(dest_path), nb_y_values, period, has_header
+    fast_sample_levels(
+        str(source_path),
+        [str(dest_path) for dest_path in dest_paths],
+        nb_y_values,
+        period,
+        has_header,
     )
 
 
-def pad_to_the_end(nb_workers: int, global_dir: Path, index: int) -> None:
-    current_sampled_dir = global_dir / f"{index}_sampled"
+def sample_chunk(
+    source_path: Path,
+    dir_path: Path,
+    index: int,
+    x: str,
+    period: int,
+    start_byte: int,
+    stop_byte: int,
+    columns: Optional[List[str]],
+    pad_indexes: Optional[List[int]],
+    by_field: bool,
+) -> Tuple[int, List[int]]:
+    """Sample the chunk of `source_path` between `start_byte` and `stop_byte` into all
+    sampled levels (`<level>_sampled` directories) of `dir_path`, as the file named
+    `<index>.csv`, while measuring its lines (see `sample`).
+
+    The chunk is read only once, and the first sampled level is read only once to
+    write all coarser ones (see `sample_levels`).
+
+    Return the number of sampled levels of the chunk, and measured widths.
+    """
+    sampled_path = dir_path / "1_sampled" / f"{index}.csv"
+    sampled_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if not current_sampled_dir.exists():
-        return
+    nb_lines, widths = sample(
+        source_path,
+        sampled_path,
+        x,
+        period,
+        start_byte,
+        stop_byte,
+        columns,
+        pad_indexes,
+        by_field,
+    )
 
-    padded_dir = global_dir / f"{index}"
-    sampled_paths = list(current_sampled_dir.glob("*.csv"))
-    padded_paths = [padded_dir / sampled_path.name for sampled_path in sampled_paths]
-    arguments = list(zip(sampled_paths, padded_paths))
+    nb_levels = get_nb_levels(nb_lines, period)
 
-    with Pool(nb_workers) as pool:
-        pool.starmap(pad, arguments)
+    sample_levels(
+        sampled_path,
+        [
+            dir_path / f"{level}_sampled" / f"{index}.csv"
+            for level in range(2, nb_levels + 1)
+        ],
+        period,
+        index == 0,
+    )
 
-    for sampled_path in sampled_paths:
-        sampled_path.unlink()
+    return nb_levels, widths
+
+
+def complete_levels(dir_path: Path, chunks_nb_levels: List[int]) -> None:
+    """Repeat, for each chunk sampled into fewer levels than others (see
+    `sample_chunk`), its coarsest level (which contains only one line), so all chunks
+    are sampled into the same levels."""
+    nb_levels = max(chunks_nb_levels)
+
+    for index, chunk_nb_levels in enumerate(chunks_nb_levels):
+        coarsest_path = dir_path / f"{chunk_nb_levels}_sampled" / f"{index}.csv"
 
-    current_sampled_dir.rmdir()
-    pad_to_the_end(nb_workers, global_dir, index + 1)
+        for level in range(chunk_nb_levels + 1, nb_levels + 1):
+            level_path = dir_path / f"{level}_sampled"
+            level_path.mkdir(exist_ok=True)
+            shutil.copyfile(coarsest_path, level_path / f"{index}.csv")
 
 
-def sample_sampled_to_the_end(
-    nb_workers: int, sampled_global_dir: Path, index: int
+def pad_to_the_end(
+    nb_workers: int,
+    global_dir: Path,
+    index: int,
+    finish: Callable[[Path], None] = lambda _: None,
+    storage: Storage = Storage.Text,
 ) -> None:
-    current_sampled_dir = sampled_global_dir / f"{index}_sampled"
+    """Pad sampled levels from `index` to the coarsest one, all at once (so workers are
+    started only once), as requested by `storage` (see `pad_chunks`). `finish` is then
+    called on each padded level directory, beginning with the coarsest one.
+    """
+    levels = []
 
-    if are_files_fully_sampled(current_sampled_dir):
-        return
+    while (global_dir / f"{index + len(levels)}_sampled").exists():
+        levels.append(index + len(levels))
 
-    next_sampled_dir = sampled_global_dir / f"{(index + 1)}_sampled"
-    current_sampled_paths = list(current_sampled_dir.glob("*.csv"))
+    sampled_and_padded_paths = [
+        (sampled_path, global_dir / f"{level}" / sampled_path.name)
+        for level in levels
+        for sampled_path in (global_dir / f"{level}_sampled").glob("*.csv")
+    ]
 
-    next_sampled_paths = [
-        next_sampled_dir / current_sampled_path.name
-        for current_sampled_path in current_sampled_paths
+    arguments = [
+        (sampled_path, padded_path, None, None, None)
+        for sampled_path, padded_path in sampled_and_padded_paths
     ]
 
+    pad_chunks(nb_workers, arguments, storage)
+
+    for sampled_path, _ in sampled_and_padded_paths:
+        sampled_path.unlink()
+
+    # Coarser levels are smaller, so they are ready first
+    for level in reversed(levels):
+        (global_dir / f"{level}_sampled").rmdir()
+        finish(global_dir / f"{level}")
+
+
+def convert_x_to_epoch(
+    nb_workers: int, level_path: Path, x: str, date_time_formats: List[str]
+) -> None:
+    """Parse, for all padded files of the level located in `level_path`, the `x` column
+    as datetimes, and store it as epoch seconds next to each file (see
+    `to_epoch_x`)."""
+    padded_paths = sorted(level_path.glob("*.csv"), key=lambda item: int(item.stem))
+    first_padded_path, *_ = padded_paths
+
+    with first_padded_path.open() as file_descriptor:
+        headers = next(file_descriptor).rstrip().split(",")
+
     arguments = [
-        (current_sampled_path, next_sampled_path, 2, index == 0)
-        for index, (current_sampled_path, next_sampled_path) in enumerate(
-            zip(current_sampled_paths, next_sampled_paths)
+        (
+            padded_path,
+            padded_path.with_suffix(EPOCH_X_SUFFIX),
+            x,
+            headers.index(x),
+            date_time_formats,
+            index == 0,
         )
+        for index, padded_path in enumerate(padded_paths)
     ]
 
-    with Pool(nb_workers) as pool:
-        pool.starmap(sample_sampled, arguments)
+    starmap(nb_workers, to_epoch_x, arguments)
 
-    sample_sampled_to_the_end(nb_workers, sampled_global_dir, index + 1)
+
+def convert_to_binary(
+    nb_workers: int, level_path: Path, x: str, by_column: bool = False
+) -> None:
+    """Convert all padded files of the level located in `level_path` into binary
+    files, with one file per column if `by_column` is set (see `to_columns`)."""
+    padded_paths = sorted(level_path.glob("*.csv"), key=lambda item: int(item.stem))
+    first_padded_path, *_ = padded_paths
+
+    dtype, indexes = get_dtype_and_indexes(
+        first_padded_path, x, all_numeric=level_path.name != "0"
+    )
+
+    if by_column:
+        starmap(
+            nb_workers,
+            to_columns,
+            [
+                (padded_path, dtype, indexes, index == 0)
+                for index, padded_path in enumerate(padded_paths)
+            ],
+        )
+
+        return
+
+    arguments = [
+        (padded_path, padded_path.with_suffix(".npy"), dtype, indexes, index == 0)
+        for index, padded_path in enumerate(padded_paths)
+    ]
+
+    starmap(nb_workers, to_binary, arguments)
+
+
+def stride(
+    source_path: Path,
+    dest_path: Path,
+    x: str,
+    nb_lines: int,
+    columns: Optional[List[str]] = None,
+) -> None:
+    """Write into `dest_path` (not padded) `nb_lines` lines spread over the whole CSV
+    file pointed by `source_path`, with the same columns as a sampled file (see
+    `sample`), where `min` and `max` of each column are both the value of the line.
+
+    Only these lines are read, so this is fast even for huge files. Lines are found by
+    seeking at regular byte offsets, then skipping to the next full line.
+    """
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    size = source_path.stat().st_size
+
+    with source_path.open("rb") as source_file, dest_path.open("w") as dest_file:
+        header_line = next(source_file)
+        headers = header_line.decode().rstrip().split(",")
+        first_values = next(source_file).decode().rstrip().split(",")
+
+        x_index = headers.index(x)
+
+        y_indexes = [
+            index
+            for index, value in enumerate(first_values)
+            if index != x_index
+            and is_castable_to_float(value)
+            and (columns is None or headers[index] in columns)
+        ]
+
+        dest_headers = [x] + [
+            f"{headers[index]}_{suffix}"
+            for index in y_indexes
+            for suffix in ("min", "max")
+        ]
+
+        dest_file.write(f'{",".join(dest_headers)}\n')
+
+        data_start = len(header_line)
+        previous_position = -1
+
+        for index in range(nb_lines):
+            source_file.seek(data_start + (size - data_start) * index // nb_lines)
+
+            if source_file.tell() > data_start:
+                source_file.readline()
+
+            position = source_file.tell()
+            line = source_file.readline()
+
+            if position <= previous_position or not line.endswith(b"\n"):
+                continue
+
+            previous_position = position
+            values = line.decode().rstrip().split(",")
+
+            dest_values = [values[x_index]] + [
+                values[index].strip() for index in y_indexes for _ in range(2)
+            ]
+
+            dest_file.write(f'{",".join(dest_values)}\n')
+
+
+def finish_level(
+    nb_workers: int,
+    level_path: Path,
+    x: str,
+    storage: Storage,
+    date_time_formats: Optional[List[str]],
+) -> None:
+    """Convert the padded files of the level located in `level_path` as requested by
+    `storage` and `date_time_formats` (see `pad_and_sample`), then mark the level as
+    ready."""
+    if date_time_formats is not None:
+        convert_x_to_epoch(nb_workers, level_path, x, date_time_formats)
+
+    if storage in (Storage.Binary, Storage.Columns):
+        convert_to_binary(
+            nb_workers, level_path, x, by_column=storage is Storage.Columns
+        )
+
+    (level_path / READY_FILE_NAME).touch()
+
+
+def write_overview(
+    source_path: Path,
+    dir_path: Path,
+    x: str,
+    finish: Callable[[Path], None],
+    columns: Optional[List[str]] = None,
+    storage: Storage = Storage.Text,
+) -> None:
+    """Write the overview of `source_path` into `dir_path` (see `stride`), keeping only
+    `columns` if set and padded as requested by `storage` (see `pad_chunks`), then
+    call `finish` on the overview directory."""
+    overview_sampled_path = dir_path / f"{OVERVIEW_DIR_NAME}_sampled" / "0.csv"
+    overview_path = dir_path / OVERVIEW_DIR_NAME / "0.csv"
+
+    stride(source_path, overview_sampled_path, x, NB_OVERVIEW_LINES, columns)
+    pad_chunks(1, [(overview_sampled_path, overview_path, None, None, None)], storage)
+    shutil.rmtree(overview_sampled_path.parent)
+    finish(overview_path.parent)
+
+
+def get_level_paths(dir_path: Path) -> List[Path]:
+    """Return level directories of `dir_path`, from the finest to the coarsest one."""
+    return sorted(
+        (path for path in dir_path.iterdir() if path.name.isdigit()),
+        key=lambda path: int(path.name),
+    )
+
+
+def get_chunk_paths(level_path: Path) -> List[Path]:
+    """Return files of all chunks of the level located in `level_path` (padded, binary
+    and epoch files)."""
+    return [path for path in level_path.iterdir() if path.name.split(".")[0].isdigit()]
+
+
+def get_nb_lines(level_path: Path, index: int, x: str) -> int:
+    """Return the number of lines (without the header) of the chunk `index` of the
+    level located in `level_path`, whatever its storage."""
+    padded_path = level_path / f"{index}.csv"
+    offsets_path = get_offsets_path(padded_path)
+    binary_path = padded_path.with_suffix(".npy")
+
+    if offsets_path.exists():
+        nb_lines = len(np.load(offsets_path, mmap_mode="r")) - 1
+    elif padded_path.exists():
+        with padded_path.open("rb") as file_descriptor:
+            line_size = len(file_descriptor.readline())
+
+        nb_lines = padded_path.stat().st_size // line_size if line_size > 0 else 0
+    else:
+        # Binary files do not contain the header
+        array_path = (
+            binary_path
+            if binary_path.exists()
+            else get_column_path(level_path, index, x)
+        )
+
+        return len(np.load(array_path, mmap_mode="r"))
+
+    return nb_lines - 1 if index == 0 and nb_lines > 0 else nb_lines
+
+
+def copy_without_header(source_path: Path, dest_path: Path) -> None:
+    """Copy the padded file pointed by `source_path` without its first line."""
+    with source_path.open("rb") as source_file, dest_path.open("wb") as dest_file:
+        source_file.readline()
+        shutil.copyfileobj(source_file, dest_file)
+
+
+def copy_offsets_without_header(source_path: Path, dest_path: Path) -> None:
+    """Copy offsets of lines pointed by `source_path` (see `write_indexed`), as if the
+    first line had been removed from their file."""
+    offsets = np.load(source_path)
+    np.save(dest_path, offsets[1:] - offsets[1])
+
+
+def commit_staging(dir_path: Path, deleted_paths: List[Path]) -> None:
+    """Replace files of `dir_path` by the ones written into its staging directory
+    (with the same relative paths), and remove `deleted_paths`.
+
+    The staging file is written (atomically) first, so once it exists, files are
+    replaced even if the process is interrupted meanwhile (see `recover_staging`).
+    """
+    staging_file_path = dir_path / STAGING_FILE_NAME
+    tmp_file_path = staging_file_path.with_suffix(".tmp")
+
+    with tmp_file_path.open("w") as file_descriptor:
+        json.dump(
+            {"deleted": [str(path.relative_to(dir_path)) for path in deleted_paths]},
+            file_descriptor,
+        )
+
+    os.replace(tmp_file_path, staging_file_path)
+    recover_staging(dir_path)
+
+
+def recover_staging(dir_path: Path) -> None:
+    """Complete the replacement of files of `dir_path` by staged ones, if it has been
+    committed (see `commit_staging`). Else, remove staged files, so `dir_path` is left
+    as it was.
+
+    Files are replaced while the `SUCCESS` file is removed, so levels are not opened
+    meanwhile (see `LevelFiles`). Calling it again has no effect.
+    """
+    staging_path = dir_path / STAGING_DIR_NAME
+    staging_file_path = dir_path / STAGING_FILE_NAME
+
+    if not staging_file_path.exists():
+        if staging_path.exists():
+            shutil.rmtree(staging_path)
+
+        return
+
+    with staging_file_path.open() as file_descriptor:
+        deleted = json.load(file_descriptor)["deleted"]
+
+    success_file = dir_path / SUCCESS_FILE_NAME
+
+    if success_file.exists():
+        success_file.unlink()
+
+    for name in deleted:
+        if (dir_path / name).exists():
+            (dir_path / name).unlink()
+
+    if staging_path.exists():
+        staged_paths = sorted(
+            path for path in staging_path.rglob("*") if path.is_file()
+        )
+
+        for staged_path in staged_paths:
+            dest_path = dir_path / staged_path.relative_to(staging_path)
+            dest_path.parent.mkdir(exist_ok=True)
+            os.replace(staged_path, dest_path)
+
+        shutil.rmtree(staging_path)
+
+    success_file.touch()
+    staging_file_path.unlink()
+
+
+def append(
+    source_path: Path,
+    dir_path: Path,
+    prefix_size: int,
+    size: int,
+    x: str,
+    nb_workers: int,
+    storage: Storage,
+    date_time_formats: Optional[List[str]],
+    replace_from: Optional[int] = None,
+) -> None:
+    """Extend, in place, the levels located in `dir_path`, where the first
+    `prefix_size` bytes of `source_path` have been processed, with the following bytes
+    up to `size`.
+
+    Only these bytes are processed: they are padded and sampled as new chunks (in a
+    temporary directory), whose files are then appended to each level. Chunks are
+    sampled independently, so existing chunks are not modified. If appended chunks
+    need more levels than existing ones (or the other way around), the coarsest level
+    (which contains one line per chunk) is repeated.
+
+    If `replace_from` is set, `prefix_size` has to be the start of the chunk
+    `replace_from` (see `write_source`): this chunk and following ones are removed
+    from all levels, and replaced by the appended ones.
+
+    Appended lines keep the same columns, and are sampled with the same period, as
+    existing ones (see `write_metadata`).
+
+    Appended files, the new overview and the new `source.json` file are staged, then
+    committed all at once (see `commit_staging`): if the process is interrupted,
+    levels are either left as they were, or completed next time they are used.
+    """
+    recover_staging(dir_path)
+
+    source = read_source(dir_path)
+    metadata = read_metadata(dir_path)
+    columns, period = metadata["columns"], metadata["period"]
+    staging_path = dir_path / STAGING_DIR_NAME
+
+    def finish(level_path: Path) -> None:
+        finish_level(nb_workers, level_path, x, storage, date_time_formats)
+
+    with TemporaryDirectory(prefix=TMP_DIR_PREFIX, dir=dir_path.parent) as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        appended_path = tmp_path / "appended.csv"
+
+        with source_path.open("rb") as source_file, appended_path.open(
+            "wb"
+        ) as appended_file:
+            header = source_file.readline()
+            appended_file.write(header)
+            source_file.seek(prefix_size)
+            appended_file.write(source_file.read(size - prefix_size))
+
+        pad_and_sample(
+            appended_path,
+            tmp_path,
+            x,
+            nb_workers,
+            storage,
+            date_time_formats,
+            columns=columns,
+            period=period,
+        )
+
+        appended_dir_path = get_dir_path(
+            appended_path, tmp_path, x, storage, date_time_formats, period=period
+        )
+
+        appended_chunk_starts = read_source(appended_dir_path)["chunk_starts"]
+
+        level_paths = get_level_paths(dir_path)
+        appended_level_paths = get_level_paths(appended_dir_path)
+
+        def get_chunk_index(chunk_path: Path) -> int:
+            return int(chunk_path.name.split(".")[0])
+
+        nb_chunks = (
+            len({get_chunk_index(path) for path in get_chunk_paths(dir_path / "0")})
+            if replace_from is None
+            else replace_from
+        )
+
+        # The index of `x` of a copied level is rebuilt (see `sparse_index`)
+        def ignore_removed_chunks(_: str, names: List[str]) -> List[str]:
+            return [
+                name
+                for name in names
+                if (
+                    name.split(".")[0].isdigit()
+                    and int(name.split(".")[0]) >= nb_chunks
+                )
+                or name in (INDEX_FILE_NAME, SPACING_FILE_NAME)
+            ]
+
+        for level in range(max(len(level_paths), len(appended_level_paths))):
+            staged_level_path = staging_path / str(level)
+
+            if level < len(level_paths):
+                staged_level_path.mkdir(parents=True)
+
+                # Lines of replaced chunks have changed: the index of `x` is only kept
+                # for lines of previous chunks
+                if replace_from is not None:
+                    truncate_sparse_index(
+                        level_paths[level],
+                        staged_level_path,
+                        sum(
+                            get_nb_lines(level_paths[level], index, x)
+                            for index in range(nb_chunks)
+                        ),
+                    )
+            else:
+                shutil.copytree(
+                    level_paths[-1], staged_level_path, ignore=ignore_removed_chunks
+                )
+
+            appended_level_path = appended_level_paths[
+                min(level, len(appended_level_paths) - 1)
+            ]
+
+            for chunk_path in get_chunk_paths(appended_level_path):
+                index, suffix = chunk_path.name.split(".", 1)
+                dest_path = staged_level_path / f"{nb_chunks + int(index)}.{suffix}"
+
+                if index == "0" and suffix == "csv" and nb_chunks > 0:
+                    copy_without_header(chunk_path, dest_path)
+                elif index == "0" and f".{suffix}" == OFFSETS_SUFFIX and nb_chunks > 0:
+                    copy_offsets_without_header(chunk_path, dest_path)
+                else:
+                    shutil.copyfile(chunk_path, dest_path)
+
+    write_overview(source_path, staging_path, x, finish, columns, storage)
+
+    write_source(
+        staging_path,
+        source_path,
+        source["string"],
+        size,
+        source["chunk_starts"][:nb_chunks]
+        + [
+            prefix_size + chunk_start - len(header)
+            for chunk_start in appended_chunk_starts
+        ],
+    )
+
+    # Removed chunks which are not replaced by appended ones, and the previous
+    # overview
+    deleted_paths = [
+        chunk_path
+        for level_path in level_paths
+        for chunk_path in get_chunk_paths(level_path)
+        if get_chunk_index(chunk_path) >= nb_chunks
+        and not (staging_path / level_path.name / chunk_path.name).exists()
+    ] + [
+        path
+        for path in (dir_path / OVERVIEW_DIR_NAME).iterdir()
+        if not (staging_path / OVERVIEW_DIR_NAME / path.name).exists()
+    ]
+
+    commit_staging(dir_path, deleted_paths)
+
+
+def get_last_line_end(path: Path, start: int, stop: int) -> int:
+    """Return the byte index following the last complete line of the file pointed by
+    `path` ending between `start` (excluded) and `stop` (included), or `start` if there
+    is none."""
+    with path.open("rb") as file_descriptor:
+        file_descriptor.seek(start)
+        data = file_descriptor.read(max(stop - start, 0))
+
+    return start + data.rfind(b"\n") + 1 if b"\n" in data else start
+
+
+def extend(
+    source_path: Path,
+    dir_path: Path,
+    x: str,
+    storage: Storage = Storage.Text,
+    date_time_formats: Optional[List[str]] = None,
+) -> bool:
+    """Extend, in place, levels located in `dir_path` (written by `pad_and_sample`)
+    with complete lines appended to `source_path` since the last call, but with at
+    most `MAX_FOLLOW_SIZE` bytes (see `append`).
+
+    While the last chunk is smaller than `MAX_GROWING_CHUNK_SIZE` bytes, it is
+    processed again with appended lines instead of appending a new chunk. Previous
+    chunks are processed again too, as long as they are not bigger than following
+    ones and appended lines, and at most `MAX_EXTEND_SIZE` bytes are processed (see
+    `MAX_EXTEND_SIZE`). Only one process is used, so the cost of each call is
+    bounded.
+
+    Return `True` if lines have been appended.
+    """
+    # An interrupted call could have to be completed
+    recover_staging(dir_path)
+
+    source = read_source(dir_path)
+    prefix_size, chunk_starts = source["size"], source["chunk_starts"]
+
+    size = get_last_line_end(
+        source_path,
+        prefix_size,
+        min(source_path.stat().st_size, prefix_size + MAX_FOLLOW_SIZE),
+    )
+
+    if size == prefix_size:
+        return False
+
+    # The last line could have been processed while it was still being written
+    is_last_line_complete = (
+        get_last_line_end(source_path, prefix_size - 1, prefix_size) == prefix_size
+    )
+
+    # Chunks from `replace_from` are processed again with appended lines
+    replace_from = len(chunk_starts)
+    chunk_stops = chunk_starts[1:] + [prefix_size]
+
+    while replace_from > 0:
+        start, stop = chunk_starts[replace_from - 1], chunk_stops[replace_from - 1]
+
+        is_growing = replace_from == len(chunk_starts) and (
+            size - start <= MAX_GROWING_CHUNK_SIZE or not is_last_line_complete
+        )
+
+        is_merged = stop - start <= size - stop and size - start <= MAX_EXTEND_SIZE
+
+        if not (is_growing or is_merged):
+            break
+
+        replace_from -= 1
+
+    append(
+        source_path,
+        dir_path,
+        chunk_stops[replace_from - 1] if replace_from > 0 else chunk_starts[0],
+        size,
+        x,
+        1,
+        storage,
+        date_time_formats,
+        replace_from if replace_from < len(chunk_starts) else None,
+    )
+
+    return True
+
+
+def follow(
+    source_csv_file_path: Path,
+    dir_path: Path,
+    x: str,
+    nb_workers: int,
+    storage: Storage = Storage.Text,
+    date_time_formats: Optional[List[str]] = None,
+    is_stopped: Callable[[], bool] = lambda: False,
+    hash_mode: HashMode = HashMode.Metadata,
+    columns: Optional[List[str]] = None,
+    period: int = SAMPLING_PERIOD,
+    on_following: Callable[[], None] = lambda: None,
+) -> None:
+    """Pad and sample `source_csv_file_path` into `dir_path` (see `get_dir_path`),
+    then keep extending its levels with lines appended to `source_csv_file_path`
+    (see `extend`), every `FOLLOW_PERIOD` seconds, until `is_stopped` returns `True`.
+
+    `is_stopped` is only checked between two extensions, once the file has been
+    processed: `on_following` is called then, so a caller could rather interrupt the
+    (possibly long) processing until it is called.
+
+    If the file has already been followed (or processed with `append_only`), only
+    lines appended since are processed. `hash_mode` is used to find whether the file
+    has already been processed (see `HashMode`), and `columns` are the columns to keep
+    and `period` the sampling period (see `pad_and_sample`).
+
+    Levels are extended in place, without renaming `dir_path`, so they could be
+    displayed (and opened again, see `LevelFiles`) while the file grows.
+    """
+    string = get_string(x, storage, date_time_formats, period)
+
+    pad_and_sample(
+        source_csv_file_path,
+        dir_path.parent,
+        x,
+        nb_workers,
+        storage,
+        date_time_formats,
+        append_only=True,
+        hash_mode=hash_mode,
+        columns=columns,
+        period=period,
+    )
+
+    processed_prefix = find_processed_prefix(
+        source_csv_file_path, dir_path.parent, string, columns
+    )
+
+    # With `HashMode.Content`, the file could have been processed at another path
+    processed_dir_path = (
+        processed_prefix[0]
+        if processed_prefix is not None
+        else get_dir_path(
+            source_csv_file_path,
+            dir_path.parent,
+            x,
+            storage,
+            date_time_formats,
+            hash_mode,
+            period,
+        )
+    )
+
+    if processed_dir_path != dir_path:
+        if dir_path.exists():
+            shutil.rmtree(dir_path)
+
+        processed_dir_path.rename(dir_path)
+
+    on_following()
+
+    while not is_stopped():
+        if not extend(source_csv_file_path, dir_path, x, storage, date_time_formats):
+            time.sleep(FOLLOW_PERIOD)
 
 
 def pad_and_sample(
-    source_csv_file_path: Path, dest_dir_path: Path, x: str, nb_workers: int
+    source_csv_file_path: Path,
+    dest_dir_path: Path,
+    x: str,
+    nb_workers: int,
+    storage: Storage = Storage.Text,
+    date_time_formats: Optional[List[str]] = None,
+    append_only: bool = False,
+    hash_mode: HashMode = HashMode.Metadata,
+    columns: Optional[List[str]] = None,
+    period: int = SAMPLING_PERIOD,
 ) -> bool:
     """Pad and sample `source_csv_file_path` into `dest_dir_path` with `x`.
 
+    If `date_time_formats` is set, `x` is parsed once as a datetime and stored as epoch
+    seconds for each level, so it has not to be parsed any more while plotting.
+
+    If `storage` is `Storage.Binary` (or `Storage.Columns`), padded and sampled files
+    are finally converted into binary files (or into one binary file per column). If
+    `storage` is `Storage.Indexed`, lines are not padded but indexed (see
+    `write_indexed`). If `storage` is `Storage.Fields`, each field is padded instead
+    of each line (see `pad_chunks`).
+
+    Levels are written so they could be displayed while the file is still being
+    processed. Each level directory contains a `READY` file once it is complete:
+    - First, an overview, built from `NB_OVERVIEW_LINES` lines spread over the file
+      (see `stride`)
+    - Then sampled levels, from the coarsest to the finest one
+    - Finally, the non sampled level
+    Once all levels are written, a `SUCCESS` file is written into the directory.
+
+    Each chunk of the file is sampled into all sampled levels by a single worker,
+    which also measures its lines (see `sample_chunk`), so the file is read once to be
+    sampled and once to be padded.
+
     If the file is already sampled, this function does not resample it but exits
-    immediately without error.
+    immediately without error. If a previous processing has been interrupted, the file
+    is processed again from scratch (but an interrupted `append` is completed, see
+    `recover_staging`).
+
+    If `append_only` is set and a previous version of the file, of which the current
+    file only appends lines, has already been processed, only appended lines are
+    processed (see `append`).
+
+    If `columns` is set, only these columns (and `x`) are kept, so unused columns are
+    neither padded nor sampled. Kept columns are recorded (see `write_metadata`) but
+    are not part of the hash: if the file has already been processed without some of
+    `columns`, it is processed again with columns of both.
+
+    Each sampled level merges `period` lines of the previous one into one line. A
+    higher period leads to fewer levels (so fewer files and fewer probes to select a
+    level, see `_Selector`), at the cost of reading more lines of the selected level.
+    It is recorded (see `write_metadata`) and part of the hash. If `period` < 2, a
+    `ValueError` is raised.
+
+    The file is processed into a directory named after its hash (see `HashMode`).
     """
+    if period < 2:
+        raise ValueError("`period` must be at least 2")
+
+    string = get_string(x, storage, date_time_formats, period)
+    dir_path = dest_dir_path / get_hash(source_csv_file_path, string, hash_mode)
+    size = source_csv_file_path.stat().st_size
 
-    dir_path = dest_dir_path / pseudo_hash(source_csv_file_path, x)
+    if columns is not None:
+        columns = sorted(set(columns) | {x})
 
-    try:
-        dir_path.mkdir(parents=True)
-    except FileExistsError:
-        success_file = dir_path / "SUCCESS"
+    # An interrupted `append` could have to be completed
+    recover_staging(dir_path)
 
-        if success_file.exists():
+    if (dir_path / SUCCESS_FILE_NAME).exists():
+        processed_columns = read_metadata(dir_path)["columns"]
+
+        if has_columns(processed_columns, columns):
             return False
 
-    padded_path = dir_path / "0"
-    padded_path.mkdir(parents=True, exist_ok=True)
+        columns = merge_columns(processed_columns, columns)
 
-    sampled_path_1 = dir_path / "1_sampled"
-    sampled_path_1.mkdir(parents=True, exist_ok=True)
+    # Left by an interrupted processing, or processed without some of `columns`
+    if dir_path.exists():
+        shutil.rmtree(dir_path)
 
-    chunks = compute_chunks(source_csv_file_path, nb_workers)
+    column_indexes = get_column_indexes(source_csv_file_path, columns)
 
-    arguments_pad = [
-        (source_csv_file_path, padded_path / f"{index}.csv", start_byte, stop_byte)
-        for index, (start_byte, stop_byte) in enumerate(chunks)
-    ]
+    def finish(level_path: Path) -> None:
+        finish_level(nb_workers, level_path, x, storage, date_time_formats)
 
-    with Pool(nb_workers) as pool:
-        pool.starmap(pad, arguments_pad)
+    processed_prefix = (
+        find_processed_prefix(source_csv_file_path, dest_dir_path, string, columns)
+        if append_only
+        else None
+    )
+
+    if processed_prefix is not None:
+        prefix_dir_path, prefix_size = processed_prefix
+
+        if prefix_size < size:
+            append(
+                source_csv_file_path,
+                prefix_dir_path,
+                prefix_size,
+                size,
+                x,
+                nb_workers,
+                storage,
+                date_time_formats,
+            )
+
+        prefix_dir_path.rename(dir_path)
+        return True
+
+    dir_path.mkdir(parents=True)
+    write_metadata(dir_path, columns, period)
+
+    by_field = storage is Storage.Fields
+    write_overview(source_csv_file_path, dir_path, x, finish, columns, storage)
+
+    chunks = compute_chunks(source_csv_file_path, nb_workers)
+
+    # Lines are measured while they are sampled, so they are then padded without
+    # being measured again
+    pad_indexes = (
+        get_field_indexes(source_csv_file_path, 0, column_indexes)
+        if by_field
+        else column_indexes
+    )
 
     arguments_sample = [
         (
             source_csv_file_path,
-            sampled_path_1 / f"{index}.csv",
+            dir_path,
+            index,
             x,
-            2,
+            period,
             start_byte,
             stop_byte,
+            columns,
+            pad_indexes,
+            by_field,
         )
         for index, (start_byte, stop_byte) in enumerate(chunks)
     ]
 
-    with Pool(nb_workers) as pool:
-        pool.starmap(sample, arguments_sample)
+    chunks_nb_levels, chunks_widths = zip(
+        *starmap(nb_workers, sample_chunk, arguments_sample)
+    )
+
+    complete_levels(dir_path, list(chunks_nb_levels))
+    pad_to_the_end(nb_workers, dir_path, 1, finish, storage)
+
+    padded_path = dir_path / "0"
+    field_widths = [max(widths) for widths in zip(*chunks_widths)]
 
-    sample_sampled_to_the_end(nb_workers, dir_path, 1)
-    pad_to_the_end(nb_workers, dir_path, 1)
+    arguments_pad = [
+        (
+            source_csv_file_path,
+            padded_path / f"{index}.csv",
+            start_byte,
+            stop_byte,
+            pad_indexes,
+            field_widths if by_field else None,
+            None if by_field else widths[0],
+        )
+        for index, ((start_byte, stop_byte), widths) in enumerate(
+            zip(chunks, chunks_widths)
+        )
+    ]
+
+    if storage is Storage.Indexed:
+        starmap(nb_workers, write_indexed, [argument[:5] for argument in arguments_pad])
+    else:
+        starmap(nb_workers, pad, arguments_pad)
+
+    finish(padded_path)
+
+    # Lines could have been appended since `size` has been computed
+    _, processed_size = chunks[-1]
+
+    write_source(
+        dir_path,
+        source_csv_file_path,
+        string,
+        processed_size,
+        get_chunk_starts(source_csv_file_path, chunks),
+    )
 
-    success_file = dir_path / "SUCCESS"
+    success_file = dir_path / SUCCESS_FILE_NAME
     success_file.touch()
 
     return True
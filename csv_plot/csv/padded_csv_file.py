@@ -2,14 +2,105 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import IO, Any, Iterator, List, Optional, Tuple, Union, cast
 
+import numpy as np
+
 from .gettable import Gettable
-from .padded_text_file import SplittedPaddedTextFile
+from .indexed_text_file import SplittedIndexedTextFile
+from .padded_text_file import (
+    SplittedFieldsPaddedTextFile,
+    SplittedMmapPaddedTextFile,
+    SplittedPaddedTextFile,
+)
+from .splitted_gettable import SplittedGettable
+
+COMMA, NEW_LINE, SPACE = ord(","), ord("\n"), ord(" ")
 
 
 class ColumnNotFoundError(Exception):
     pass
 
 
+def split_lines(lines: np.ndarray, indexes: List[int]) -> List[np.ndarray]:
+    """Split a block of padded lines on commas, in one vectorized pass.
+
+    lines  : An array of raw padded lines (see `MmapPaddedTextFile`)
+    indexes: The indexes of fields to extract
+
+    Return, for each index of `indexes`, an array (of type `S<width>`) containing the
+    corresponding field of each line.
+
+    Example:
+    split_lines(np.array([b"1,z,2  \n", b"13,w,14\n"]), [2, 0])
+        == [np.array([b"2", b"14"]), np.array([b"1", b"13"])]
+    """
+    nb_lines = len(lines)
+
+    if nb_lines == 0:
+        return [np.empty(0, dtype="S1") for _ in indexes]
+
+    matrix = np.ascontiguousarray(lines).view(np.uint8).reshape(nb_lines, -1)
+    _, line_size = matrix.shape
+
+    rows, separators = np.nonzero(matrix == COMMA)
+    nb_separators, remainder = divmod(len(separators), nb_lines)
+
+    if remainder != 0 or np.any(np.bincount(rows, minlength=nb_lines) != nb_separators):
+        # Lines do not have the same number of fields, fall back to a line by line
+        # split
+        splitted_lines = [line.rstrip().split(b",") for line in lines.tolist()]
+
+        return [
+            np.array([items[index] for items in splitted_lines], dtype=bytes)
+            for index in indexes
+        ]
+
+    if any(index > nb_separators for index in indexes):
+        raise IndexError("list index out of range")
+
+    is_content = (matrix != SPACE) & (matrix != NEW_LINE) & (matrix != 0)
+    content_stops = line_size - np.argmax(is_content[:, ::-1], axis=1)
+
+    separators = separators.reshape(nb_lines, nb_separators)
+    starts = np.hstack([np.zeros((nb_lines, 1), dtype=int), separators + 1])
+    stops = np.hstack([separators, content_stops[:, np.newaxis]])
+
+    def extract(index: int) -> np.ndarray:
+        field_starts, field_stops = starts[:, index], stops[:, index]
+        widths = field_stops - field_starts
+        width = max(int(widths.max()), 1)
+
+        offsets = np.arange(width)
+        positions = np.minimum(field_starts[:, np.newaxis] + offsets, line_size - 1)
+        fields = np.take_along_axis(matrix, positions, axis=1)
+        fields[offsets >= widths[:, np.newaxis]] = 0
+
+        return fields.view(f"S{width}").ravel()
+
+    return [extract(index) for index in indexes]
+
+
+def cast_column(column: np.ndarray, type: type) -> np.ndarray:
+    """Cast `column` (an array of bytes or an array of numbers) into `type`.
+
+    `float` and `int` are cast in a vectorized way. Other types (a datetime parser for
+    instance) are applied value by value, and lead to an array of objects.
+    """
+    if type is float:
+        return column.astype(np.float64)
+    elif type is int:
+        return column.astype(np.int64)
+
+    values = (
+        [value.decode().rstrip() for value in column.tolist()]
+        if column.dtype.kind == "S"
+        else column.tolist()
+    )
+
+    result = np.empty(len(values), dtype=object)
+    result[:] = [type(value) for value in values]
+    return result
+
+
 class _PaddedCSVFile(Gettable):
     """Represent a padded CSV file, where lines are reachable with O(1) complexity.
 
@@ -64,6 +155,8 @@ class _PaddedCSVFile(Gettable):
         files_descriptor_and_size: List[Tuple[IO, int]],
         columns_and_types: List[Tuple[str, type]],
         unwrap_if_one_column=False,
+        offsets: Optional[List[np.ndarray]] = None,
+        field_widths: Optional[List[List[int]]] = None,
     ) -> None:
         """Constructor.
 
@@ -78,13 +171,33 @@ class _PaddedCSVFile(Gettable):
         unwrap_if_one_column: Unwrap if only one column unwrap result.
                               Exemple: Instead of returning [[4], [5], [2]] return
                                        [4, 5, 2]
+        offsets: If set, files are not padded, and for each file, the byte offsets of
+                 its lines (see `write_indexed`)
+        field_widths: If set, fields of files are padded, and for each file, the width
+                      of each field (see `FieldsPaddedTextFile`)
 
         If at least one line of the file pointed by `file_descriptor` has not the same
-        length than others, a `TextFileNotPaddedError` is raised.
+        length than others (and `offsets` is not set), a `TextFileNotPaddedError` is
+        raised.
         """
-        padded_text_file = SplittedPaddedTextFile(files_descriptor_and_size, offset=0)
+
+        def text_file(offset: int) -> Union[SplittedGettable, SplittedIndexedTextFile]:
+            if offsets is None:
+                return SplittedPaddedTextFile(files_descriptor_and_size, offset)
+
+            return SplittedIndexedTextFile(
+                [
+                    (file_descriptor, file_offsets)
+                    for (file_descriptor, _), file_offsets in zip(
+                        files_descriptor_and_size, offsets
+                    )
+                ],
+                offset,
+            )
+
+        padded_text_file = text_file(offset=0)
         header_line = cast(str, padded_text_file[0])
-        headers = header_line.split(",")
+        headers = [header.rstrip() for header in header_line.split(",")]
 
         if columns_and_types == []:
             raise ValueError("`column_and_type` is an empty list")
@@ -103,9 +216,29 @@ class _PaddedCSVFile(Gettable):
             (header_to_index[column], type) for column, type in columns_and_types
         ]
 
-        self.__padded_text_file = SplittedPaddedTextFile(
-            files_descriptor_and_size, offset=1
+        self.__padded_text_file = text_file(offset=1)
+
+        # Slices of lines of indexed text files are already NumPy arrays
+        self.__mmap_padded_text_file = (
+            SplittedMmapPaddedTextFile(files_descriptor_and_size, offset=1)
+            if offsets is None
+            else self.__padded_text_file
         )
+        # Fields are then sliced out of lines, instead of splitting lines
+        self.__fields_padded_text_file = (
+            SplittedFieldsPaddedTextFile(
+                [
+                    (file_descriptor, size, file_field_widths)
+                    for (file_descriptor, size), file_field_widths in zip(
+                        files_descriptor_and_size, field_widths
+                    )
+                ],
+                offset=1,
+            )
+            if field_widths is not None
+            else None
+        )
+
         _, *others = columns_and_types
         self.__has_to_unwrap = unwrap_if_one_column and others == []
 
@@ -127,20 +260,23 @@ class _PaddedCSVFile(Gettable):
             items = line.split(",")
 
             return self.__unwrap_if_needed_single(
-                [type(items[index]) for index, type in self.__column_indexes_type]
-            )
-
-        def handle_slice(slice: slice) -> List[Union[Any, List]]:
-            return self.__unwrap_if_needed_multi(
                 [
-                    [
-                        type(items.split(",")[index])
-                        for index, type in self.__column_indexes_type
-                    ]
-                    for items in self.__padded_text_file[slice]
+                    type(items[index].rstrip())
+                    for index, type in self.__column_indexes_type
                 ]
             )
 
+        def handle_slice(slice: slice) -> List[Union[Any, List]]:
+            columns = [
+                column.tolist() for column in self.columns(slice.start, slice.stop)
+            ]
+
+            if self.__has_to_unwrap:
+                column, *_ = columns
+                return column
+
+            return [list(items) for items in zip(*columns)]
+
         if isinstance(line_number_or_slice, int):
             return handle_line_number(line_number_or_slice)
         elif isinstance(line_number_or_slice, slice):
@@ -153,13 +289,36 @@ class _PaddedCSVFile(Gettable):
             return item
         return items
 
-    def __unwrap_if_needed_multi(self, items: List[List]) -> List:
-        return (
-            [item for sublist in items for item in sublist]
-            if self.__has_to_unwrap
-            else items
+    def columns(
+        self,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        step: Optional[int] = None,
+    ) -> List[np.ndarray]:
+        """Return, for each requested column, an array containing the values of lines
+        between `start` (included) and `stop` (excluded).
+
+        Lines are parsed block by block, in a vectorized way (see `split_lines`). If
+        fields are padded, they are sliced out of lines instead (see
+        `FieldsPaddedTextFile`).
+
+        start: The first line of slice (included)
+        stop : The last line of slice (excluded)
+        step : If set, only one line every `step` lines is returned
+        """
+        indexes = [index for index, _ in self.__column_indexes_type]
+
+        columns = (
+            self.__fields_padded_text_file.fields(indexes, start, stop, step)
+            if self.__fields_padded_text_file is not None
+            else split_lines(self.__mmap_padded_text_file[start:stop:step], indexes)
         )
 
+        return [
+            cast_column(column, type)
+            for column, (_, type) in zip(columns, self.__column_indexes_type)
+        ]
+
     def get(
         self, start: Optional[int] = None, stop: Optional[int] = None
     ) -> Iterator[List]:
@@ -170,7 +329,10 @@ class _PaddedCSVFile(Gettable):
         """
         for line in self.__padded_text_file.get(start, stop):
             items = line.split(",")
-            toto = [type(items[index]) for index, type in self.__column_indexes_type]
+            toto = [
+                type(items[index].rstrip())
+                for index, type in self.__column_indexes_type
+            ]
             yield self.__unwrap_if_needed_single(toto)
 
 
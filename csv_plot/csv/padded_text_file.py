@@ -1,10 +1,19 @@
+import json
 from contextlib import contextmanager
 from csv_plot.csv.splitted_gettable import SplittedGettable
+from itertools import accumulate
+from mmap import ACCESS_READ, mmap
 from pathlib import Path
 from typing import IO, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
+
 from .gettable import Gettable
 
+# Suffix of files written next to padded files whose fields are padded (see
+# `FieldsPaddedTextFile`), following the convention <int>.widths.json
+FIELD_WIDTHS_SUFFIX = ".widths.json"
+
 
 class OffsetError(Exception):
     pass
@@ -166,6 +175,133 @@ class PaddedTextFile(Gettable):
         self.__file_descriptor.seek(self.line_size * line_number, 0)
 
 
+class MmapPaddedTextFile(PaddedTextFile):
+    """Represent a memory mapped padded text file, where lines are reachable with O(1)
+    complexity.
+
+    It behaves like `PaddedTextFile`, except that getting a slice of lines returns a
+    zero-copy NumPy view (of type `S<line_size>`) on the memory mapped file, instead of
+    a list of strings. Each item of this view is a raw line, including the padding and
+    the carriage return.
+
+    Usage:
+    padded_text_file = MmapPaddedTextFile(<file_descriptor>, <file_zise>, <offset>)
+
+    # Get the third line of the file
+    padded_text_file[2] # = "5,y,6,7,8"
+
+    # Get a view on lines between the third line (included) and the last line
+    # (excluded). Nothing is loaded into memory.
+    padded_text_file[2:-1] # = array([b"5,y,6,7,8    \n", ...], dtype="|S14")
+
+    # Get the same lines as a 2D uint8 array (one row per line)
+    padded_text_file[2:-1].view(np.uint8).reshape(-1, padded_text_file.line_size)
+    """
+
+    def __init__(self, file_descriptor: IO, file_size: int, offset: int) -> None:
+        """Constructor.
+
+        file_descriptor: The file descriptor pointing to the padded CSV file
+        file_size      : The file size (in bytes) of the padded CSV file pointed by
+                         `file_descriptor`
+        offset         : The number of first line(s) to skip. Must be >= 0
+
+        If not 0 <= `offset` <= number of lines, an `OffsetError` is raised.
+
+        If at least one line of the file pointed by `file_descriptor` has not the same
+        length than others, a `TextFileNotPaddedError` is raised.
+        """
+        super().__init__(file_descriptor, file_size, offset)
+
+        buffer = mmap(file_descriptor.fileno(), 0, access=ACCESS_READ)
+        self.line_size = buffer.find(b"\n") + 1
+
+        if file_size % self.line_size != 0:
+            raise TextFileNotPaddedError("text file is not padded")
+
+        self.__offset = offset
+        self.__lines = np.frombuffer(buffer, dtype=f"S{self.line_size}")
+
+    def __getitem__(
+        self, line_number_or_slice: Union[int, slice]
+    ) -> Union[str, np.ndarray]:
+        """Get a given line or a view on a given slice of lines.
+
+        line_number_or_slice: The line number or the slice where lines will be retrieved
+        """
+        if isinstance(line_number_or_slice, slice):
+            start, stop, step = line_number_or_slice.indices(len(self))
+            return self.__lines[self.__offset + start : self.__offset + stop : step]
+
+        return super().__getitem__(line_number_or_slice)
+
+
+class FieldsPaddedTextFile(MmapPaddedTextFile):
+    """Represent a memory mapped padded text file, where each field is right padded
+    with white spaces to the width of its column, so the byte offset of each field is
+    the same for all lines.
+
+    It behaves like `MmapPaddedTextFile`, but a field of a block of lines is sliced out
+    of the memory mapped file by byte range, without splitting lines.
+
+    Usage:
+    padded_text_file = FieldsPaddedTextFile(<file_descriptor>, <file_zise>, <offset>,
+                                            <field_widths>)
+
+    Example: With the following file, where `field_widths` is [2, 1, 2, 2, 2]:
+    a ,b,c ,d ,e
+    1 ,z,2 ,3 ,4
+    13,w,14,15,16
+
+    padded_text_file.fields([3, 0], 1, 3) # = [array([b"3 ", b"15"]),
+                                          #    array([b"1 ", b"13"])]
+    """
+
+    def __init__(
+        self, file_descriptor: IO, file_size: int, offset: int, field_widths: List[int]
+    ) -> None:
+        """Constructor.
+
+        file_descriptor: The file descriptor pointing to the padded CSV file
+        file_size      : The file size (in bytes) of the padded CSV file pointed by
+                         `file_descriptor`
+        offset         : The number of first line(s) to skip. Must be >= 0
+        field_widths   : The width of each field (see `pad_fields`)
+
+        If not 0 <= `offset` <= number of lines, an `OffsetError` is raised.
+
+        If at least one line of the file pointed by `file_descriptor` has not the same
+        length than others, a `TextFileNotPaddedError` is raised.
+        """
+        super().__init__(file_descriptor, file_size, offset)
+
+        field_starts = [0] + list(accumulate(width + 1 for width in field_widths))
+        self.__field_starts_and_widths = list(zip(field_starts, field_widths))
+
+    def fields(
+        self,
+        indexes: List[int],
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        step: Optional[int] = None,
+    ) -> List[np.ndarray]:
+        """Return, for each index of `indexes`, an array (of type `S<width>`)
+        containing the corresponding (padded) field of lines between `start`
+        (included) and `stop` (excluded).
+
+        step: If set, only one line every `step` lines is returned
+        """
+        lines = np.ascontiguousarray(self[start:stop:step])
+        matrix = lines.view(np.uint8).reshape(len(lines), self.line_size)
+
+        def extract(index: int) -> np.ndarray:
+            field_start, width = self.__field_starts_and_widths[index]
+            field = matrix[:, field_start : field_start + width]
+            return np.ascontiguousarray(field).view(f"S{max(width, 1)}").ravel()
+
+        return [extract(index) for index in indexes]
+
+
 class SplittedPaddedTextFile(SplittedGettable):
     """Splitted Padded Text File"""
 
@@ -182,11 +318,156 @@ class SplittedPaddedTextFile(SplittedGettable):
             for file_descriptor, file_size in files_descriptor_and_size
         ]
 
-        super().__init__(padded_text_files, offset)  # type:ignore
+        super().__init__(padded_text_files, offset)  # type: ignore
+
+
+class SplittedMmapPaddedTextFile(SplittedGettable):
+    """Splitted Memory Mapped Padded Text File
+
+    Getting a slice of lines returns a NumPy view (see `MmapPaddedTextFile`). This view
+    is zero-copy if all lines are located in the same file.
+    """
+
+    def __init__(self, files_descriptor_and_size: List[Tuple[IO, int]], offset: int):
+        """Initializer.
+
+        files_descriptor_and_size:
+            A list of tuple (<file descriptor>, <size of corresponding file>)
+
+        offset: The offset to apply to the first file descriptor
+        """
+        padded_text_files = [
+            MmapPaddedTextFile(file_descriptor, file_size, offset=0)
+            for file_descriptor, file_size in files_descriptor_and_size
+        ]
+
+        super().__init__(padded_text_files, offset)  # type: ignore
+
+    def __getitem__(self, index_or_slice: Union[int, slice]) -> Union[str, np.ndarray]:
+        """Get given line or a view on a given slice of lines.
+
+        index_or_slice: The line number or the slice where lines will be retrieved
+        """
+        if not isinstance(index_or_slice, slice):
+            return super().__getitem__(index_or_slice)
+
+        views = [
+            padded_text_file[start:stop]
+            for padded_text_file, (start, stop) in self._get_gettables_and_slices(
+                index_or_slice.start, index_or_slice.stop
+            )
+        ]
+
+        step = index_or_slice.step
+
+        if step is not None and step != 1:
+            views_starts = [0] + list(accumulate(len(view) for view in views))
+
+            views = [
+                view[-view_start % step :: step]
+                for view, view_start in zip(views, views_starts)
+            ]
+
+        if len(views) == 0:
+            return np.empty(0, dtype="S1")
+
+        if len(views) == 1:
+            (view,) = views
+            return view
+
+        # If files have different line sizes, shorter lines are right padded with NUL
+        # bytes.
+        return np.concatenate(views)
+
+
+class SplittedFieldsPaddedTextFile(SplittedGettable):
+    """Splitted Fields Padded Text File
+
+    Getting fields of a slice of lines returns NumPy arrays (see
+    `FieldsPaddedTextFile`). Files could have different field widths.
+    """
+
+    def __init__(
+        self,
+        files_descriptor_size_and_field_widths: List[Tuple[IO, int, List[int]]],
+        offset: int,
+    ):
+        """Initializer.
+
+        files_descriptor_size_and_field_widths:
+            A list of tuple (<file descriptor>, <size of corresponding file>,
+            <field widths of corresponding file>)
+
+        offset: The offset to apply to the first file descriptor
+        """
+        padded_text_files = [
+            FieldsPaddedTextFile(file_descriptor, file_size, 0, field_widths)
+            for file_descriptor, file_size, field_widths in (
+                files_descriptor_size_and_field_widths
+            )
+        ]
+
+        super().__init__(padded_text_files, offset)  # type: ignore
+
+    def fields(
+        self,
+        indexes: List[int],
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        step: Optional[int] = None,
+    ) -> List[np.ndarray]:
+        """Same as `FieldsPaddedTextFile.fields`."""
+        parts = [
+            padded_text_file.fields(indexes, file_start, file_stop)
+            for padded_text_file, (
+                file_start,
+                file_stop,
+            ) in self._get_gettables_and_slices(start, stop)
+        ]
+
+        if step is not None and step != 1:
+            parts_starts = [0] + list(accumulate(len(part[0]) for part in parts))
+
+            parts = [
+                [field[-part_start % step :: step] for field in part]
+                for part, part_start in zip(parts, parts_starts)
+            ]
+
+        if len(parts) == 0:
+            return [np.empty(0, dtype="S1") for _ in indexes]
+
+        # Fields of files with different widths are right padded with NUL bytes
+        return [np.concatenate(fields) for fields in zip(*parts)]
+
+
+def get_field_widths_path(path: Path) -> Path:
+    """Return the path of the field widths of the padded file pointed by `path`, named
+    <int>.csv (see `FieldsPaddedTextFile`)."""
+    return path.with_name(f"{path.stem}{FIELD_WIDTHS_SUFFIX}")
+
+
+def write_field_widths(path: Path, field_widths: List[int]) -> None:
+    """Record the field widths of the padded file pointed by `path`."""
+    with get_field_widths_path(path).open("w") as file_descriptor:
+        json.dump(field_widths, file_descriptor)
+
+
+def read_field_widths(path: Path) -> Optional[List[int]]:
+    """Return the field widths of the padded file pointed by `path`, or `None` if its
+    fields are not padded."""
+    field_widths_path = get_field_widths_path(path)
+
+    if not field_widths_path.exists():
+        return None
+
+    with field_widths_path.open() as file_descriptor:
+        return json.load(file_descriptor)
 
 
 @contextmanager
-def padded_text_file(path: Path, offset: int = 0) -> Iterator[PaddedTextFile]:
+def padded_text_file(
+    path: Path, offset: int = 0, memory_map: bool = False
+) -> Iterator[PaddedTextFile]:
     """Represent a padded text file, where lines are reachable with O(1) complexity.
 
     A padded text file is a text file where all lines have exactly the same length.
@@ -215,6 +496,11 @@ def padded_text_file(path: Path, offset: int = 0) -> Iterator[PaddedTextFile]:
                 For example: ptf[:] will load all the file in memory.
                 If possible, use ptf.get(start=a, stop=b) instead of ptf[a, b]
         ptf[2:-1]
+
+    If `memory_map` is set, a `MmapPaddedTextFile` is used instead: getting a slice of
+    lines then returns a zero-copy NumPy view instead of a list of strings.
     """
     with path.open() as file_descriptor:
-        yield PaddedTextFile(file_descriptor, path.stat().st_size, offset)
+        yield (MmapPaddedTextFile if memory_map else PaddedTextFile)(
+            file_descriptor, path.stat().st_size, offset
+        )
@@ -1,12 +1,29 @@
-from contextlib import ExitStack, contextmanager
+import math
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from glob import glob
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 from pydantic import BaseModel
 
-from .sorted_padded_csv_file import _SortedPaddedCSVFile, sorted_padded_csv_file
+from .level_files import OVERVIEW_LEVEL, LevelFiles, Levels
+from .pad_and_sample import SAMPLING_PERIOD, read_metadata
+from .sorted_padded_csv_file import _SortedPaddedCSVFile
+from .tile_cache import TileCache
+
+# Number of lines read between two checks of query cancellation
+CHUNK_SIZE = 65536
+
+# A coarse level is fast to read if it contains at most `resolution / COARSE_DIVISOR`
+# lines
+COARSE_DIVISOR = 4
+
+
+class QueryCancelledError(Exception):
+    pass
 
 
 class Selected(BaseModel):
@@ -18,6 +35,32 @@ class Selected(BaseModel):
     name_to_y: Dict[str, Y]
 
 
+@dataclass(eq=False)
+class Selection:
+    """The data returned by `_Selector`, as arrays.
+
+    Unlike `Selected`, nothing is validated nor copied: arrays are the ones read from
+    the file. Use `to_selected` to get the equivalent (validated) `Selected` object.
+    """
+
+    @dataclass(eq=False)
+    class Y:
+        mins: np.ndarray
+        maxs: np.ndarray
+
+        def to_selected(self) -> Selected.Y:
+            return Selected.Y(mins=self.mins.tolist(), maxs=self.maxs.tolist())
+
+    xs: np.ndarray
+    name_to_y: Dict[str, Y]
+
+    def to_selected(self) -> Selected:
+        return Selected(
+            xs=self.xs.tolist(),
+            name_to_y={name: y.to_selected() for name, y in self.name_to_y.items()},
+        )
+
+
 class _Selector:
     """This class is a helper to get the requested data as closest as possible to a
     given resolution.
@@ -55,15 +98,15 @@ class _Selector:
     sel = _Selector(
             <spcf corresponding to `0.csv`>,
             [("b", float), ("d", float)],
-            {
+            [
+              <spcf corresponding to `1.csv`>,
               <spcf corresponding to `2.csv`>,
-              <spcf corresponding to `3.csv`>,
-              <spcf corresponding to `4.csv`>
-            },
+              <spcf corresponding to `3.csv`>
+            ],
             [("b_min", float), ("b_max", float), ("d_min", float), ("d_max", float)]
           )
 
-    sel[::6] == Selected(
+    sel[::6].to_selected() == Selected(
                 xs=[1, 5, 9, 13, 17],
                 name_to_y={
                   "b": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
@@ -71,7 +114,7 @@ class _Selector:
                 },
               )
 
-    sel[5:13:6] == sel[4.5:13.5:6]
+    sel[5:13:6].to_selected() == sel[4.5:13.5:6].to_selected()
               == Selected(
                    xs=[5, 9, 13],
                    name_to_y={
@@ -80,7 +123,7 @@ class _Selector:
                    },
                  )
 
-    sel[::4] == Selected(
+    sel[::4].to_selected() == Selected(
                 xs=[1, 5, 9, 13, 17],
                 name_to_y={
                   "b": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
@@ -88,7 +131,7 @@ class _Selector:
                 },
               )
 
-    sel[5:13:4] == sel[4.5:13.5:4]
+    sel[5:13:4].to_selected() == sel[4.5:13.5:4].to_selected()
               == Selected(
                    xs=[5, 9, 13],
                    name_to_y={
@@ -97,7 +140,7 @@ class _Selector:
                    },
                  )
 
-    sel[::3] == Selected(
+    sel[::3].to_selected() == Selected(
                 xs=[1, 9, 17],
                 name_to_y={
                   "b": Selected.Y(mins=[2, 10, 18], maxs=[6, 14, 18]),
@@ -105,7 +148,7 @@ class _Selector:
                 },
               )
 
-    sel[1:9:2] == sel[0.5:9.5:2]
+    sel[1:9:2].to_selected() == sel[0.5:9.5:2].to_selected()
              == Selected(
                   xs=[1, 9],
                   name_to_y={
@@ -117,60 +160,243 @@ class _Selector:
 
     def __init__(
         self,
-        spcf: _SortedPaddedCSVFile,
+        spcf: Optional[_SortedPaddedCSVFile],
         ys: List[str],
-        sampled_spcfs: Set[_SortedPaddedCSVFile],
+        sampled_spcfs: List[Optional[_SortedPaddedCSVFile]],
         sampled_ys: List[str],
+        period: int = SAMPLING_PERIOD,
+        cache: Optional[TileCache] = None,
+        overview: Optional[_SortedPaddedCSVFile] = None,
+        open_levels: Optional[Callable[[], Levels]] = None,
     ) -> None:
         """Initializer:
 
         spcf                : A (non sampled) Sorted Padded CSV file
         ys_and_type         : Y names and Y types of `spcf` file
 
-        sampled_spcfs       : A set of sampled Sorted Padded CSV files corresponding to
-                              spcf
+        sampled_spcfs       : A list of sampled Sorted Padded CSV files corresponding
+                              to spcf, from the finest to the coarsest one
 
         sampled_ys_and_types: Y names an Y types corresponding to sampled_spcfs files
                               Note: This value has to be the same for all sampled_spcfs
+
+        period              : The sampling period between two consecutive levels
+
+        cache               : If set, lines are read through this cache
+
+        overview            : A coarse sampled file, used while no other level is
+                              ready (see `pad_and_sample`)
+
+        open_levels         : If set, called by `refresh` to get levels which became
+                              ready or which changed since (see `LevelFiles`)
+
+        While the file is still being processed, `spcf` and some of `sampled_spcfs`
+        could be `None`. Only ready levels are then read.
         """
-        self.__spcf = spcf
-        self.__sampled_spcfs = sampled_spcfs
-        self.__all_spcfs = self.__sampled_spcfs.union({self.__spcf})
+        self.__period = period
+        self.__cache = cache
+        self.__open_levels = open_levels
+        self.__set_levels([spcf] + sampled_spcfs, overview)
 
         self.__y_names = ys
         self.__sampled_y_names = sampled_ys
 
-    def __get_nb_lines_between(
-        self, start: Any, stop: Any
-    ) -> Dict[_SortedPaddedCSVFile, int]:
-        """Get the number of lines between `start` and `stop` for each Sorted Padded CSV
-        file."""
-        return {
-            spcf: spcf.number_of_lines_between(start, stop) for spcf in self.__all_spcfs
-        }
+    def __set_levels(
+        self,
+        all_spcfs: List[Optional[_SortedPaddedCSVFile]],
+        overview: Optional[_SortedPaddedCSVFile],
+    ) -> None:
+        self.__spcf = all_spcfs[0] if all_spcfs != [] else None
+        self.__all_spcfs = all_spcfs
+        self.__overview = overview
+
+    @property
+    def nb_levels(self) -> int:
+        """The number of levels (the non sampled file and all sampled files)."""
+        return len(self.__all_spcfs)
+
+    @property
+    def is_complete(self) -> bool:
+        """`True` if all levels are ready."""
+        return self.__all_spcfs != [] and all(
+            spcf is not None for spcf in self.__all_spcfs
+        )
+
+    def refresh(self) -> bool:
+        """Take into account levels which became ready, or whose lines changed (because
+        lines have been appended to the file, see `follow`), since the last call.
+
+        Cached lines which changed are evicted from the cache.
+
+        Return `True` if at least one level became ready or changed.
+        """
+        if self.__open_levels is None:
+            return False
+
+        all_spcfs, overview, level_to_first_changed_line = self.__open_levels()
+
+        def nb_ready(all_spcfs: List[Optional[_SortedPaddedCSVFile]]) -> int:
+            return sum(spcf is not None for spcf in all_spcfs)
+
+        has_changed = (
+            nb_ready(all_spcfs) > nb_ready(self.__all_spcfs)
+            or (overview is not None and self.__overview is None)
+            or level_to_first_changed_line != {}
+        )
+
+        if self.__cache is not None:
+            for level, line in level_to_first_changed_line.items():
+                self.__cache.invalidate(level, line)
+
+        self.__set_levels(all_spcfs, overview)
+        return has_changed
+
+    def __spcf_of(self, level: int) -> Optional[_SortedPaddedCSVFile]:
+        return self.__overview if level == OVERVIEW_LEVEL else self.__all_spcfs[level]
+
+    def __number_of_lines_between(self, level: int, start: Any, stop: Any) -> int:
+        spcf = self.__spcf_of(level)
+        assert spcf is not None, f"Level {level} is not ready"
+        return spcf.number_of_lines_between(start, stop)
+
+    def prefetch(self, level: int, start: Any, stop: Any) -> Iterator[None]:
+        """Read into the cache the lines of `level` between `start` and `stop`,
+        yielding after each tile read from disk (see `TileCache.prefetch`).
+
+        Does nothing if the selector has no cache.
+        """
+        spcf = self.__spcf_of(level)
+
+        if self.__cache is None or spcf is None:
+            return
+
+        yield from self.__cache.prefetch(
+            level, spcf, *spcf.line_numbers_between(start, stop)
+        )
+
+    def level_of(self, start: Any, stop: Any, resolution: int) -> int:
+        """Return the level `sel[start:stop:resolution]` would read lines from.
+
+        While not all levels are ready, only ready levels are considered. If none of
+        them is ready, `OVERVIEW_LEVEL` is returned.
+        """
+        if self.is_complete:
+            return self.__get_max_resolution_lines_between(start, stop, resolution)
+
+        return self.__get_ready_level_of(start, stop, resolution)
+
+    def coarse_level_of(
+        self, start: Any, stop: Any, resolution: int, level: int
+    ) -> Optional[int]:
+        """Return a level coarser than `level` which is fast to read between `start`
+        and `stop`: the finest one entirely in cache, or else the finest one containing
+        at most `resolution / COARSE_DIVISOR` lines.
+
+        Return `None` if `level` itself is entirely in cache (or if there is no cache),
+        if it contains less lines than `resolution` (so it is fast to read anyway), or
+        if there is no coarser level.
+        """
+        spcf = self.__spcf_of(level)
+
+        if level == OVERVIEW_LEVEL or self.__cache is None or spcf is None:
+            return None
+
+        if self.__is_cached(level, start, stop):
+            return None
+
+        if spcf.number_of_lines_between(start, stop) < resolution:
+            return None
+
+        coarse_levels = [
+            coarse_level
+            for coarse_level in range(level + 1, len(self.__all_spcfs))
+            if self.__all_spcfs[coarse_level] is not None
+        ]
+
+        for coarse_level in coarse_levels:
+            if self.__is_cached(coarse_level, start, stop):
+                return coarse_level
+
+        for coarse_level in coarse_levels:
+            nb_lines = self.__number_of_lines_between(coarse_level, start, stop)
+
+            if nb_lines * COARSE_DIVISOR <= resolution:
+                return coarse_level
+
+        return coarse_levels[-1] if len(coarse_levels) > 0 else None
+
+    def __is_cached(self, level: int, start: Any, stop: Any) -> bool:
+        spcf = self.__spcf_of(level)
+        assert self.__cache is not None and spcf is not None
+
+        return self.__cache.contains(
+            level, spcf, *spcf.line_numbers_between(start, stop)
+        )
+
+    def __get_ready_level_of(self, start: Any, stop: Any, resolution: int) -> int:
+        """Return the coarsest ready level where the number of lines between `start`
+        and `stop` is higher than `resolution`, or else the finest ready level.
+
+        Return `OVERVIEW_LEVEL` if no level is ready.
+        """
+        ready_levels = [
+            level for level, spcf in enumerate(self.__all_spcfs) if spcf is not None
+        ]
+
+        matching_levels = [
+            level
+            for level in ready_levels
+            if self.__number_of_lines_between(level, start, stop) >= resolution
+        ]
+
+        if matching_levels != []:
+            return max(matching_levels)
+
+        return min(ready_levels) if ready_levels != [] else OVERVIEW_LEVEL
 
     def __get_max_resolution_lines_between(
         self, start: Any, stop: Any, resolution: int
-    ) -> _SortedPaddedCSVFile:
-        """Return the smallest Sorted Padded CSV file where the number of lines between
-        `start` and `stop` is higher than `resolution`"""
-        spcf_to_nb_lines = self.__get_nb_lines_between(start, stop)
-        spcf_max = max(spcf_to_nb_lines, key=spcf_to_nb_lines.get)  # type: ignore
-
-        spcf_to_nb_lines_filtered = {
-            path: nb_lines
-            for path, nb_lines in spcf_to_nb_lines.items()
-            if nb_lines >= resolution
-        }
-
-        return (
-            min(spcf_to_nb_lines_filtered, key=spcf_to_nb_lines_filtered.get)  # type: ignore
-            if len(spcf_to_nb_lines_filtered) > 0
-            else spcf_max
+    ) -> int:
+        """Return the level of the smallest Sorted Padded CSV file where the number of
+        lines between `start` and `stop` is higher than `resolution`.
+
+        Each level contains roughly `period` times less lines than the previous one, so
+        the matching level is estimated from the number of lines of the non sampled
+        file, then only checked against its neighbours.
+        """
+        assert self.__spcf is not None
+        nb_lines = self.__spcf.number_of_lines_between(start, stop)
+
+        if nb_lines < resolution:
+            return 0
+
+        def nb_lines_of(level: int) -> int:
+            return (
+                self.__number_of_lines_between(level, start, stop)
+                if level > 0
+                else nb_lines
+            )
+
+        level = min(
+            int(math.log(nb_lines / resolution, self.__period)),
+            len(self.__all_spcfs) - 1,
         )
 
-    def __getitem__(self, x_or_slice: Union[Any, slice]) -> Selected:
-        """Return a Selected object where the number of lines are as close as (but
+        level_nb_lines = nb_lines_of(level)
+
+        while level_nb_lines < resolution:
+            level -= 1
+            level_nb_lines = nb_lines_of(level)
+
+        while (
+            level + 1 < len(self.__all_spcfs) and nb_lines_of(level + 1) >= resolution
+        ):
+            level += 1
+
+        return level
+
+    def __getitem__(self, x_or_slice: Union[Any, slice]) -> Selection:
+        """Return a Selection object where the number of lines are as close as (but
         always greater than) the resolution."""
         assert isinstance(x_or_slice, slice), "Only slice is supported for `x_or_slice`"
 
@@ -179,29 +405,88 @@ class _Selector:
         if step is None:
             raise ValueError("Step of slice has to be defined")
 
-        spcf = self.__get_max_resolution_lines_between(start, stop, step)
-        xs, y_in_rows = zip(*spcf[start:stop])
-        y_in_columns = list(zip(*y_in_rows))
+        return self.select(start, stop, step)
+
+    def select(
+        self,
+        start: Any,
+        stop: Any,
+        resolution: int,
+        is_cancelled: Callable[[], bool] = lambda: False,
+        level: Optional[int] = None,
+    ) -> Selection:
+        """Same as `sel[start:stop:resolution]`, but lines are read chunk by chunk of
+        `CHUNK_SIZE` lines.
+
+        Before reading each chunk, `is_cancelled` is called. If it returns `True`, the
+        query is abandoned and a `QueryCancelledError` is raised.
+
+        If `level` is set, lines are read from this level instead of the one matching
+        `resolution` (see `level_of`).
+
+        If no level is ready yet, an empty selection is returned.
+        """
+        if level is None:
+            level = self.level_of(start, stop, resolution)
+
+        spcf = self.__spcf_of(level)
 
-        if spcf == self.__spcf:
+        if spcf is None:
+            return Selection(
+                xs=np.empty(0),
+                name_to_y={
+                    y_name: Selection.Y(mins=np.empty(0), maxs=np.empty(0))
+                    for y_name in self.__y_names
+                },
+            )
+
+        line_start, line_stop = spcf.line_numbers_between(start, stop)
+
+        def read(
+            chunk_start: int, chunk_stop: int
+        ) -> Tuple[np.ndarray, List[np.ndarray]]:
+            return (
+                self.__cache.columns_of_lines(level, spcf, chunk_start, chunk_stop)
+                if self.__cache is not None
+                else spcf.columns_of_lines(chunk_start, chunk_stop)
+            )
+
+        chunks = []
+
+        for chunk_start in range(line_start, line_stop, CHUNK_SIZE):
+            if is_cancelled():
+                raise QueryCancelledError("A newer query is pending")
+
+            chunks.append(read(chunk_start, min(chunk_start + CHUNK_SIZE, line_stop)))
+
+        if len(chunks) == 0:
+            xs, y_columns = read(line_start, line_stop)
+        elif len(chunks) == 1:
+            ((xs, y_columns),) = chunks
+        else:
+            chunks_xs, chunks_y_columns = zip(*chunks)
+            xs = np.concatenate(chunks_xs)
+            y_columns = [np.concatenate(parts) for parts in zip(*chunks_y_columns)]
+
+        if level == 0:
             name_to_y = {
-                y_name: Selected.Y(mins=y_in_column, maxs=y_in_column)
-                for y_name, y_in_column in zip(self.__y_names, y_in_columns)
+                y_name: Selection.Y(mins=y_column, maxs=y_column)
+                for y_name, y_column in zip(self.__y_names, y_columns)
             }
         else:
             sampled_name_to_y = {
-                name: y for name, y in zip(self.__sampled_y_names, y_in_columns)
+                name: y for name, y in zip(self.__sampled_y_names, y_columns)
             }
 
             name_to_y = {
-                y_name: Selected.Y(
+                y_name: Selection.Y(
                     mins=sampled_name_to_y[f"{y_name}_min"],
                     maxs=sampled_name_to_y[f"{y_name}_max"],
                 )
                 for y_name in self.__y_names
             }
 
-        return Selected(xs=xs, name_to_y=name_to_y)
+        return Selection(xs=xs, name_to_y=name_to_y)
 
 
 @contextmanager
@@ -209,14 +494,20 @@ def selector(
     dir_path: Path,
     x_and_type: Tuple[str, type],
     ys: List[str],
+    cache: Optional[TileCache] = None,
 ) -> Iterator[_Selector]:
     """Select the sampled file matching as close as possible a given resolution.
 
     dir_path   : Directory where all the files (sampled and non sampled) are located.
                  Non sampled path name's HAS to be `0.csv`
+                 Files could be either padded CSV files, or binary files (see
+                 `Storage`)
 
-    x_and_type : Name and the type of X value
+    x_and_type : Name and the type of X value. If `x` has been stored as epoch
+                 seconds while preprocessing (see `pad_and_sample`), these floats are
+                 used instead, whatever the type.
     ys: ys name
+    cache      : If set, lines are read through this cache (see `TileCache`)
 
     Usage:
     ======
@@ -256,7 +547,7 @@ def selector(
     |- 3.csv
 
     with selector(dir_path, ("a", int), ["b", "d"]) as sel:
-        sel[::100] == Selected(
+        sel[::100].to_selected() == Selected(
                     xs=[1, 5, 9, 13, 17],
                     name_to_y={
                     "b": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
@@ -264,7 +555,7 @@ def selector(
                     },
                 )
 
-        sel[5:13:100] == sel[4.5:13.5:100]
+        sel[5:13:100].to_selected() == sel[4.5:13.5:100].to_selected()
                   == Selected(
                        xs=[5, 9, 13],
                        name_to_y={
@@ -273,7 +564,7 @@ def selector(
                        },
                      )
 
-        sel[::4] == Selected(
+        sel[::4].to_selected() == Selected(
                     xs=[1, 5, 9, 13, 17],
                     name_to_y={
                       "b": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
@@ -281,7 +572,7 @@ def selector(
                     },
                   )
 
-        sel[5:13:4] == sel[4.5:13.5:4]
+        sel[5:13:4].to_selected() == sel[4.5:13.5:4].to_selected()
                   == Selected(
                        xs=[5, 9, 13],
                        name_to_y={
@@ -290,7 +581,7 @@ def selector(
                        },
                      )
 
-        sel[::3] == Selected(
+        sel[::3].to_selected() == Selected(
                     xs=[1, 9, 17],
                     name_to_y={
                       "b": Selected.Y(mins=[2, 10, 18], maxs=[6, 14, 18]),
@@ -298,7 +589,7 @@ def selector(
                     },
                   )
 
-        sel[1:9:2] == sel[0.5:9.5]
+        sel[1:9:2].to_selected() == sel[0.5:9.5].to_selected()
                  == Selected(
                       xs=[1, 9],
                       name_to_y={
@@ -308,24 +599,24 @@ def selector(
                     )
 
     """
-    sampled_paths = [
-        path for path in dir_path.iterdir() if path.name not in ("0", "SUCCESS")
-    ]
-
     sampled_ys = [
         item for sublist in [[f"{y}_min", f"{y}_max"] for y in ys] for item in sublist
     ]
 
-    with ExitStack() as stack:
-        spcf = stack.enter_context(
-            sorted_padded_csv_file(dir_path / "0", x_and_type, ys)
+    with LevelFiles(dir_path, x_and_type, ys, sampled_ys) as level_files:
+        all_spcfs, overview, _ = level_files.open()
+        spcf, *sampled_spcfs = all_spcfs if all_spcfs != [] else [None]
+
+        yield _Selector(
+            spcf,
+            ys,
+            sampled_spcfs,
+            sampled_ys,
+            # Levels could have been sampled with another period (see `pad_and_sample`).
+            # If it is not recorded yet, levels are still correctly selected, only
+            # with more probes.
+            period=read_metadata(dir_path)["period"],
+            cache=cache,
+            overview=overview,
+            open_levels=level_files.open,
         )
-
-        sampled_spcfs = {
-            stack.enter_context(
-                sorted_padded_csv_file(sampled_path, x_and_type, sampled_ys)
-            )
-            for sampled_path in sampled_paths
-        }
-
-        yield _Selector(spcf, ys, sampled_spcfs, sampled_ys)
@@ -1,11 +1,13 @@
 from bisect import bisect_left, bisect_right
-from contextlib import ExitStack, contextmanager
 from enum import Enum
 from pathlib import Path
 from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
+import numpy as np
+
 from .gettable import Gettable
 from .padded_csv_file import _PaddedCSVFile
+from .sparse_index import sparse_index
 
 
 class Side(Enum):
@@ -66,6 +68,10 @@ class _SortedPaddedCSVFile(Gettable):
         files_descriptors_and_size: List[Tuple[IO, IO, int]],
         x_and_type: Tuple[str, type],
         ys: List[str],
+        index_dir_path: Optional[Path] = None,
+        x_file: Optional[Gettable] = None,
+        offsets: Optional[List[np.ndarray]] = None,
+        field_widths: Optional[List[List[int]]] = None,
     ) -> None:
         """Constructor.
 
@@ -85,8 +91,26 @@ class _SortedPaddedCSVFile(Gettable):
             - The name of the column
             - The type of the column
 
+        index_dir_path:
+            If set, the directory where the sparse index of `x` (see `SparseIndex`) is
+            stored. The index is built there if it does not exist yet.
+
+        x_file:
+            If set, a gettable returning, for each line, the (unwrapped) value of `x`.
+            Values of `x` are then read from it instead of from files (see
+            `epoch_x_file_of`).
+
+        offsets:
+            If set, files are not padded, and for each file, the byte offsets of its
+            lines (see `write_indexed`).
+
+        field_widths:
+            If set, fields of files are padded, and for each file, the width of each
+            field (see `FieldsPaddedTextFile`).
+
         If at least one line of the file pointed by `file_descriptor` has not the same
-        length than others, a `TextFileNotPaddedError` is raised.
+        length than others (and `offsets` is not set), a `TextFileNotPaddedError` is
+        raised.
         """
         files_descriptor_1_and_size = [
             (file_descriptor, size)
@@ -98,15 +122,59 @@ class _SortedPaddedCSVFile(Gettable):
             for _, file_descriptor, size in files_descriptors_and_size
         ]
 
-        self.__x_file = _PaddedCSVFile(
-            files_descriptor_1_and_size, [x_and_type], unwrap_if_one_column=True
+        self.__x_file = (
+            x_file
+            if x_file is not None
+            else _PaddedCSVFile(
+                files_descriptor_1_and_size,
+                [x_and_type],
+                unwrap_if_one_column=True,
+                offsets=offsets,
+                field_widths=field_widths,
+            )
         )
 
         self.__ys_file = _PaddedCSVFile(
-            files_descriptor_2_and_size, [(y, float) for y in ys]
+            files_descriptor_2_and_size,
+            [(y, float) for y in ys],
+            offsets=offsets,
+            field_widths=field_widths,
+        )
+
+        self.__x_index = (
+            sparse_index(index_dir_path, self.__x_file)
+            if index_dir_path is not None
+            else None
         )
 
+    @classmethod
+    def from_gettables(
+        cls, x_file: Gettable, ys_file: Gettable, index_dir_path: Optional[Path] = None
+    ) -> "_SortedPaddedCSVFile":
+        """Build a Sorted Padded CSV file from already opened gettables.
+
+        x_file        : A gettable returning, for each line, the (unwrapped) value of
+                        `x`
+        ys_file       : A gettable returning, for each line, the list of `ys` values
+        index_dir_path: See `__init__`
+
+        This is useful for files which are not padded CSV files (binary files for
+        instance), but which have to be requested the same way.
+        """
+        sorted_padded_csv_file = cls.__new__(cls)
+        sorted_padded_csv_file.__x_file = x_file
+        sorted_padded_csv_file.__ys_file = ys_file
+
+        sorted_padded_csv_file.__x_index = (
+            sparse_index(index_dir_path, x_file) if index_dir_path is not None else None
+        )
+
+        return sorted_padded_csv_file
+
     def __get_line_number_of(self, x: Any, side: Side) -> int:
+        if self.__x_index is not None:
+            return self.__x_index.line_number_of(x, side.value)
+
         return {Side.Left: bisect_left, Side.Right: bisect_right}[side](
             self.__x_file, x  # type: ignore
         )
@@ -150,12 +218,10 @@ class _SortedPaddedCSVFile(Gettable):
             return (x, ys)
 
         def handle_slice(slice: slice) -> List[Tuple[Any, List]]:
-            start, stop = self.__get_start_stop(slice)
+            xs, ys_columns = self.columns(slice.start, slice.stop)
+            yss = [list(ys) for ys in zip(*(ys.tolist() for ys in ys_columns))]
 
-            xs = self.__x_file[start:stop]
-            yss = self.__ys_file[start:stop]
-
-            return list(zip(xs, yss))
+            return list(zip(xs.tolist(), yss))
 
         if isinstance(x_or_slice, slice):
             return handle_slice(x_or_slice)
@@ -178,6 +244,43 @@ class _SortedPaddedCSVFile(Gettable):
         for x, ys in zip(x_iterator, ys_iterator):
             yield x, ys
 
+    def columns(
+        self, start: Optional[Any] = None, stop: Optional[Any] = None
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Return the values of `x` and of each `y` of all lines corresponding to
+        `start <= x <= stop`, as arrays.
+
+        Lines are parsed block by block, in a vectorized way.
+
+        start: The value of `x` corresponding to the first line
+        stop : The value of `x` corresponding to the last line
+        """
+        return self.columns_of_lines(*self.line_numbers_between(start, stop))
+
+    def columns_of_lines(
+        self, start: int, stop: int
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Return the values of `x` and of each `y` of lines between the line number
+        `start` (included) and the line number `stop` (excluded), as arrays."""
+        (xs,) = self.__x_file.columns(start, stop)
+        return xs, self.__ys_file.columns(start, stop)
+
+    def line_numbers_between(
+        self, start: Optional[Any] = None, stop: Optional[Any] = None
+    ) -> Tuple[int, int]:
+        """Get the first (included) and the last (excluded) line numbers of lines
+        corresponding to `start <= x <= stop`.
+
+        start: The value of `x` corresponding to the first line
+        stop : The value of `x` corresponding to the last line
+        """
+        start_, stop_ = self.__get_start_stop(slice(start, stop))
+
+        return (
+            start_ if start_ is not None else 0,
+            stop_ if stop_ is not None else len(self),
+        )
+
     def number_of_lines_between(
         self, start: Optional[Any] = None, stop: Optional[Any] = None
     ) -> int:
@@ -190,77 +293,3 @@ class _SortedPaddedCSVFile(Gettable):
         return (stop_ if stop_ is not None else len(self)) - (
             start_ if start_ is not None else 0
         )
-
-
-@contextmanager
-def sorted_padded_csv_file(
-    path: Path,
-    x_and_type: Tuple[str, type],
-    ys: List[str],
-) -> Iterator[_SortedPaddedCSVFile]:
-    """Represent a padded CSV file with one sorted column, where all lines are reachable
-    through the sorted column with O(log(n)) complexity.
-
-    A padded CSV file is a CSV file where all lines have exactly the same length.
-    In general, lines are right padded with white spaces.
-    The last line MUST also contain a carriage return.
-
-    Only line(s) you request will be load in memory.
-
-    Usage:
-    with sorted_padded_csv_file as spcf:
-        ...
-
-    Example: With the following file represented by <file_descriptor>:
-    a,b,c,d
-    1,2,3,4
-    5,6,7,8
-    9,10,11,12
-    13,14,15,16
-    17,18,19,20
-
-    Here all columns are sorted, but in this example, only the column "c" has to be.
-
-    with sorted_padded_csv_file(<file_path>, ("c", int), [("d", int), ("b", int)]) as spcf:
-        # Get the number of lines
-        len(spcf) # = 5
-
-        # Get the line corresponding to c == 7
-        spcf[7] # = (3, [8, 6])
-
-        # Get an iterator on all lines corresponding to 6.5 <= c <= 15.5
-        spcf.get(start=6.5, stop=15.5)
-
-        # Get all lines corresponding to 6.5 <= c <= 15.5
-        spcf[6.5:15.5] # = [(7, [8, 6]), (11, [12, 10]), (15, [16, 14])]
-
-        # <file_path> could be either a file, or a directory.
-        # If it is a directory, each file inside should follow the convention <int>.csv.
-        # The file which has the smaller <int> should have the header as a first line.
-
-        # Warning: All lines in the selected range will be loaded into memory.
-        #          For example: spcf[:] will load all the file in memory.
-        #          If possible, use spcf.get(start=a, stop=b) instead of
-        #                           spcf[a, b]
-    """
-    if path.is_file():
-        with path.open() as file_descriptor_1, path.open() as file_descriptor_2:
-            yield _SortedPaddedCSVFile(
-                [(file_descriptor_1, file_descriptor_2, path.stat().st_size)],
-                x_and_type,
-                ys,
-            )
-    else:
-        paths = sorted(path.glob("*.csv"), key=lambda item: int(item.stem))
-
-        with ExitStack() as stack:
-            files_descriptors_and_size = [
-                (
-                    stack.enter_context(path.open()),
-                    stack.enter_context(path.open()),
-                    path.stat().st_size,
-                )
-                for path in paths
-            ]
-
-            yield _SortedPaddedCSVFile(files_descriptors_and_size, x_and_type, ys)  # type: ignore
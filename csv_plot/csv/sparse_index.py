@@ -0,0 +1,243 @@
+import json
+import math
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+INDEX_PERIOD = 1024
+INDEX_FILE_NAME = "x_index.npy"
+SPACING_FILE_NAME = "x_spacing.json"
+
+# If, on lines of the index, the position of `x` computed from a regular spacing
+# differs from the real one by more than this number of lines, `x` is not considered
+# as regularly spaced.
+MAX_SPACING_ERROR = 16
+
+
+def to_float(x: Any) -> float:
+    """Convert a value of `x` (a number or a datetime) into a float."""
+    return x.timestamp() if isinstance(x, datetime) else float(x)
+
+
+def to_floats(xs: np.ndarray) -> np.ndarray:
+    """Convert an array of values of `x` (numbers or datetimes) into floats."""
+    if xs.dtype != object:
+        return xs.astype(np.float64)
+
+    return np.fromiter((to_float(x) for x in xs), dtype=np.float64, count=len(xs))
+
+
+class Spacing:
+    """Regular spacing of `x`: the value of `x` of line `i` is approximately
+    `x0 + i * dx`, with an error of at most `error` lines."""
+
+    def __init__(self, x0: float, dx: float, error: int) -> None:
+        self.x0 = x0
+        self.dx = dx
+        self.error = error
+
+    @classmethod
+    def detect(
+        cls, values: np.ndarray, period: int, last_x: float, nb_lines: int
+    ) -> Optional["Spacing"]:
+        """Detect if `x` is regularly spaced.
+
+        values  : Values of the sparse index (see `SparseIndex`)
+        period  : Period of the sparse index
+        last_x  : The value of `x` of the last line
+        nb_lines: The number of lines
+
+        Return `None` if `x` is not regularly spaced.
+        """
+        x0 = float(values[0])
+        dx = (last_x - x0) / (nb_lines - 1)
+
+        if not dx > 0:
+            return None
+
+        lines = np.arange(len(values)) * period
+        error = float(np.max(np.abs((values - x0) / dx - lines)))
+
+        return cls(x0, dx, math.ceil(error)) if error <= MAX_SPACING_ERROR else None
+
+
+class SparseIndex:
+    """An in memory index on the sorted `x` column of a file, containing the value of
+    `x` of one line every `period` lines.
+
+    Finding the line corresponding to a given `x` is done by a binary search in
+    memory, followed by a search in only one block of `period` lines on disk.
+
+    If `x` is regularly spaced (see `Spacing`), the line is directly computed from `x`
+    and only a few lines around it are read from disk to correct the guess.
+
+    Usage:
+    sparse_index = SparseIndex(<x_file>, 1024)
+
+    sparse_index.line_number_of(x, "left") == bisect_left(x_file, x)
+    sparse_index.line_number_of(x, "right") == bisect_right(x_file, x)
+    """
+
+    def __init__(
+        self,
+        x_file: Any,
+        period: int = INDEX_PERIOD,
+        values: Optional[np.ndarray] = None,
+        spacing: Optional[Spacing] = None,
+    ) -> None:
+        """Initializer.
+
+        x_file : A `_PaddedCSVFile` or a `_BinaryCSVFile` (unwrapped) on the `x` column
+        period : The number of lines between two consecutive values of the index
+        values : Already computed values of the index. If not set, values (and
+                 spacing) are computed from `x_file`
+        spacing: Already computed spacing of `x`
+        """
+        self.__x_file = x_file
+        self.__len = len(x_file)
+        self.__period = period
+
+        if values is None:
+            (xs,) = x_file.columns(step=period)
+            values = to_floats(xs)
+            spacing = Spacing.detect(values, period, to_float(x_file[-1]), self.__len)
+
+        self.values = values
+        self.spacing = spacing
+
+    def bounds(self, x: Any, side: str) -> Tuple[int, int]:
+        """Return the first (included) and the last (excluded) lines of the block
+        where the insertion point of `x` is located.
+
+        x   : The value of `x` to look for
+        side: "left" for `bisect_left`, "right" for `bisect_right`
+        """
+        index = int(np.searchsorted(self.values, to_float(x), side=side))
+
+        return (
+            max(index - 1, 0) * self.__period,
+            min(index * self.__period, self.__len),
+        )
+
+    def line_number_of(self, x: Any, side: str) -> int:
+        """Return the insertion point of `x` in `x_file`.
+
+        x   : The value of `x` to look for
+        side: "left" for `bisect_left`, "right" for `bisect_right`
+        """
+        bisect = {"left": bisect_left, "right": bisect_right}[side]
+
+        if self.spacing is not None:
+            guess = (to_float(x) - self.spacing.x0) / self.spacing.dx
+
+            if math.isfinite(guess):
+                error = self.spacing.error
+                start = min(max(math.floor(guess) - error, 0), self.__len)
+                stop = min(max(math.ceil(guess) + error + 1, 0), self.__len)
+                line_number = start + bisect(self.__x_file[start:stop], x)
+
+                # The insertion point is reliable only if it is not on a border of the
+                # block (except if this border is also a border of the file)
+                if (start < line_number or start == 0) and (
+                    line_number < stop or stop == self.__len
+                ):
+                    return line_number
+
+        start, stop = self.bounds(x, side)
+        return start + bisect(self.__x_file[start:stop], x)
+
+
+def sparse_index(
+    dir_path: Path, x_file: Any, period: int = INDEX_PERIOD
+) -> Optional[SparseIndex]:
+    """Load the sparse index stored in `dir_path`, or build and store it if it does
+    not exist yet. If lines have been appended to `x_file` since it has been stored,
+    it is extended.
+
+    If `x_file` does not contain more than `period` lines, an index is useless and
+    `None` is returned.
+    """
+    if len(x_file) <= period:
+        return None
+
+    index_path = dir_path / INDEX_FILE_NAME
+    spacing_path = dir_path / SPACING_FILE_NAME
+    nb_values = (len(x_file) - 1) // period + 1
+    index: Optional[SparseIndex] = None
+
+    if index_path.exists() and spacing_path.exists():
+        values = np.load(index_path)
+
+        with spacing_path.open() as file_descriptor:
+            stored = json.load(file_descriptor)
+
+        # Indexes stored with another period are rebuilt
+        is_valid = isinstance(stored, dict) and stored.get("period") == period
+
+        if is_valid and len(values) == nb_values:
+            spacing_dict = stored["spacing"]
+            spacing = Spacing(**spacing_dict) if spacing_dict is not None else None
+            return SparseIndex(x_file, period, values, spacing)
+
+        # Lines have only been appended since the index was stored (see `append`), so
+        # only values of appended lines are read
+        if is_valid and len(values) < nb_values:
+            (xs,) = x_file.columns(start=len(values) * period, step=period)
+            values = np.concatenate([values, to_floats(xs)])
+            last_x = to_float(x_file[-1])
+
+            spacing = Spacing.detect(values, period, last_x, len(x_file))
+            index = SparseIndex(x_file, period, values, spacing)
+
+    if index is None:
+        index = SparseIndex(x_file, period)
+
+    tmp_index_path = dir_path / f"{index_path.stem}.tmp.npy"
+    np.save(tmp_index_path, index.values)
+    tmp_index_path.replace(index_path)
+
+    with spacing_path.open("w") as file_descriptor:
+        json.dump(
+            {
+                "period": period,
+                "spacing": vars(index.spacing) if index.spacing is not None else None,
+            },
+            file_descriptor,
+        )
+
+    return index
+
+
+def truncate_sparse_index(
+    source_dir_path: Path, dest_dir_path: Path, nb_lines: int
+) -> None:
+    """Write into `dest_dir_path` the sparse index stored in `source_dir_path` (see
+    `sparse_index`), with only values of its first `nb_lines` lines, because following
+    lines have changed. It is then extended with new lines when it is loaded again.
+
+    The spacing of `x` is not kept: it is detected again once the index is extended.
+    """
+    index_path = source_dir_path / INDEX_FILE_NAME
+    spacing_path = source_dir_path / SPACING_FILE_NAME
+
+    if not (index_path.exists() and spacing_path.exists()):
+        return
+
+    with spacing_path.open() as file_descriptor:
+        stored = json.load(file_descriptor)
+
+    # Indexes stored without their period are rebuilt anyway
+    if not isinstance(stored, dict) or "period" not in stored:
+        return
+
+    period = stored["period"]
+    values = np.load(index_path)[: -(-nb_lines // period)]
+
+    dest_dir_path.mkdir(parents=True, exist_ok=True)
+    np.save(dest_dir_path / INDEX_FILE_NAME, values)
+
+    with (dest_dir_path / SPACING_FILE_NAME).open("w") as file_descriptor:
+        json.dump({"period": period, "spacing": None}, file_descriptor)
@@ -72,18 +72,23 @@ class SplittedGettable:
             return list(self.get(index_or_slice.start, index_or_slice.stop))
 
     def get(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator:
+        for iterable, (start, stop) in self._get_gettables_and_slices(start, stop):
+            yield from iterable.get(start, stop)
+
+    def _get_gettables_and_slices(
+        self, start: Optional[int], stop: Optional[int]
+    ) -> List[Tuple[Gettable, Tuple[Optional[int], Optional[int]]]]:
+        """Return, for each Gettable containing at least one element between `start`
+        (included) and `stop` (excluded), a tuple (<Gettable>, (<start>, <stop>)) where
+        <start> and <stop> are expressed relatively to the Gettable."""
         slices = self.__get_slices(start, stop)
 
-        iterable_slice_list = [
-            (iterable, slice_)
-            for iterable, slice_ in zip(self.__gettables, slices)
+        return [
+            (gettable, slice_)
+            for gettable, slice_ in zip(self.__gettables, slices)
             if slice_ is not None
         ]
 
-        for iterable, slice_ in iterable_slice_list:
-            start, stop = slice_
-            yield from iterable.get(start, stop)
-
     def __get_index(self, index: int) -> Tuple[int, int]:
         real_index = index + self.__offset if index >= 0 else self.__len + index
 
@@ -0,0 +1,202 @@
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pytest import fixture
+
+from ..binary_csv_file import (
+    _BinaryCSVFile,
+    get_column_path,
+    get_dtype_and_indexes,
+    load_column_arrays,
+    sorted_binary_csv_file_of,
+    to_binary,
+    to_columns,
+)
+from ..pad_and_sample import Storage, get_dir_path, pad_and_sample
+from ..padded_csv_file import ColumnNotFoundError
+from ..selector import selector
+from . import assets
+
+
+@fixture
+def arrays() -> list:
+    dtype = np.dtype([("a", "<f8"), ("c", "<f8"), ("e", "<f8")])
+
+    return [
+        np.array([(1, 2, 4), (5, 6, 8), (9, 10, 12)], dtype=dtype),
+        np.array([(13, 14, 16), (17, 18, 20)], dtype=dtype),
+    ]
+
+
+@fixture
+def not_padded_file_path() -> Path:
+    return Path(assets.__file__).parent / "not_padded.csv"
+
+
+@fixture
+def splitted_padded_csv(tmp_path: Path) -> Path:
+    path = tmp_path / "splitted_padded_csv"
+    shutil.copytree(Path(assets.__file__).parent / "splitted_padded_csv", path)
+    return path
+
+
+def test_bad_columns(arrays):
+    with pytest.raises(ColumnNotFoundError):
+        _BinaryCSVFile(arrays, [("not_present", int)])
+
+    with pytest.raises(ValueError):
+        _BinaryCSVFile(arrays, [])
+
+
+def test_line(arrays):
+    binary_csv_file = _BinaryCSVFile(arrays, [("e", int), ("c", float)])
+
+    assert len(binary_csv_file) == 5
+    assert binary_csv_file[0] == [4, 2.0]
+    assert binary_csv_file[3] == [16, 14.0]
+    assert binary_csv_file[-1] == [20, 18.0]
+
+    with pytest.raises(IndexError):
+        binary_csv_file[5]
+
+
+def test_line_unwrapped(arrays):
+    binary_csv_file = _BinaryCSVFile(arrays, [("e", int)], unwrap_if_one_column=True)
+
+    assert binary_csv_file[2] == 12
+    assert binary_csv_file[-2] == 16
+
+
+def test_slice(arrays):
+    binary_csv_file = _BinaryCSVFile(arrays, [("e", int), ("c", int)])
+
+    assert (
+        binary_csv_file[:]
+        == list(binary_csv_file.get())
+        == [[4, 2], [8, 6], [12, 10], [16, 14], [20, 18]]
+    )
+
+    assert (
+        binary_csv_file[1:-1]
+        == list(binary_csv_file.get(start=1, stop=-1))
+        == [[8, 6], [12, 10], [16, 14]]
+    )
+
+    assert binary_csv_file[3:] == [[16, 14], [20, 18]]
+    assert binary_csv_file[2:2] == []
+
+
+def test_to_binary(splitted_padded_csv: Path):
+    dtype, indexes = get_dtype_and_indexes(
+        splitted_padded_csv / "0.csv", "a", all_numeric=False
+    )
+
+    assert dtype.names == ("a", "b", "c", "d")
+    assert indexes == [0, 1, 2, 3]
+
+    for index in range(3):
+        path = splitted_padded_csv / f"{index}.csv"
+        to_binary(path, path.with_suffix(".npy"), dtype, indexes, index == 0)
+        assert not path.exists()
+
+    arrays = [
+        np.load(splitted_padded_csv / f"{index}.npy", mmap_mode="r")
+        for index in range(3)
+    ]
+
+    spcf = sorted_binary_csv_file_of(arrays, ("a", int), ["d", "b"])
+    assert len(spcf) == 5
+    assert spcf[9] == (9, [12.0, 10.0])
+    assert spcf[4:14] == [(5, [8.0, 6.0]), (9, [12.0, 10.0]), (13, [16.0, 14.0])]
+
+
+def test_to_columns(splitted_padded_csv: Path):
+    dtype, indexes = get_dtype_and_indexes(
+        splitted_padded_csv / "0.csv", "a", all_numeric=False
+    )
+
+    for index in range(3):
+        path = splitted_padded_csv / f"{index}.csv"
+        to_columns(path, dtype, indexes, index == 0)
+        assert not path.exists()
+
+        for column in ("a", "b", "c", "d"):
+            assert get_column_path(splitted_padded_csv, index, column).exists()
+
+    # Files of other columns are not read
+    for index in range(3):
+        get_column_path(splitted_padded_csv, index, "c").unlink()
+
+    arrays = [
+        load_column_arrays(splitted_padded_csv, index, ["a", "d", "b"])
+        for index in range(3)
+    ]
+
+    spcf = sorted_binary_csv_file_of(arrays, ("a", int), ["d", "b"])
+    assert len(spcf) == 5
+    assert spcf[9] == (9, [12.0, 10.0])
+    assert spcf[4:14] == [(5, [8.0, 6.0]), (9, [12.0, 10.0]), (13, [16.0, 14.0])]
+
+    arrays = [
+        load_column_arrays(splitted_padded_csv, index, ["a", "c"]) for index in range(3)
+    ]
+
+    with pytest.raises(ColumnNotFoundError):
+        sorted_binary_csv_file_of(arrays, ("a", int), ["c"])
+
+
+def test_to_binary_datetime(tmp_path: Path):
+    path = tmp_path / "0.csv"
+
+    with path.open("w") as file_descriptor:
+        file_descriptor.write("time,a    \n")
+        file_descriptor.write("12:00:01,1\n")
+        file_descriptor.write("12:00:02,2\n")
+
+    dtype, indexes = get_dtype_and_indexes(path, "time", all_numeric=False)
+    to_binary(path, path.with_suffix(".npy"), dtype, indexes, True)
+
+    parser = lambda x: datetime.strptime(x, "%H:%M:%S")
+
+    arrays = [np.load(tmp_path / "0.npy", mmap_mode="r")]
+    spcf = sorted_binary_csv_file_of(arrays, ("time", parser), ["a"])
+    assert spcf[parser("12:00:02")] == (parser("12:00:02"), [2.0])
+
+
+def test_pad_and_sample_binary(tmp_path: Path, not_padded_file_path: Path):
+    assert pad_and_sample(not_padded_file_path, tmp_path, "a", 2, Storage.Binary)
+    assert not pad_and_sample(not_padded_file_path, tmp_path, "a", 2, Storage.Binary)
+    assert pad_and_sample(not_padded_file_path, tmp_path, "a", 2, Storage.Text)
+
+    binary_dir = get_dir_path(not_padded_file_path, tmp_path, "a", Storage.Binary)
+    text_dir = get_dir_path(not_padded_file_path, tmp_path, "a", Storage.Text)
+
+    assert binary_dir != text_dir
+    assert list(binary_dir.glob("*/*.csv")) == []
+
+    with selector(binary_dir, ("a", int), ["c", "e"]) as binary_sel, selector(
+        text_dir, ("a", int), ["c", "e"]
+    ) as text_sel:
+        for slice_ in (slice(None, None, 100), slice(5, 13, 4), slice(None, None, 3)):
+            assert binary_sel[slice_].to_selected() == text_sel[slice_].to_selected()
+
+
+def test_pad_and_sample_by_column(tmp_path: Path, not_padded_file_path: Path):
+    assert pad_and_sample(not_padded_file_path, tmp_path, "a", 2, Storage.Columns)
+    assert pad_and_sample(not_padded_file_path, tmp_path, "a", 2, Storage.Text)
+
+    columns_dir = get_dir_path(not_padded_file_path, tmp_path, "a", Storage.Columns)
+    text_dir = get_dir_path(not_padded_file_path, tmp_path, "a", Storage.Text)
+
+    assert list(columns_dir.glob("*/*.csv")) == []
+    assert get_column_path(columns_dir / "0", 1, "e").exists()
+    assert get_column_path(columns_dir / "1", 1, "e_max").exists()
+
+    with selector(columns_dir, ("a", int), ["c", "e"]) as columns_sel, selector(
+        text_dir, ("a", int), ["c", "e"]
+    ) as text_sel:
+        for slice_ in (slice(None, None, 100), slice(5, 13, 4), slice(None, None, 3)):
+            assert columns_sel[slice_].to_selected() == text_sel[slice_].to_selected()
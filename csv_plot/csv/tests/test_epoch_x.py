@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+import pytest
+from pytest import fixture
+
+from ..epoch_x import epoch_x_file_of, get_epoch_x_paths, parse_date_time
+from ..gettable import Gettable
+from ..pad_and_sample import Storage, get_dir_path, pad_and_sample
+from ..selector import selector
+
+FORMATS = ["%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S"]
+
+
+@fixture
+def datetime_csv_path(tmp_path: Path) -> Path:
+    """200 lines, one per second, with `x` written with two different formats."""
+    path = tmp_path / "datetime.csv"
+    origin = datetime(2021, 3, 4, 5, 6, 7)
+
+    with path.open("w") as file_descriptor:
+        file_descriptor.write("x,y\n")
+
+        for index in range(200):
+            date_time = origin + timedelta(seconds=index)
+            date_time_format = FORMATS[0] if index < 150 else FORMATS[1]
+            file_descriptor.write(f"{date_time.strftime(date_time_format)},{index}\n")
+
+    return path
+
+
+def load_epoch_x_file(path: Path) -> Optional[Gettable]:
+    arrays = [np.load(item, mmap_mode="r") for item in get_epoch_x_paths(path)]
+    return epoch_x_file_of(arrays, "x")
+
+
+def test_parse_date_time():
+    assert parse_date_time("04/03/2021 05:06:07", FORMATS) == datetime(
+        2021, 3, 4, 5, 6, 7
+    )
+
+    with pytest.raises(ValueError):
+        parse_date_time("2021-03-04", FORMATS)
+
+
+@pytest.mark.parametrize("storage", [Storage.Text, Storage.Binary, Storage.Indexed])
+def test_epoch_x(tmp_path: Path, datetime_csv_path: Path, storage: Storage):
+    origin = datetime(2021, 3, 4, 5, 6, 7).timestamp()
+
+    assert pad_and_sample(datetime_csv_path, tmp_path, "x", 2, storage, FORMATS)
+    assert not pad_and_sample(datetime_csv_path, tmp_path, "x", 2, storage, FORMATS)
+
+    dir_path = get_dir_path(datetime_csv_path, tmp_path, "x", storage, FORMATS)
+    assert dir_path != get_dir_path(datetime_csv_path, tmp_path, "x", storage)
+
+    x_file = load_epoch_x_file(dir_path / "0")
+    assert x_file is not None
+    assert x_file[:] == [origin + index for index in range(200)]
+
+    level_paths = [path for path in dir_path.iterdir() if path.is_dir()]
+    assert all(load_epoch_x_file(path) is not None for path in level_paths)
+
+    with selector(dir_path, ("x", float), ["y"]) as sel:
+        selection = sel[origin + 10 : origin + 19.5 : 100]
+
+        assert selection.xs.tolist() == [origin + index for index in range(10, 20)]
+        assert selection.name_to_y["y"].mins.tolist() == list(range(10, 20))
+
+        # Lines written with the second format
+        assert sel[origin + 180 : origin + 181 : 100].xs.tolist() == [
+            origin + 180,
+            origin + 181,
+        ]
+
+    # Without `date_time_formats`, `x` is not parsed while preprocessing
+    pad_and_sample(datetime_csv_path, tmp_path, "x", 2, storage)
+    assert (
+        load_epoch_x_file(get_dir_path(datetime_csv_path, tmp_path, "x", storage) / "0")
+        is None
+    )
@@ -0,0 +1,52 @@
+import os
+from pathlib import Path
+
+from pytest import fixture
+
+from ..files_cache import get_entries, prune, touch
+from ..pad_and_sample import TMP_DIR_PREFIX, get_dir_path, pad_and_sample
+from ..tests import assets
+
+
+@fixture
+def not_padded_file_path() -> Path:
+    return Path(assets.__file__).parent / "not_padded.csv"
+
+
+def test_files_cache(tmp_path: Path, not_padded_file_path: Path):
+    files_dir = tmp_path / "files"
+    assert get_entries(files_dir) == []
+
+    for x in ("a", "b", "c"):
+        pad_and_sample(not_padded_file_path, files_dir, x, 2)
+
+    a_path, b_path, c_path = [
+        get_dir_path(not_padded_file_path, files_dir, x) for x in ("a", "b", "c")
+    ]
+
+    for index, path in enumerate((a_path, b_path, c_path)):
+        os.utime(path, (index, index))
+
+    # `a` is used again
+    touch(a_path)
+
+    # Lines are being appended to a processed file
+    (files_dir / f"{TMP_DIR_PREFIX}appended").mkdir()
+
+    entries = get_entries(files_dir)
+    assert [entry.path for entry in entries] == [b_path, c_path, a_path]
+    assert all(entry.size > 0 for entry in entries)
+    assert all(entry.source_path == not_padded_file_path for entry in entries)
+
+    # Everything fits
+    assert prune(files_dir, sum(entry.size for entry in entries)) == []
+
+    # `b` is kept, so `c` is removed
+    size = entries[0].size + entries[2].size
+    removed_entries = prune(files_dir, size, keep={b_path})
+    assert [entry.path for entry in removed_entries] == [c_path]
+    assert [entry.path for entry in get_entries(files_dir)] == [b_path, a_path]
+
+    assert len(prune(files_dir, 0)) == 2
+    assert get_entries(files_dir) == []
+    assert (files_dir / f"{TMP_DIR_PREFIX}appended").exists()
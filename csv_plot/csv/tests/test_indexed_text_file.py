@@ -0,0 +1,148 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pytest import fixture
+
+from ..indexed_text_file import (
+    IndexedTextFile,
+    SplittedIndexedTextFile,
+    get_offsets_path,
+)
+from ..pad_and_sample import Storage, get_dir_path, pad_and_sample, write_indexed
+from ..padded_csv_file import _PaddedCSVFile
+from ..padded_text_file import OffsetError
+from ..selector import selector
+from ..level_files import LevelFiles
+from ..tests import assets
+
+
+@fixture
+def indexed_file_path(tmp_path: Path) -> Path:
+    path = tmp_path / "0.csv"
+    write_indexed(Path(assets.__file__).parent / "not_padded.csv", path)
+    return path
+
+
+@fixture
+def indexed_dir_path(tmp_path: Path) -> Path:
+    path = tmp_path / "0"
+    padded_dir_path = Path(assets.__file__).parent / "splitted_padded_csv"
+
+    for index in range(3):
+        write_indexed(padded_dir_path / f"{index}.csv", path / f"{index}.csv")
+
+    return path
+
+
+def test_write_indexed(indexed_file_path: Path):
+    assert indexed_file_path.read_text() == (
+        "a,b,c,d,e\n1,z,2,3,4\n5,y,6,7,8\n9,x,10,11,12\n13,w,14,15,16\n17,v,18,19,20\n"
+    )
+
+    offsets = np.load(get_offsets_path(indexed_file_path))
+    assert offsets.dtype == np.uint64
+    assert offsets.tolist() == [0, 10, 20, 30, 43, 57, 71]
+
+    # Padded lines, between two bytes, projected on some columns
+    path = indexed_file_path.with_name("1.csv")
+    write_indexed(Path(assets.__file__).parent / "padded.csv", path, 14, 56, [0, 2])
+
+    assert path.read_text() == "1,2\n5,6\n9,10\n"
+    assert np.load(get_offsets_path(path)).tolist() == [0, 4, 8, 13]
+
+
+def test_indexed_text_file(indexed_file_path: Path):
+    offsets = np.load(get_offsets_path(indexed_file_path))
+
+    with indexed_file_path.open() as file_descriptor:
+        with pytest.raises(OffsetError):
+            IndexedTextFile(file_descriptor, offsets, offset=7)
+
+        indexed_text_file = IndexedTextFile(file_descriptor, offsets, offset=1)
+
+        assert len(indexed_text_file) == 5
+        assert indexed_text_file[0] == "1,z,2,3,4"
+        assert indexed_text_file[-1] == "17,v,18,19,20"
+
+        with pytest.raises(IndexError):
+            indexed_text_file[5]
+
+        assert indexed_text_file[1:3].tolist() == [b"5,y,6,7,8", b"9,x,10,11,12"]
+        assert indexed_text_file[::2].tolist() == [
+            b"1,z,2,3,4",
+            b"9,x,10,11,12",
+            b"17,v,18,19,20",
+        ]
+
+        assert len(indexed_text_file[3:3]) == 0
+        assert list(indexed_text_file.get(3)) == ["13,w,14,15,16", "17,v,18,19,20"]
+
+
+def test_splitted_indexed_text_file(indexed_dir_path: Path):
+    paths = [indexed_dir_path / f"{index}.csv" for index in range(3)]
+
+    files_descriptor_and_offsets = [
+        (path.open(), np.load(get_offsets_path(path))) for path in paths
+    ]
+
+    splitted = SplittedIndexedTextFile(files_descriptor_and_offsets, offset=1)
+
+    assert len(splitted) == 5
+    assert splitted[2] == "9,10,11,12"
+    assert splitted[1:4].tolist() == [b"5,6,7,8", b"9,10,11,12", b"13,14,15,16"]
+    assert list(splitted.get(3, 5)) == ["13,14,15,16", "17,18,19,20"]
+
+    padded_csv_file = _PaddedCSVFile(
+        [(file_descriptor, 0) for file_descriptor, _ in files_descriptor_and_offsets],
+        [("d", int), ("b", int)],
+        offsets=[offsets for _, offsets in files_descriptor_and_offsets],
+    )
+
+    assert padded_csv_file[2] == [12, 10]
+    assert padded_csv_file[1:3] == [[8, 6], [12, 10]]
+
+    for file_descriptor, _ in files_descriptor_and_offsets:
+        file_descriptor.close()
+
+
+def test_sorted_indexed_csv_file(indexed_dir_path: Path):
+    with LevelFiles(indexed_dir_path.parent, ("a", int), ["d", "c"], []) as files:
+        (spcf,), _, _ = files.open()
+
+        assert len(spcf) == 5
+        assert spcf[9] == (9, [12.0, 11.0])
+        assert spcf[4:14] == [(5, [8.0, 7.0]), (9, [12.0, 11.0]), (13, [16.0, 15.0])]
+
+
+def test_pad_and_sample_indexed(tmp_path: Path):
+    csv_path = tmp_path / "outlier.csv"
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y,comment\n")
+
+        for index in range(1000):
+            comment = "error" * 100 if index == 500 else ""
+            file_descriptor.write(f"{index},{index % 7},{comment}\n")
+
+    for storage in (Storage.Text, Storage.Indexed):
+        assert pad_and_sample(csv_path, tmp_path, "x", 2, storage)
+
+    text_dir = get_dir_path(csv_path, tmp_path, "x", Storage.Text)
+    indexed_dir = get_dir_path(csv_path, tmp_path, "x", Storage.Indexed)
+
+    def get_size(path: Path) -> int:
+        return sum(item.stat().st_size for item in path.iterdir())
+
+    # The long line does not make every line longer
+    assert get_size(indexed_dir / "0") * 10 < get_size(text_dir / "0")
+
+    with selector(text_dir, ("x", int), ["y"]) as text_sel, selector(
+        indexed_dir, ("x", int), ["y"]
+    ) as indexed_sel:
+        for slice_ in (
+            slice(None, None, 5000),
+            slice(490, 510, 100),
+            slice(None, None, 1),
+        ):
+            assert indexed_sel[slice_].to_selected() == text_sel[slice_].to_selected()
@@ -0,0 +1,55 @@
+import numpy as np
+
+from ..m4 import m4
+from ..selector import Selection
+
+
+def test_m4_not_reduced():
+    xs = np.arange(10.0)
+    name_to_y = {"a": Selection.Y(mins=xs, maxs=xs)}
+
+    reduced_xs, reduced_name_to_y = m4(xs, name_to_y, 0, 10, 3)
+
+    assert reduced_xs is xs
+    assert reduced_name_to_y is name_to_y
+
+
+def test_m4():
+    random = np.random.default_rng(42)
+
+    xs = np.sort(random.uniform(0, 100, 10_000))
+    mins = random.normal(size=10_000)
+    maxs = mins + random.uniform(0, 1, 10_000)
+    values = random.normal(size=10_000)
+
+    name_to_y = {
+        "a": Selection.Y(mins=mins, maxs=maxs),
+        "b": Selection.Y(mins=values, maxs=values),
+    }
+
+    reduced_xs, reduced_name_to_y = m4(xs, name_to_y, -10, 110, 60)
+
+    assert len(reduced_xs) < len(xs)
+    assert reduced_name_to_y["b"].mins is reduced_name_to_y["b"].maxs
+
+    buckets = ((xs + 10) // 2).astype(int)
+    reduced_buckets = ((reduced_xs + 10) // 2).astype(int)
+
+    # In each pixel, first and last points and extrema of each curve are the same
+    for bucket in np.unique(buckets):
+        mask, reduced_mask = buckets == bucket, reduced_buckets == bucket
+
+        assert xs[mask][0] == reduced_xs[reduced_mask][0]
+        assert xs[mask][-1] == reduced_xs[reduced_mask][-1]
+
+        for name, y in name_to_y.items():
+            reduced_y = reduced_name_to_y[name]
+
+            for curve, reduced_curve in (
+                (y.mins, reduced_y.mins),
+                (y.maxs, reduced_y.maxs),
+            ):
+                assert curve[mask].min() == reduced_curve[reduced_mask].min()
+                assert curve[mask].max() == reduced_curve[reduced_mask].max()
+                assert curve[mask][0] == reduced_curve[reduced_mask][0]
+                assert curve[mask][-1] == reduced_curve[reduced_mask][-1]
@@ -1,18 +1,43 @@
 import filecmp
 import os
+import shutil
+import sys
 from pathlib import Path
+from typing import List
 
+import numpy as np
+import pytest
 from pytest import fixture
 
+from ..binary_csv_file import get_column_path
+from ..level_files import LevelFiles
 from ..pad_and_sample import (
-    are_files_fully_sampled,
+    HASH_BLOCK_SIZE,
+    NB_HASH_BLOCKS,
+    OVERVIEW_DIR_NAME,
+    READY_FILE_NAME,
+    HashMode,
+    Storage,
     compute_chunks,
+    content_hash,
+    extend,
+    follow,
+    get_dir_path,
+    get_field_widths,
+    get_nb_levels,
     pad,
     pad_and_sample,
     pseudo_hash,
+    read_metadata,
+    read_source,
     sample,
-    sample_sampled,
+    sample_levels,
+    stride,
 )
+from ..padded_text_file import read_field_widths
+from ..selector import selector
+from ..sparse_index import INDEX_FILE_NAME, SPACING_FILE_NAME, sparse_index
+from ..tile_cache import TileCache
 from ..tests import assets
 
 
@@ -88,11 +113,6 @@ def splitted_padded_csv_path() -> Path:
     return Path(assets.__file__).parent / "splitted_padded_csv"
 
 
-@fixture
-def fully_splitted_padded_csv_path() -> Path:
-    return Path(assets.__file__).parent / "fully_splitted_padded_csv"
-
-
 def test_pad(tmpdir, not_padded_file_path, padded_file_path):
     pad(not_padded_file_path, Path(tmpdir) / "padded.csv")
     assert filecmp.cmp(tmpdir / "padded.csv", padded_file_path)
@@ -113,6 +133,36 @@ def test_pad_5(tmpdir, not_padded_file_path, padded_5_file_path):
     assert filecmp.cmp(tmpdir / "padded.csv", padded_5_file_path)
 
 
+def test_pad_columns(tmp_path: Path, not_padded_file_path: Path):
+    pad(not_padded_file_path, tmp_path / "padded.csv", indexes=[0, 3])
+
+    assert (tmp_path / "padded.csv").read_text() == (
+        "a,d  \n" "1,3  \n" "5,7  \n" "9,11 \n" "13,15\n" "17,19\n"
+    )
+
+    pad(not_padded_file_path, tmp_path / "padded_2_4.csv", 20, 57, indexes=[1, 4])
+    assert (tmp_path / "padded_2_4.csv").read_text() == "y,8 \nx,12\nw,16\n"
+
+
+def test_pad_fields(tmp_path: Path, not_padded_file_path: Path):
+    field_widths = get_field_widths(not_padded_file_path)
+    assert field_widths == [2, 1, 2, 2, 2]
+    assert get_field_widths(not_padded_file_path, 20, 57, indexes=[1, 4]) == [1, 2]
+
+    pad(not_padded_file_path, tmp_path / "0.csv", field_widths=field_widths)
+
+    assert (tmp_path / "0.csv").read_text() == (
+        "a ,b,c ,d ,e \n"
+        "1 ,z,2 ,3 ,4 \n"
+        "5 ,y,6 ,7 ,8 \n"
+        "9 ,x,10,11,12\n"
+        "13,w,14,15,16\n"
+        "17,v,18,19,20\n"
+    )
+
+    assert read_field_widths(tmp_path / "0.csv") == field_widths
+
+
 def test_pseudo_hash(tmp_path: Path):
     path = tmp_path / "file.txt"
     with path.open("w") as file_descriptor:
@@ -124,6 +174,49 @@ def test_pseudo_hash(tmp_path: Path):
     assert pseudo_hash(path, "12345") == "ece35c8647c0fe39e450443c9514b412"
 
 
+def test_content_hash(tmp_path: Path):
+    path, copy_path = tmp_path / "file.txt", tmp_path / "copy.txt"
+    # Blocks cover the whole content
+    content = bytes(range(256)) * (NB_HASH_BLOCKS * HASH_BLOCK_SIZE // 256)
+    path.write_bytes(content)
+    shutil.copyfile(path, copy_path)
+    os.utime(copy_path, (42, 42))
+
+    assert content_hash(path) == content_hash(copy_path)
+    assert pseudo_hash(path) != pseudo_hash(copy_path)
+    assert content_hash(path, "12345") != content_hash(path)
+
+    # Head, tail and interior blocks are hashed
+    for offset in (0, len(content) // 2, len(content) - 1):
+        modified = bytearray(content)
+        modified[offset] ^= 1
+        copy_path.write_bytes(modified)
+        assert content_hash(path) != content_hash(copy_path)
+
+    path.write_bytes(b"qwerty")
+    copy_path.write_bytes(b"qwerty")
+    assert content_hash(path) == content_hash(copy_path)
+
+
+def test_pad_and_sample_content_hash(tmp_path: Path, not_padded_file_path: Path):
+    copy_path = tmp_path / "copy.csv"
+    shutil.copyfile(not_padded_file_path, copy_path)
+    os.utime(copy_path, (42, 42))
+
+    def process(path: Path) -> bool:
+        return pad_and_sample(path, tmp_path, "a", 2, hash_mode=HashMode.Content)
+
+    assert process(not_padded_file_path)
+    assert not process(copy_path)
+
+    assert get_dir_path(
+        copy_path, tmp_path, "a", hash_mode=HashMode.Content
+    ) == get_dir_path(not_padded_file_path, tmp_path, "a", hash_mode=HashMode.Content)
+
+    # With metadata, the copy is processed again
+    assert pad_and_sample(copy_path, tmp_path, "a", 2)
+
+
 def test_compute_chunks(not_padded_file_path: Path):
     assert compute_chunks(not_padded_file_path, 1) == [(0, 71)]
     assert compute_chunks(not_padded_file_path, 2) == [(0, 43), (43, 71)]
@@ -160,13 +253,6 @@ def test_compute_chunks_padded(padded_file_path: Path):
     ]
 
 
-def test_are_files_fully_sampled(
-    splitted_padded_csv_path: Path, fully_splitted_padded_csv_path: Path
-):
-    assert not are_files_fully_sampled(splitted_padded_csv_path)
-    assert are_files_fully_sampled(fully_splitted_padded_csv_path)
-
-
 def test_sample(tmpdir, not_padded_file_path, sampled_file_path):
     sample(
         not_padded_file_path,
@@ -196,16 +282,82 @@ def test_sample_5(tmpdir, not_padded_file_path, sampled_5_file_path):
     assert filecmp.cmp(tmpdir / "output.csv", sampled_5_file_path)
 
 
-def test_sample_sampled_full_header(tmpdir, sampled_0_1_file_path):
-    sample_sampled(sampled_0_1_file_path, Path(tmpdir) / "output.csv", 2, True)
+def test_sample_measure(tmp_path: Path, not_padded_file_path: Path):
+    assert sample(not_padded_file_path, tmp_path / "0.csv", "a", 2) == (3, [13])
+    assert sample(not_padded_file_path, tmp_path / "1.csv", "a", 2, 20, 57) == (2, [13])
 
-    assert filecmp.cmp(tmpdir / "output.csv", sampled_0_1_file_path)
+    assert sample(
+        not_padded_file_path, tmp_path / "2.csv", "a", 2, pad_indexes=[0, 3]
+    ) == (3, [5])
 
+    assert sample(
+        not_padded_file_path,
+        tmp_path / "3.csv",
+        "a",
+        2,
+        pad_indexes=[0, 3],
+        by_field=True,
+    ) == (3, [2, 2])
 
-def test_sample_sampled_full_no_header(tmpdir, sampled_5_file_path):
-    sample_sampled(sampled_5_file_path, Path(tmpdir) / "output.csv", 2, False)
+    # Padding with the measured width is the same as measuring while padding
+    pad(not_padded_file_path, tmp_path / "padded.csv", width=13)
+    assert filecmp.cmp(
+        tmp_path / "padded.csv", Path(assets.__file__).parent / "padded.csv"
+    )
 
-    assert filecmp.cmp(tmpdir / "output.csv", sampled_5_file_path)
+
+def test_get_nb_levels():
+    assert get_nb_levels(1, 2) == 1
+    assert get_nb_levels(2, 2) == 2
+    assert get_nb_levels(3, 2) == 3
+    assert get_nb_levels(1000, 2) == 11
+    assert get_nb_levels(1000, 10) == 4
+
+
+def test_sample_period(tmp_path: Path):
+    csv_path = tmp_path / "source.csv"
+    values = [5, 4, 3, 1, 9, 8, 7, 6, 2, 2, 2, 2]
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y\n")
+
+        for index, value in enumerate(values):
+            file_descriptor.write(f"{index},{value}\n")
+
+    assert sample(csv_path, tmp_path / "1.csv", "x", 4) == (3, [4])
+
+    assert (tmp_path / "1.csv").read_text() == (
+        "x,y_min,y_max\n"
+        "0,1.000000,5.000000\n"
+        "4,6.000000,9.000000\n"
+        "8,2.000000,2.000000\n"
+    )
+
+    sample_levels(tmp_path / "1.csv", [tmp_path / "2.csv"], 4, True)
+
+    assert (tmp_path / "2.csv").read_text() == "x,y_min,y_max\n0,1.000000,9.000000\n"
+
+
+def test_sample_levels(tmp_path: Path):
+    csv_path = tmp_path / "source.csv"
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y,z\n")
+
+        for index in range(100):
+            file_descriptor.write(f"{index},{index % 7},{(index * 13) % 11 / 3}\n")
+
+    sample(csv_path, tmp_path / "1.csv", "x", 2)
+    dest_paths = [tmp_path / "levels" / f"{level}.csv" for level in range(2, 9)]
+    sample_levels(tmp_path / "1.csv", dest_paths, 2, True)
+
+    # Same as sampling levels one after the other
+    for level, dest_path in enumerate(dest_paths, start=2):
+        expected_path = tmp_path / f"{level}.csv"
+        sample_levels(tmp_path / f"{level - 1}.csv", [expected_path], 2, True)
+        assert dest_path.read_text() == expected_path.read_text()
+
+    assert len(dest_paths[-1].read_text().splitlines()) == 2
 
 
 def test_pad_and_sample(
@@ -237,4 +389,496 @@ def test_pad_and_sample(
         tmp_path / "25f43600a0c028eb8b77711bc7ac3034" / "2" / "1.csv", _2 / "1.csv"
     )
 
+    dir_path = tmp_path / "25f43600a0c028eb8b77711bc7ac3034"
+
+    for level in ("0", "1", "2", OVERVIEW_DIR_NAME):
+        assert (dir_path / level / READY_FILE_NAME).exists()
+
     assert not pad_and_sample(not_padded_file_path, tmp_path, "a", 2)
+
+    # An interrupted processing is done again from scratch
+    (dir_path / "SUCCESS").unlink()
+    (dir_path / "2" / "0.csv").write_text("garbage")
+
+    assert pad_and_sample(not_padded_file_path, tmp_path, "a", 2)
+    assert filecmp.cmp(dir_path / "2" / "0.csv", _2 / "0.csv")
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_pad_and_sample_columns(
+    tmp_path: Path, not_padded_file_path: Path, storage: Storage
+):
+    dir_path = get_dir_path(not_padded_file_path, tmp_path, "a", storage)
+
+    def process(columns) -> bool:
+        return pad_and_sample(
+            not_padded_file_path, tmp_path, "a", 2, storage, columns=columns
+        )
+
+    assert process(["d"])
+    assert read_metadata(dir_path) == {"columns": ["a", "d"], "period": 2}
+
+    if storage is Storage.Text:
+
+        def get_headers(level: str) -> list:
+            with (dir_path / level / "0.csv").open() as file_descriptor:
+                return file_descriptor.readline().rstrip().split(",")
+
+        assert get_headers("0") == ["a", "d"]
+        assert get_headers("1") == ["a", "d_min", "d_max"]
+        assert get_headers(OVERVIEW_DIR_NAME) == ["a", "d_min", "d_max"]
+
+    with selector(dir_path, ("a", int), ["d"]) as sel:
+        assert sel[::5000].name_to_y["d"].mins.tolist() == [3, 7, 11, 15, 19]
+
+    # Already processed columns are not processed again
+    assert not process(["d"])
+    assert not process([])
+
+    # Missing columns are processed, with already processed ones
+    assert process(["c"])
+    assert read_metadata(dir_path) == {"columns": ["a", "c", "d"], "period": 2}
+
+    with selector(dir_path, ("a", int), ["c", "d"]) as sel:
+        selection = sel[::5000]
+        assert selection.name_to_y["c"].mins.tolist() == [2, 6, 10, 14, 18]
+        assert selection.name_to_y["d"].mins.tolist() == [3, 7, 11, 15, 19]
+
+    # Once all columns are processed, no column is missing any more
+    assert process(None)
+    assert read_metadata(dir_path) == {"columns": None, "period": 2}
+    assert not process(["e"])
+
+
+def test_stride(tmp_path: Path, not_padded_file_path: Path):
+    stride(not_padded_file_path, tmp_path / "all.csv", "a", 100)
+
+    assert (tmp_path / "all.csv").read_text() == (
+        "a,c_min,c_max,d_min,d_max,e_min,e_max\n"
+        "1,2,2,3,3,4,4\n"
+        "5,6,6,7,7,8,8\n"
+        "9,10,10,11,11,12,12\n"
+        "13,14,14,15,15,16,16\n"
+        "17,18,18,19,19,20,20\n"
+    )
+
+    stride(not_padded_file_path, tmp_path / "two.csv", "a", 2)
+
+    assert (tmp_path / "two.csv").read_text() == (
+        "a,c_min,c_max,d_min,d_max,e_min,e_max\n"
+        "1,2,2,3,3,4,4\n"
+        "13,14,14,15,15,16,16\n"
+    )
+
+
+def get_chunk_path(level_path: Path, index: int, storage: Storage) -> Path:
+    if storage is Storage.Columns:
+        return get_column_path(level_path, index, "x")
+
+    return level_path / f"{index}.{'npy' if storage is Storage.Binary else 'csv'}"
+
+
+def test_pad_and_sample_period(tmp_path: Path):
+    csv_path = tmp_path / "long.csv"
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y\n")
+
+        for index in range(1000):
+            file_descriptor.write(f"{index},{index % 13}\n")
+
+    with pytest.raises(ValueError):
+        pad_and_sample(csv_path, tmp_path, "x", 2, period=1)
+
+    assert pad_and_sample(csv_path, tmp_path, "x", 2)
+    assert pad_and_sample(csv_path, tmp_path, "x", 2, period=8)
+
+    dir_path = get_dir_path(csv_path, tmp_path, "x")
+    dir_path_8 = get_dir_path(csv_path, tmp_path, "x", period=8)
+    assert dir_path != dir_path_8
+    assert read_metadata(dir_path_8)["period"] == 8
+
+    def get_levels(path: Path) -> List[str]:
+        return sorted(item.name for item in path.iterdir() if item.name.isdigit())
+
+    # Each chunk of about 500 lines is sampled into about 63, 8 then 1 line(s)
+    assert get_levels(dir_path_8) == ["0", "1", "2", "3"]
+    assert len(get_levels(dir_path)) == 10
+
+    nb_lines_1 = sum(
+        path.read_text().count("\n") for path in (dir_path_8 / "1").glob("*.csv")
+    )
+
+    # With the header
+    assert 1 + 1000 // 8 <= nb_lines_1 <= 1 + 1000 // 8 + 2
+
+    with selector(dir_path, ("x", int), ["y"]) as sel, selector(
+        dir_path_8, ("x", int), ["y"]
+    ) as sel_8:
+        assert sel_8.nb_levels == 4
+
+        # Selected lines are always at least the resolution, with a bounded over-fetch
+        for resolution in (10, 100, 300):
+            selected = len(sel_8[::resolution].xs)
+            assert resolution <= selected <= 8 * len(sel[::resolution].xs)
+
+        assert sel_8[100:200:1000].to_selected() == sel[100:200:1000].to_selected()
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_pad_and_sample_append_only(tmp_path: Path, storage: Storage):
+    csv_path = tmp_path / "growing.csv"
+    processed_path, reference_path = tmp_path / "processed", tmp_path / "reference"
+
+    def write_lines(mode: str, indexes: range):
+        with csv_path.open(mode) as file_descriptor:
+            if mode == "w":
+                file_descriptor.write("x,y\n")
+
+            for index in indexes:
+                file_descriptor.write(f"{index},{index % 13}\n")
+
+    write_lines("w", range(1000))
+    assert pad_and_sample(csv_path, processed_path, "x", 2, storage, append_only=True)
+    previous_dir_path = get_dir_path(csv_path, processed_path, "x", storage)
+
+    write_lines("a", range(1000, 1300))
+    assert pad_and_sample(csv_path, processed_path, "x", 2, storage, append_only=True)
+    dir_path = get_dir_path(csv_path, processed_path, "x", storage)
+
+    # The previous directory has been extended
+    assert not previous_dir_path.exists()
+    assert (dir_path / "SUCCESS").exists()
+
+    # Two chunks were processed, then two chunks were appended
+    assert get_chunk_path(dir_path / "0", 3, storage).exists()
+    assert not get_chunk_path(dir_path / "0", 4, storage).exists()
+
+    pad_and_sample(csv_path, reference_path, "x", 2, storage)
+    reference_dir_path = get_dir_path(csv_path, reference_path, "x", storage)
+
+    with selector(dir_path, ("x", int), ["y"]) as sel, selector(
+        reference_dir_path, ("x", int), ["y"]
+    ) as reference_sel:
+        assert sel[::5000].to_selected() == reference_sel[::5000].to_selected()
+        assert (
+            sel[990:1010:100].to_selected() == reference_sel[990:1010:100].to_selected()
+        )
+
+        for resolution in (1, 10, 100):
+            selection = sel[::resolution]
+            assert (np.diff(selection.xs) > 0).all()
+            assert selection.name_to_y["y"].mins.min() == 0
+            assert selection.name_to_y["y"].maxs.max() == 12
+
+    # Lines have been modified, so the file is processed again from scratch
+    write_lines("w", range(1, 1400))
+    assert pad_and_sample(csv_path, processed_path, "x", 2, storage, append_only=True)
+    assert dir_path.exists()
+
+    with selector(
+        get_dir_path(csv_path, processed_path, "x", storage), ("x", int), ["y"]
+    ) as sel:
+        assert sel[::5000].xs.tolist() == list(range(1, 1400))
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_follow(tmp_path: Path, storage: Storage, monkeypatch):
+    csv_path = tmp_path / "growing.csv"
+    dir_path = tmp_path / "processed" / "followed"
+
+    def write(mode: str, text: str):
+        with csv_path.open(mode) as file_descriptor:
+            file_descriptor.write(text)
+
+    def lines(indexes: range) -> str:
+        return "".join(f"{index},{index % 13}\n" for index in indexes)
+
+    # Called once the file is processed, before levels are extended
+    def on_following():
+        assert (dir_path / "SUCCESS").exists()
+        followed.append(True)
+
+    followed: List[bool] = []
+    write("w", "x,y\n" + lines(range(1000)))
+    follow(
+        csv_path,
+        dir_path,
+        "x",
+        2,
+        storage,
+        is_stopped=lambda: True,
+        on_following=on_following,
+    )
+
+    assert followed == [True]
+
+    with selector(dir_path, ("x", int), ["y"], TileCache(tile_size=16)) as sel:
+        assert sel[::5000].xs.tolist() == list(range(1000))
+        assert not sel.refresh()
+
+        # The last line is still being written
+        write("a", lines(range(1000, 1300)) + "13")
+        assert extend(csv_path, dir_path, "x", storage)
+        assert not extend(csv_path, dir_path, "x", storage)
+
+        # The last chunk is small, so it has been processed again, and so has the
+        # first one, which is not bigger than the processed lines
+        assert get_chunk_path(dir_path / "0", 0, storage).exists()
+        assert not get_chunk_path(dir_path / "0", 1, storage).exists()
+
+        assert sel.refresh()
+        assert not sel.refresh()
+        assert sel[::5000].xs.tolist() == list(range(1300))
+        assert sel[1290:2000:5000].name_to_y["y"].mins.tolist() == [
+            index % 13 for index in range(1290, 1300)
+        ]
+
+        # A new chunk is appended once the last one is big enough
+        monkeypatch.setattr(sys.modules[extend.__module__], "MAX_GROWING_CHUNK_SIZE", 0)
+        write("a", "00,0\n" + lines(range(1301, 1500)))
+        assert extend(csv_path, dir_path, "x", storage)
+        assert get_chunk_path(dir_path / "0", 1, storage).exists()
+        assert not get_chunk_path(dir_path / "0", 2, storage).exists()
+
+        assert sel.refresh()
+        assert sel[::5000].xs.tolist() == list(range(1500))
+        assert sel[::5000].name_to_y["y"].mins.tolist()[1300] == 0
+
+        for resolution in (1, 10, 100):
+            selection = sel[::resolution]
+            assert (np.diff(selection.xs) > 0).all()
+            assert selection.xs[-1] >= 1300
+            assert selection.name_to_y["y"].maxs.max() == 12
+
+    # Once stopped, the file is followed again from where it stopped
+    write("a", lines(range(1500, 1600)))
+    follow(csv_path, dir_path, "x", 2, storage, is_stopped=lambda: True)
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        assert sel[::5000].xs.tolist() == list(range(1600))
+
+        write("a", lines(range(1600, 1700)))
+        assert extend(csv_path, dir_path, "x", storage)
+        assert sel.refresh()
+        assert sel[::5000].xs.tolist() == list(range(1700))
+
+
+@pytest.mark.parametrize("storage", [Storage.Text, Storage.Indexed, Storage.Columns])
+def test_extend_merges_chunks(tmp_path: Path, storage: Storage, monkeypatch):
+    csv_path = tmp_path / "growing.csv"
+    dir_path = tmp_path / "processed" / "followed"
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y\n")
+
+    def write_lines(indexes: range):
+        with csv_path.open("a") as file_descriptor:
+            for index in indexes:
+                file_descriptor.write(f"{index},{index % 13}\n")
+
+    write_lines(range(100))
+    follow(csv_path, dir_path, "x", 2, storage, is_stopped=lambda: True)
+
+    # Each extension would else append a new chunk
+    monkeypatch.setattr(sys.modules[extend.__module__], "MAX_GROWING_CHUNK_SIZE", 0)
+
+    for index in range(100, 3300, 50):
+        write_lines(range(index, index + 50))
+        assert extend(csv_path, dir_path, "x", storage)
+
+        # 64 extensions lead to at most log2(64) + 1 chunks (per level)
+        nb_chunks = len(read_source(dir_path)["chunk_starts"])
+        assert nb_chunks <= 7
+
+        for level_path in (dir_path / "0", dir_path / "5"):
+            assert get_chunk_path(level_path, nb_chunks - 1, storage).exists()
+            assert not get_chunk_path(level_path, nb_chunks, storage).exists()
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        assert sel[::5000].xs.tolist() == list(range(3300))
+
+        for resolution in (1, 10, 100):
+            selection = sel[::resolution]
+            assert (np.diff(selection.xs) > 0).all()
+            assert selection.name_to_y["y"].maxs.max() == 12
+
+    # An extension does not process more than `MAX_EXTEND_SIZE` bytes
+    module = sys.modules[extend.__module__]
+    monkeypatch.setattr(module, "MAX_EXTEND_SIZE", 2000)
+    append, processed_sizes = module.append, []
+
+    def append_and_measure(source_path, dir_path, prefix_size, size, *args):
+        processed_sizes.append(size - prefix_size)
+        append(source_path, dir_path, prefix_size, size, *args)
+
+    monkeypatch.setattr(module, "append", append_and_measure)
+
+    for index in range(3300, 4900, 50):
+        write_lines(range(index, index + 50))
+        assert extend(csv_path, dir_path, "x", storage)
+
+    assert len(processed_sizes) == 32
+    assert max(processed_sizes) <= 2000
+
+    nb_chunks = len(read_source(dir_path)["chunk_starts"])
+    assert nb_chunks > 7
+
+    monkeypatch.setattr(sys.modules[extend.__module__], "MAX_EXTEND_SIZE", 0)
+
+    for index in range(4900, 5100, 50):
+        write_lines(range(index, index + 50))
+        assert extend(csv_path, dir_path, "x", storage)
+
+    assert len(read_source(dir_path)["chunk_starts"]) == nb_chunks + 4
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        assert sel[::5000].xs.tolist() == list(range(5100))
+
+
+@pytest.mark.parametrize("storage", [Storage.Text, Storage.Indexed, Storage.Columns])
+def test_extend_truncates_sparse_index(tmp_path: Path, storage: Storage, monkeypatch):
+    csv_path = tmp_path / "growing.csv"
+    dir_path = tmp_path / "processed" / "followed"
+
+    def write_lines(indexes: range):
+        with csv_path.open("a") as file_descriptor:
+            for index in indexes:
+                file_descriptor.write(f"{index},{index % 13}\n")
+
+    # Indexes are stored even for small levels, and chunks are merged
+    monkeypatch.setattr(
+        "csv_plot.csv.sorted_padded_csv_file.sparse_index",
+        lambda path, x_file: sparse_index(path, x_file, 4),
+    )
+
+    monkeypatch.setattr(sys.modules[extend.__module__], "MAX_GROWING_CHUNK_SIZE", 0)
+
+    csv_path.write_text("x,y\n")
+    write_lines(range(100))
+    follow(csv_path, dir_path, "x", 2, storage, is_stopped=lambda: True)
+
+    with LevelFiles(dir_path, ("x", int), ["y"], ["y_min", "y_max"]) as level_files:
+        level_files.open()
+
+        for index in range(100, 1100, 50):
+            write_lines(range(index, index + 50))
+            assert extend(csv_path, dir_path, "x", storage)
+            level_files.open()
+
+    level_paths = [
+        path
+        for path in dir_path.iterdir()
+        if path.name.isdigit() and (path / INDEX_FILE_NAME).exists()
+    ]
+
+    stored = {path: np.load(path / INDEX_FILE_NAME) for path in level_paths}
+    assert len(stored[dir_path / "5"]) > 1
+
+    # Stored indexes are the same as indexes built from scratch
+    for path in level_paths:
+        (path / INDEX_FILE_NAME).unlink()
+        (path / SPACING_FILE_NAME).unlink()
+
+    with LevelFiles(dir_path, ("x", int), ["y"], ["y_min", "y_max"]) as level_files:
+        level_files.open()
+
+    # Levels with too few lines are not indexed (but their truncated index is kept)
+    rebuilt_paths = [path for path in level_paths if (path / INDEX_FILE_NAME).exists()]
+    assert dir_path / "5" in rebuilt_paths
+
+    for path in rebuilt_paths:
+        assert np.load(path / INDEX_FILE_NAME).tolist() == stored[path].tolist()
+
+
+@pytest.mark.parametrize("storage", list(Storage))
+def test_extend_interrupted(tmp_path: Path, storage: Storage, monkeypatch):
+    csv_path = tmp_path / "growing.csv"
+    dir_path = tmp_path / "processed" / "followed"
+    module = sys.modules[extend.__module__]
+
+    def write_lines(mode: str, indexes: range):
+        with csv_path.open(mode) as file_descriptor:
+            if mode == "w":
+                file_descriptor.write("x,y\n")
+
+            for index in indexes:
+                file_descriptor.write(f"{index},{index % 13}\n")
+
+    def interrupt(*_):
+        raise KeyboardInterrupt
+
+    write_lines("w", range(1000))
+    follow(csv_path, dir_path, "x", 2, storage, is_stopped=lambda: True)
+    write_lines("a", range(1000, 1300))
+
+    # Interrupted before appended files are committed: levels are left as they were
+    monkeypatch.setattr(module, "commit_staging", interrupt)
+
+    with pytest.raises(KeyboardInterrupt):
+        extend(csv_path, dir_path, "x", storage)
+
+    monkeypatch.undo()
+    assert (dir_path / "SUCCESS").exists()
+    assert (dir_path / "staging").exists()
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        assert sel[::5000].xs.tolist() == list(range(1000))
+
+    # Interrupted while committed files are moved into place: they are moved next
+    # time the directory is used
+    replace = os.replace
+    moved_paths = []
+
+    def interrupted_replace(source: Path, dest: Path) -> None:
+        if "staging" in Path(source).parts:
+            if len(moved_paths) == 2:
+                raise KeyboardInterrupt
+
+            moved_paths.append(dest)
+
+        replace(source, dest)
+
+    monkeypatch.setattr(os, "replace", interrupted_replace)
+
+    with pytest.raises(KeyboardInterrupt):
+        extend(csv_path, dir_path, "x", storage)
+
+    monkeypatch.undo()
+    assert not (dir_path / "SUCCESS").exists()
+
+    # Appended lines have already been processed
+    assert not extend(csv_path, dir_path, "x", storage)
+    assert (dir_path / "SUCCESS").exists()
+    assert not (dir_path / "staging").exists()
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        assert sel[::5000].xs.tolist() == list(range(1300))
+
+
+def test_pad_and_sample_fields(tmp_path: Path):
+    csv_path = tmp_path / "wide.csv"
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y,z\n")
+
+        for index in range(1000):
+            file_descriptor.write(f"{index},{index % 7},{-(index ** 3)}\n")
+
+    for storage in (Storage.Text, Storage.Fields):
+        assert pad_and_sample(csv_path, tmp_path, "x", 2, storage)
+
+    text_dir = get_dir_path(csv_path, tmp_path, "x", Storage.Text)
+    fields_dir = get_dir_path(csv_path, tmp_path, "x", Storage.Fields)
+
+    assert read_field_widths(fields_dir / "0" / "0.csv") == [3, 1, 10]
+
+    with selector(text_dir, ("x", int), ["z", "y"]) as text_sel, selector(
+        fields_dir, ("x", int), ["z", "y"]
+    ) as fields_sel:
+        for slice_ in (
+            slice(None, None, 5000),
+            slice(490, 510, 100),
+            slice(None, None, 1),
+        ):
+            assert fields_sel[slice_].to_selected() == text_sel[slice_].to_selected()
@@ -1,10 +1,17 @@
 from pathlib import Path
 from typing import IO
 
+import numpy as np
 import pytest
 from pytest import fixture
 
-from ..padded_csv_file import ColumnNotFoundError, _PaddedCSVFile, padded_csv_file
+from ..padded_csv_file import (
+    ColumnNotFoundError,
+    _PaddedCSVFile,
+    cast_column,
+    padded_csv_file,
+    split_lines,
+)
 from . import assets
 
 
@@ -135,3 +142,49 @@ def test_slice_one_unwrapped(padded_file_descriptor: IO, padded_file_size: int)
     )
 
     assert padded_csv_file[:] == list(padded_csv_file.get()) == [4, 8, 12, 16, 20]
+
+
+def test_split_lines():
+    lines = np.array([b"1,z,2,3,4    \n", b"13,w,14,15,16\n", b"5,,6,7,8\n"])
+    twos, ones, fours = split_lines(lines, [2, 1, 4])
+
+    assert twos.tolist() == [b"2", b"14", b"6"]
+    assert ones.tolist() == [b"z", b"w", b""]
+    assert fours.tolist() == [b"4", b"16", b"8"]
+
+    with pytest.raises(IndexError):
+        split_lines(lines, [5])
+
+    (empty,) = split_lines(lines[:0], [0])
+    assert len(empty) == 0
+
+
+def test_split_lines_not_same_number_of_fields():
+    lines = np.array([b"1,2   \n", b"3,4,5 \n"])
+    (ones,) = split_lines(lines, [1])
+    assert ones.tolist() == [b"2", b"4"]
+
+
+def test_cast_column():
+    column = np.array([b"12", b"3"])
+
+    assert cast_column(column, float).tolist() == [12.0, 3.0]
+    assert cast_column(column, int).tolist() == [12, 3]
+    assert cast_column(column, lambda x: x * 2).tolist() == ["1212", "33"]
+
+
+def test_columns(padded_file_descriptor: IO, padded_file_size: int) -> None:
+    padded_csv_file = _PaddedCSVFile(
+        [(padded_file_descriptor, padded_file_size)],
+        [("e", float), ("b", str), ("c", int)],
+    )
+
+    es, bs, cs = padded_csv_file.columns(1, -1)
+
+    assert es.dtype == np.float64
+    assert es.tolist() == [8.0, 12.0, 16.0]
+    assert bs.tolist() == ["y", "x", "w"]
+    assert cs.tolist() == [6, 10, 14]
+
+    es, _, _ = padded_csv_file.columns()
+    assert es.tolist() == [4.0, 8.0, 12.0, 16.0, 20.0]
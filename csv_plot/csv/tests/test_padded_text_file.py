@@ -1,11 +1,16 @@
 from pathlib import Path
 from typing import IO, List, Tuple
 
+import numpy as np
 import pytest
 from pytest import fixture
 
 from ..padded_text_file import (
+    FieldsPaddedTextFile,
+    MmapPaddedTextFile,
     OffsetError,
+    SplittedFieldsPaddedTextFile,
+    SplittedMmapPaddedTextFile,
     SplittedPaddedTextFile,
     TextFileNotPaddedError,
     PaddedTextFile,
@@ -226,7 +231,7 @@ def test_offset_out_of_bound(padded_file_descriptor: IO, padded_file_size: int)
 
 
 def test_splitted_padded_text_file_offset_0(
-    splitted_padded_csv_files_descriptor_size: List[Tuple[IO, int]]
+    splitted_padded_csv_files_descriptor_size: List[Tuple[IO, int]],
 ):
 
     splitted_padded_text_file = SplittedPaddedTextFile(
@@ -249,7 +254,7 @@ def test_splitted_padded_text_file_offset_0(
 
 
 def test_splitted_padded_text_file_offset_1(
-    splitted_padded_csv_files_descriptor_size: List[Tuple[IO, int]]
+    splitted_padded_csv_files_descriptor_size: List[Tuple[IO, int]],
 ):
 
     splitted_padded_text_file = SplittedPaddedTextFile(
@@ -268,3 +273,97 @@ def test_splitted_padded_text_file_offset_1(
 
     assert splitted_padded_text_file[-1] == "17,18,19,20"
     assert splitted_padded_text_file[-1:] == ["17,18,19,20"]
+
+
+def test_mmap_not_padded(
+    not_padded_file_descriptor: IO, not_padded_file_size: int
+) -> None:
+    with pytest.raises(TextFileNotPaddedError):
+        MmapPaddedTextFile(not_padded_file_descriptor, not_padded_file_size, 0)
+
+
+def test_mmap_padded_text_file(padded_file_path: Path):
+    with padded_text_file(padded_file_path, offset=1, memory_map=True) as ptf:
+        assert isinstance(ptf, MmapPaddedTextFile)
+        assert len(ptf) == 5
+        assert ptf[1] == "5,y,6,7,8"
+        assert ptf[-1] == "17,v,18,19,20"
+        assert list(ptf.get(start=3)) == ["13,w,14,15,16", "17,v,18,19,20"]
+
+        assert ptf[1:-2].tolist() == [b"5,y,6,7,8    \n", b"9,x,10,11,12 \n"]
+        assert ptf[-7:1].tolist() == [b"1,z,2,3,4    \n"]
+        assert ptf[3:2].tolist() == []
+
+        lines = ptf[:]
+        assert lines.view(np.uint8).reshape(-1, ptf.line_size).shape == (5, 14)
+
+
+def test_splitted_mmap_padded_text_file(
+    splitted_padded_csv_files_descriptor_size: List[Tuple[IO, int]],
+):
+    splitted_padded_text_file = SplittedMmapPaddedTextFile(
+        splitted_padded_csv_files_descriptor_size, offset=1
+    )
+
+    assert len(splitted_padded_text_file) == 5
+    assert splitted_padded_text_file[-1] == "17,18,19,20"
+    assert splitted_padded_text_file[2:3].tolist() == [b"9,10,11,12 \n"]
+
+    assert splitted_padded_text_file[:].tolist() == [
+        b"1,2,3,4\n",
+        b"5,6,7,8\n",
+        b"9,10,11,12 \n",
+        b"13,14,15,16\n",
+        b"17,18,19,20\n",
+    ]
+
+    assert splitted_padded_text_file[3:3].tolist() == []
+
+
+def test_fields_padded_text_file(tmp_path: Path):
+    path = tmp_path / "0.csv"
+    path.write_text("a ,b,c \n1 ,z,2 \n13,w,14\n5 ,y,6 \n")
+
+    with path.open() as file_descriptor:
+        padded_text_file = FieldsPaddedTextFile(
+            file_descriptor, path.stat().st_size, 1, [2, 1, 2]
+        )
+
+        assert padded_text_file[1] == "13,w,14"
+
+        c, a = padded_text_file.fields([2, 0], 0, 3)
+        assert c.tolist() == [b"2 ", b"14", b"6 "]
+        assert a.tolist() == [b"1 ", b"13", b"5 "]
+
+        (b,) = padded_text_file.fields([1], step=2)
+        assert b.tolist() == [b"z", b"y"]
+
+
+def test_splitted_fields_padded_text_file(tmp_path: Path):
+    paths_and_widths = [
+        (tmp_path / "0.csv", "a,b \n1,z \n", [1, 2]),
+        (tmp_path / "1.csv", "13,w\n5 ,y\n17,v\n", [2, 1]),
+    ]
+
+    for path, text, _ in paths_and_widths:
+        path.write_text(text)
+
+    files_descriptor_size_and_field_widths = [
+        (path.open(), path.stat().st_size, field_widths)
+        for path, _, field_widths in paths_and_widths
+    ]
+
+    splitted = SplittedFieldsPaddedTextFile(files_descriptor_size_and_field_widths, 1)
+
+    assert len(splitted) == 4
+    assert splitted[2] == "5 ,y"
+
+    a, b = splitted.fields([0, 1])
+    assert a.tolist() == [b"1", b"13", b"5 ", b"17"]
+    assert b.tolist() == [b"z ", b"w", b"y", b"v"]
+
+    (a,) = splitted.fields([0], 1, None, 2)
+    assert a.tolist() == [b"13", b"17"]
+
+    for file_descriptor, _, _ in files_descriptor_size_and_field_widths:
+        file_descriptor.close()
@@ -1,13 +1,30 @@
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import pytest
 from pytest import fixture
 
-from ..selector import Selected, selector
+from ..level_files import LevelFiles
+from ..pad_and_sample import READY_FILE_NAME, get_dir_path, pad_and_sample
+from ..selector import OVERVIEW_LEVEL, QueryCancelledError, Selected, selector
+from ..tile_cache import TileCache
 from . import assets
 
 
+@fixture
+def big_csv_path(tmp_path: Path) -> Path:
+    path = tmp_path / "big.csv"
+
+    with path.open("w") as file_descriptor:
+        file_descriptor.write("x,y\n")
+
+        for index in range(1000):
+            file_descriptor.write(f"{index // 2},{index % 7}\n")
+
+    return path
+
+
 @fixture
 def hashed_dir() -> Path:
     return Path(assets.__file__).parent / "25f43600a0c028eb8b77711bc7ac3034"
@@ -23,7 +40,7 @@ def test_selector(hashed_dir):
         with pytest.raises(ValueError):
             sel[::]
 
-        assert sel[::100] == Selected(
+        assert sel[::100].to_selected() == Selected(
             xs=[1, 5, 9, 13, 17],
             name_to_y={
                 "c": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
@@ -32,8 +49,8 @@ def test_selector(hashed_dir):
         )
 
         assert (
-            sel[5:13:100]
-            == sel[4.5:13.5:100]
+            sel[5:13:100].to_selected()
+            == sel[4.5:13.5:100].to_selected()
             == Selected(
                 xs=[5, 9, 13],
                 name_to_y={
@@ -43,7 +60,7 @@ def test_selector(hashed_dir):
             )
         )
 
-        assert sel[::4] == Selected(
+        assert sel[::4].to_selected() == Selected(
             xs=[1, 5, 9, 13, 17],
             name_to_y={
                 "c": Selected.Y(mins=[2, 6, 10, 14, 18], maxs=[2, 6, 10, 14, 18]),
@@ -52,8 +69,8 @@ def test_selector(hashed_dir):
         )
 
         assert (
-            sel[5:13:4]
-            == sel[4.5:13.5:4]
+            sel[5:13:4].to_selected()
+            == sel[4.5:13.5:4].to_selected()
             == Selected(
                 xs=[5, 9, 13],
                 name_to_y={
@@ -63,7 +80,7 @@ def test_selector(hashed_dir):
             )
         )
 
-        assert sel[::3] == Selected(
+        assert sel[::3].to_selected() == Selected(
             xs=[1, 9, 13],
             name_to_y={
                 "c": Selected.Y(mins=[2, 10, 14], maxs=[6, 10, 18]),
@@ -72,8 +89,8 @@ def test_selector(hashed_dir):
         )
 
         assert (
-            sel[1:9:2]
-            == sel[0.5:9.5:2]
+            sel[1:9:2].to_selected()
+            == sel[0.5:9.5:2].to_selected()
             == Selected(
                 xs=[1, 9],
                 name_to_y={
@@ -91,7 +108,7 @@ def test_selector_datetime(hashed_dir_datetime):
         with pytest.raises(ValueError):
             sel[::]
 
-        assert sel[::100] == Selected(
+        assert sel[::100].to_selected() == Selected(
             xs=[
                 datetime(2019, 8, 15, 16, 3, 6, 595000),
                 datetime(2019, 8, 15, 16, 3, 6, 595000),
@@ -154,3 +171,132 @@ def test_selector_datetime(hashed_dir_datetime):
                 ),
             },
         )
+
+
+@pytest.mark.parametrize("period", [2, 8])
+def test_selector_level(tmp_path: Path, big_csv_path: Path, period: int):
+    pad_and_sample(big_csv_path, tmp_path, "x", 2, period=period)
+    dir_path = get_dir_path(big_csv_path, tmp_path, "x", period=period)
+
+    def expected_nb_lines(spcfs, start, stop, resolution) -> int:
+        """Number of lines of the level the selector should choose, computed by
+        probing every level."""
+        nb_lines = [spcf.number_of_lines_between(start, stop) for spcf in spcfs]
+
+        matching = [nb for nb in nb_lines if nb >= resolution]
+        return min(matching) if matching != [] else max(nb_lines)
+
+    with LevelFiles(
+        dir_path, ("x", int), ["y"], ["y_min", "y_max"]
+    ) as level_files, selector(dir_path, ("x", int), ["y"]) as sel:
+        spcfs, _, _ = level_files.open()
+
+        for start, stop in ((None, None), (10, 20), (0.5, 333.3), (100, 499)):
+            for resolution in (1, 2, 3, 5, 8, 30, 100, 250, 499, 500, 1000, 5000):
+                assert len(sel[start:stop:resolution].xs) == expected_nb_lines(
+                    spcfs, start, stop, resolution
+                )
+
+
+def test_selector_cache(hashed_dir):
+    cache = TileCache(tile_size=2)
+
+    with selector(hashed_dir, ("a", int), ["c", "e"]) as sel, selector(
+        hashed_dir, ("a", int), ["c", "e"], cache
+    ) as cached_sel:
+        for slice_ in (slice(None, None, 100), slice(5, 13, 4), slice(0.5, 9.5, 2)):
+            assert sel[slice_].to_selected() == cached_sel[slice_].to_selected()
+            assert sel[slice_].to_selected() == cached_sel[slice_].to_selected()
+
+    assert cache.hits > 0
+    assert cache.misses > 0
+
+
+def test_selector_prefetch(tmp_path: Path, big_csv_path: Path):
+    pad_and_sample(big_csv_path, tmp_path, "x", 2)
+    dir_path = get_dir_path(big_csv_path, tmp_path, "x")
+    cache = TileCache(tile_size=16)
+
+    with selector(dir_path, ("x", int), ["y"], cache) as sel:
+        assert sel.nb_levels == 11
+
+        level = sel.level_of(100, 200, 50)
+        assert list(sel.prefetch(level, 100, 200)) != []
+
+        sel[100:200:50]
+        assert cache.misses == 0
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        assert list(sel.prefetch(0, 100, 200)) == []
+
+
+def test_selector_select(tmp_path: Path, big_csv_path: Path, monkeypatch):
+    pad_and_sample(big_csv_path, tmp_path, "x", 2)
+    dir_path = get_dir_path(big_csv_path, tmp_path, "x")
+
+    with selector(dir_path, ("x", int), ["y"]) as sel:
+        expected = sel[10:300:400].to_selected()
+
+        # `csv_plot.csv.selector` is shadowed by the `selector` function
+        monkeypatch.setattr(sys.modules[selector.__module__], "CHUNK_SIZE", 64)
+        assert sel.select(10, 300, 400).to_selected() == expected
+
+        nb_calls = 0
+
+        def is_cancelled() -> bool:
+            nonlocal nb_calls
+            nb_calls += 1
+            return nb_calls > 3
+
+        with pytest.raises(QueryCancelledError):
+            sel.select(10, 300, 400, is_cancelled)
+
+        assert nb_calls == 4
+
+
+def test_selector_partial(tmp_path: Path, big_csv_path: Path):
+    # Nothing is written yet
+    with selector(tmp_path / "missing", ("x", int), ["y"]) as sel:
+        assert not sel.is_complete
+        assert not sel.refresh()
+        assert sel[::100].to_selected() == Selected(
+            xs=[], name_to_y={"y": Selected.Y(mins=[], maxs=[])}
+        )
+
+    pad_and_sample(big_csv_path, tmp_path, "x", 2)
+    dir_path = get_dir_path(big_csv_path, tmp_path, "x")
+
+    level_paths = sorted(
+        (path for path in dir_path.iterdir() if path.name.isdigit()),
+        key=lambda path: int(path.name),
+    )
+
+    # As if the file was still being processed
+    for level_path in level_paths:
+        (level_path / READY_FILE_NAME).unlink()
+
+    with selector(dir_path, ("x", int), ["y"], TileCache()) as sel:
+        assert not sel.is_complete
+        assert not sel.refresh()
+        assert sel.level_of(None, None, 100) == OVERVIEW_LEVEL
+        assert len(sel[::100].xs) == 1000
+
+        # Coarsest levels are ready first
+        for level_path in level_paths[:2:-1]:
+            (level_path / READY_FILE_NAME).touch()
+
+        assert sel.refresh()
+        assert not sel.is_complete
+        assert sel.level_of(None, None, 100) == 3
+        assert sel.level_of(None, None, 1000) == 3
+        assert sel.level_of(None, None, 10) == 6
+        assert sel.coarse_level_of(None, None, 100, 3) == 6
+        assert 100 <= len(sel[::100].xs) < 200
+
+        for level_path in level_paths:
+            (level_path / READY_FILE_NAME).touch()
+
+        assert sel.refresh()
+        assert sel.is_complete
+        assert sel.level_of(None, None, 1000) == 0
+        assert sel[::1000].to_selected().xs == [index // 2 for index in range(1000)]
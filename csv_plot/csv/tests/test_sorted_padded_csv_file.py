@@ -1,10 +1,12 @@
+import shutil
 from pathlib import Path
 from typing import IO
 
 import pytest
 from pytest import fixture
 
-from ..sorted_padded_csv_file import _SortedPaddedCSVFile, sorted_padded_csv_file
+from ..level_files import LevelFiles
+from ..sorted_padded_csv_file import _SortedPaddedCSVFile
 from . import assets
 
 
@@ -150,12 +152,13 @@ def test_number_of_lines_between(
     )
 
 
-def test_sorted_padded_csv_file(padded_file_path):
-    with sorted_padded_csv_file(
-        padded_file_path,
-        ("d", int),
-        ["e", "c"],
-    ) as spcf:
+def test_sorted_padded_csv_file(tmp_path: Path, padded_file_path: Path):
+    (tmp_path / "0").mkdir()
+    shutil.copy(padded_file_path, tmp_path / "0" / "0.csv")
+
+    with LevelFiles(tmp_path, ("d", int), ["e", "c"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+
         assert (
             spcf[15:19]
             == spcf[14.5:42]  # type: ignore
@@ -165,8 +168,12 @@ def test_sorted_padded_csv_file(padded_file_path):
         )
 
 
-def test_splitted_sorted_padded_csv_file(splitted_padded_csv):
-    with sorted_padded_csv_file(splitted_padded_csv, ("c", int), ["d", "b"]) as spcf:
+def test_splitted_sorted_padded_csv_file(tmp_path: Path, splitted_padded_csv: Path):
+    shutil.copytree(splitted_padded_csv, tmp_path / "0")
+
+    with LevelFiles(tmp_path, ("c", int), ["d", "b"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+
         assert (
             spcf[6.5:]
             == spcf[7:]
@@ -174,3 +181,16 @@ def test_splitted_sorted_padded_csv_file(splitted_padded_csv):
         )
 
         assert spcf[:3] == spcf[:3.5] == [(3, [4, 2])]
+
+
+def test_columns(tmp_path: Path, splitted_padded_csv: Path) -> None:
+    shutil.copytree(splitted_padded_csv, tmp_path / "0")
+
+    with LevelFiles(tmp_path, ("a", int), ["d", "b"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+
+        xs, (ds, bs) = spcf.columns(4.5, 13.5)
+
+        assert xs.tolist() == [5, 9, 13]
+        assert ds.tolist() == [8.0, 12.0, 16.0]
+        assert bs.tolist() == [6.0, 10.0, 14.0]
@@ -0,0 +1,185 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import IO, List, Tuple
+
+import numpy as np
+from pytest import fixture
+
+from ..padded_csv_file import _PaddedCSVFile
+from ..level_files import LevelFiles
+from ..sparse_index import Spacing, SparseIndex, sparse_index, to_float, to_floats
+
+
+@fixture
+def splitted_dir(tmp_path: Path) -> Path:
+    """Two chunks, with 3 * 100 lines where `x` is duplicated 3 times, written as the
+    level 0 of `tmp_path`."""
+    xs = [index // 3 for index in range(300)]
+    level_path = tmp_path / "0"
+    level_path.mkdir()
+
+    with (level_path / "0.csv").open("w") as file_descriptor:
+        file_descriptor.write("x,y    \n")
+
+        for x in xs[:140]:
+            file_descriptor.write(f"{x},{2 * x}".ljust(7) + "\n")
+
+    with (level_path / "1.csv").open("w") as file_descriptor:
+        for x in xs[140:]:
+            file_descriptor.write(f"{x},{2 * x}".ljust(7) + "\n")
+
+    return level_path
+
+
+@fixture
+def files_descriptor_and_size(splitted_dir: Path) -> List[Tuple[IO, int]]:
+    paths = [splitted_dir / "0.csv", splitted_dir / "1.csv"]
+    return [(path.open(), path.stat().st_size) for path in paths]
+
+
+def test_to_float():
+    assert to_float(3) == 3.0
+    assert to_float(datetime.fromtimestamp(42.5)) == 42.5
+
+    assert to_floats(np.array([1, 2])).tolist() == [1.0, 2.0]
+
+    assert to_floats(
+        np.array([datetime.fromtimestamp(1), datetime.fromtimestamp(2)])
+    ).tolist() == [1.0, 2.0]
+
+
+def test_columns_step(files_descriptor_and_size: List[Tuple[IO, int]]):
+    x_file = _PaddedCSVFile(
+        files_descriptor_and_size, [("x", int)], unwrap_if_one_column=True
+    )
+
+    (xs,) = x_file.columns(step=16)
+    assert xs.tolist() == [index // 3 for index in range(0, 300, 16)]
+
+    (xs,) = x_file.columns(130, 170, 7)
+    assert xs.tolist() == [index // 3 for index in range(130, 170, 7)]
+
+
+def test_bounds(files_descriptor_and_size: List[Tuple[IO, int]]):
+    x_file = _PaddedCSVFile(
+        files_descriptor_and_size, [("x", int)], unwrap_if_one_column=True
+    )
+
+    index = SparseIndex(x_file, 16)
+    assert len(index.values) == 19
+
+    all_xs = x_file[:]
+
+    for x in [-1, 0, 0.5, 5, 5.3, 15, 16, 46, 47, 98, 99, 100, 200]:
+        for side, bisect in (("left", bisect_left), ("right", bisect_right)):
+            start, stop = index.bounds(x, side)
+
+            assert 0 <= stop - start <= 16
+            assert start + bisect(all_xs[start:stop], x) == bisect(all_xs, x)
+
+
+def test_spacing_detect():
+    values = np.array([10.0, 26.0, 42.0, 58.0])
+    spacing = Spacing.detect(values, 16, 69.0, 60)
+
+    assert spacing is not None
+    assert (spacing.x0, spacing.dx, spacing.error) == (10.0, 1.0, 0)
+
+    # Gaps in `x`
+    assert Spacing.detect(np.array([0.0, 16.0, 1000.0, 1016.0]), 16, 1031, 64) is None
+
+    # Constant `x`
+    assert Spacing.detect(np.array([5.0, 5.0]), 16, 5.0, 32) is None
+
+
+def test_line_number_of(files_descriptor_and_size: List[Tuple[IO, int]]):
+    x_file = _PaddedCSVFile(
+        files_descriptor_and_size, [("x", int)], unwrap_if_one_column=True
+    )
+
+    index = SparseIndex(x_file, 16)
+    assert index.spacing is not None
+    assert index.spacing.error <= 2
+
+    all_xs = x_file[:]
+
+    for x in [-10, -1, 0, 0.5, 5, 5.3, 15, 16, 46, 47, 98, 99, 100, 200]:
+        for side, bisect in (("left", bisect_left), ("right", bisect_right)):
+            assert index.line_number_of(x, side) == bisect(all_xs, x)
+
+    # Same lookups without the regular spacing shortcut
+    index.spacing = None
+
+    for x in [-1, 0.5, 47, 99, 200]:
+        for side, bisect in (("left", bisect_left), ("right", bisect_right)):
+            assert index.line_number_of(x, side) == bisect(all_xs, x)
+
+
+def test_sparse_index(files_descriptor_and_size: List[Tuple[IO, int]], tmp_path):
+    x_file = _PaddedCSVFile(
+        files_descriptor_and_size, [("x", int)], unwrap_if_one_column=True
+    )
+
+    assert sparse_index(tmp_path, x_file, 300) is None
+    assert not (tmp_path / "x_index.npy").exists()
+
+    index = sparse_index(tmp_path, x_file, 16)
+    assert index is not None
+    assert (tmp_path / "x_index.npy").exists()
+    assert (tmp_path / "x_spacing.json").exists()
+
+    reloaded_index = sparse_index(tmp_path, x_file, 16)
+    assert reloaded_index is not None
+    assert reloaded_index.values.tolist() == index.values.tolist()
+
+    # The stored index does not match the period any more, so it is rebuilt
+    rebuilt_index = sparse_index(tmp_path, x_file, 32)
+    assert rebuilt_index is not None
+    assert len(rebuilt_index.values) == 10
+
+
+def test_sparse_index_appended(
+    files_descriptor_and_size: List[Tuple[IO, int]], tmp_path
+):
+    first_x_file = _PaddedCSVFile(
+        files_descriptor_and_size[:1], [("x", int)], unwrap_if_one_column=True
+    )
+
+    x_file = _PaddedCSVFile(
+        files_descriptor_and_size, [("x", int)], unwrap_if_one_column=True
+    )
+
+    assert sparse_index(tmp_path, first_x_file, 16) is not None
+
+    # Lines of the second chunk have been appended
+    index = sparse_index(tmp_path, x_file, 16)
+    assert index is not None
+    assert index.values.tolist() == SparseIndex(x_file, 16).values.tolist()
+
+    reloaded_index = sparse_index(tmp_path, x_file, 16)
+    assert reloaded_index is not None
+    assert reloaded_index.values.tolist() == index.values.tolist()
+
+    # Another period
+    assert len(sparse_index(tmp_path, x_file, 8).values) == 38  # type: ignore
+
+
+def test_sorted_padded_csv_file_with_index(splitted_dir: Path, monkeypatch):
+    with LevelFiles(splitted_dir.parent, ("x", int), ["y"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+        expected = spcf[4.5:50]
+        assert spcf.number_of_lines_between(5, 50) == 138
+
+    monkeypatch.setattr(
+        "csv_plot.csv.sorted_padded_csv_file.sparse_index",
+        lambda path, x_file: sparse_index(path, x_file, 16),
+    )
+
+    with LevelFiles(splitted_dir.parent, ("x", int), ["y"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+        assert (splitted_dir / "x_index.npy").exists()
+        assert spcf[4.5:50] == expected
+        assert spcf[5] == (5, [10.0])
+        assert spcf.number_of_lines_between(5, 50) == 138
+        assert spcf.number_of_lines_between(-5, 500) == 300
@@ -0,0 +1,115 @@
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from pytest import fixture
+
+from ..level_files import LevelFiles
+from ..tile_cache import TileCache, get_nb_bytes
+
+
+@fixture
+def splitted_dir(tmp_path: Path) -> Path:
+    """Two chunks, with 100 lines, written as the level 0 of `tmp_path`."""
+    level_path = tmp_path / "0"
+    level_path.mkdir()
+
+    with (level_path / "0.csv").open("w") as file_descriptor:
+        file_descriptor.write("x,y    \n")
+
+        for x in range(40):
+            file_descriptor.write(f"{x},{2 * x}".ljust(7) + "\n")
+
+    with (level_path / "1.csv").open("w") as file_descriptor:
+        for x in range(40, 100):
+            file_descriptor.write(f"{x},{2 * x}".ljust(7) + "\n")
+
+    return level_path
+
+
+def test_tile_cache(splitted_dir: Path):
+    cache = TileCache(tile_size=16)
+
+    with LevelFiles(splitted_dir.parent, ("x", int), ["y"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+
+        for start, stop in ((0, 100), (5, 37), (30, 31), (90, 100), (50, 50)):
+            xs, (ys,) = cache.columns_of_lines("level", spcf, start, stop)
+            expected_xs, (expected_ys,) = spcf.columns_of_lines(start, stop)
+
+            assert xs.tolist() == expected_xs.tolist()
+            assert ys.tolist() == expected_ys.tolist()
+
+    # The first request reads all the 7 tiles, then all tiles are in cache
+    assert cache.misses == 7
+    assert cache.hits == 3 + 1 + 2
+
+
+def test_tile_cache_budget(splitted_dir: Path):
+    # A tile of 16 lines is 16 * 8 bytes for `x` + 16 * 8 bytes for `y`
+    cache = TileCache(budget=2 * 256, tile_size=16)
+
+    with LevelFiles(splitted_dir.parent, ("x", int), ["y"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+
+        cache.columns_of_lines("level", spcf, 0, 16)
+        cache.columns_of_lines("level", spcf, 16, 32)
+        cache.columns_of_lines("level", spcf, 0, 16)
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        # Tile 1 is the least recently used one, so it is evicted
+        cache.columns_of_lines("level", spcf, 32, 48)
+        assert cache.nb_bytes == 2 * 256
+
+        cache.columns_of_lines("level", spcf, 0, 16)
+        assert (cache.hits, cache.misses) == (2, 3)
+
+        cache.columns_of_lines("level", spcf, 16, 32)
+        assert (cache.hits, cache.misses) == (2, 4)
+
+        # Same lines with an other key are distinct tiles
+        cache.columns_of_lines("other level", spcf, 16, 32)
+        assert (cache.hits, cache.misses) == (2, 5)
+
+
+def test_tile_cache_prefetch(splitted_dir: Path):
+    cache = TileCache(tile_size=16)
+
+    with LevelFiles(splitted_dir.parent, ("x", int), ["y"], []) as level_files:
+        (spcf,), _, _ = level_files.open()
+
+        cache.columns_of_lines("level", spcf, 0, 16)
+
+        # Tile 0 is already in cache, tiles 1 and 2 are read
+        assert len(list(cache.prefetch("level", spcf, 10, 40))) == 2
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        cache.columns_of_lines("level", spcf, 5, 45)
+        assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_tile_cache_memory_mapped(tmp_path: Path):
+    np.save(tmp_path / "x.npy", np.arange(64, dtype=np.float64))
+    xs = np.load(tmp_path / "x.npy", mmap_mode="r")
+
+    # Lines whose `x` is a view on a memory mapped file, and `y` a computed array
+    class MappedFile:
+        def __len__(self) -> int:
+            return len(xs)
+
+        def columns_of_lines(
+            self, start: int, stop: int
+        ) -> Tuple[np.ndarray, List[np.ndarray]]:
+            return xs[start:stop], [np.asarray(xs[start:stop]) * 2]
+
+    assert get_nb_bytes((xs[:16], [np.zeros(16)])) == 16 * 8
+    assert get_nb_bytes((np.zeros(16)[::2], [])) == 8 * 8
+
+    # Only `y` is counted: 16 * 8 bytes per tile
+    cache = TileCache(budget=2 * 128, tile_size=16)
+    cache.columns_of_lines("level", MappedFile(), 0, 32)  # type: ignore
+    assert cache.nb_bytes == 2 * 128
+
+    cache.columns_of_lines("level", MappedFile(), 0, 48)  # type: ignore
+    assert cache.nb_bytes == 2 * 128
+    assert (cache.hits, cache.misses) == (2, 3)
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from mmap import mmap
+from typing import Hashable, Iterator, List, Tuple
+
+import numpy as np
+
+from .sorted_padded_csv_file import _SortedPaddedCSVFile
+
+TILE_SIZE = 4096
+BUDGET = 256 * 1024 * 1024
+
+Tile = Tuple[np.ndarray, List[np.ndarray]]
+
+
+class TileCache:
+    """A least recently used cache of lines read from Sorted Padded CSV files.
+
+    Lines are cut into tiles of `tile_size` lines. Each tile is identified by a key
+    given by the caller (for instance the level of the file) and by its index in the
+    file. Only tiles which are not in the cache are read from the file.
+
+    When the total size of cached tiles exceeds `budget` bytes, least recently used
+    tiles are evicted. Arrays which are views on memory mapped files are not counted
+    (see `get_nb_bytes`): they do not hold memory, and reading them again is cheap.
+
+    Usage:
+    ======
+
+    cache = TileCache(budget=64 * 1024 * 1024)
+
+    xs, ys_columns = cache.columns_of_lines(<level>, <spcf>, 1000, 25000)
+    # Same as <spcf>.columns_of_lines(1000, 25000)
+
+    cache.hits, cache.misses  # Number of tiles read from memory and from the file
+    """
+
+    def __init__(self, budget: int = BUDGET, tile_size: int = TILE_SIZE) -> None:
+        """Initializer.
+
+        budget   : The maximum size, in bytes, of memory held by cached tiles
+        tile_size: The number of lines of a tile
+        """
+        self.__budget = budget
+        self.__tile_size = tile_size
+        self.__key_to_tile: "OrderedDict[Tuple[Hashable, int], Tile]" = OrderedDict()
+        self.__nb_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nb_bytes(self) -> int:
+        """The size, in bytes, of memory held by all cached tiles."""
+        return self.__nb_bytes
+
+    def columns_of_lines(
+        self, key: Hashable, spcf: _SortedPaddedCSVFile, start: int, stop: int
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Return the values of `x` and of each `y` of lines of `spcf` between the line
+        number `start` (included) and the line number `stop` (excluded), as arrays.
+
+        key : Identify `spcf` among all files cached
+        spcf: The file to read lines from
+        """
+        if start >= stop:
+            return spcf.columns_of_lines(start, stop)
+
+        first_tile = start // self.__tile_size
+        last_tile = (stop - 1) // self.__tile_size
+
+        tiles = [
+            self.__get_tile(key, spcf, index)
+            for index in range(first_tile, last_tile + 1)
+        ]
+
+        offset = first_tile * self.__tile_size
+
+        def concatenate(parts: List[np.ndarray]) -> np.ndarray:
+            return np.concatenate(parts)[start - offset : stop - offset]
+
+        tiles_xs, tiles_ys_columns = zip(*tiles)
+
+        return concatenate(list(tiles_xs)), [
+            concatenate(list(ys_columns)) for ys_columns in zip(*tiles_ys_columns)
+        ]
+
+    def contains(
+        self, key: Hashable, spcf: _SortedPaddedCSVFile, start: int, stop: int
+    ) -> bool:
+        """Return `True` if all lines of `spcf` between the line number `start`
+        (included) and the line number `stop` (excluded) are in the cache."""
+        if start >= stop:
+            return True
+
+        first_tile = start // self.__tile_size
+        last_tile = (stop - 1) // self.__tile_size
+
+        return all(
+            (key, index) in self.__key_to_tile
+            for index in range(first_tile, last_tile + 1)
+        )
+
+    def prefetch(
+        self, key: Hashable, spcf: _SortedPaddedCSVFile, start: int, stop: int
+    ) -> Iterator[None]:
+        """Read into the cache the tiles containing lines of `spcf` between the line
+        number `start` (included) and the line number `stop` (excluded), yielding
+        after each tile read from the file.
+
+        Tiles already in cache are not read again. Prefetched tiles are not counted
+        in `hits` nor in `misses`.
+        """
+        if start >= stop:
+            return
+
+        first_tile = start // self.__tile_size
+        last_tile = (stop - 1) // self.__tile_size
+
+        for index in range(first_tile, last_tile + 1):
+            if (key, index) not in self.__key_to_tile:
+                self.__add_tile(key, spcf, index)
+                yield
+
+    def invalidate(self, key: Hashable, start: int) -> None:
+        """Evict tiles identified by `key` containing lines from the line number
+        `start` (for instance because these lines changed, or because lines have been
+        appended after them)."""
+        first_tile = start // self.__tile_size
+
+        evicted_keys = [
+            (tile_key, index)
+            for tile_key, index in self.__key_to_tile
+            if tile_key == key and index >= first_tile
+        ]
+
+        for evicted_key in evicted_keys:
+            self.__nb_bytes -= get_nb_bytes(self.__key_to_tile.pop(evicted_key))
+
+    def __get_tile(self, key: Hashable, spcf: _SortedPaddedCSVFile, index: int) -> Tile:
+        tile = self.__key_to_tile.get((key, index))
+
+        if tile is not None:
+            self.hits += 1
+            self.__key_to_tile.move_to_end((key, index))
+            return tile
+
+        self.misses += 1
+        return self.__add_tile(key, spcf, index)
+
+    def __add_tile(self, key: Hashable, spcf: _SortedPaddedCSVFile, index: int) -> Tile:
+        tile = spcf.columns_of_lines(
+            index * self.__tile_size, min((index + 1) * self.__tile_size, len(spcf))
+        )
+
+        self.__key_to_tile[(key, index)] = tile
+        self.__nb_bytes += get_nb_bytes(tile)
+
+        while self.__nb_bytes > self.__budget and len(self.__key_to_tile) > 1:
+            _, evicted_tile = self.__key_to_tile.popitem(last=False)
+            self.__nb_bytes -= get_nb_bytes(evicted_tile)
+
+        return tile
+
+
+def is_memory_mapped(array: np.ndarray) -> bool:
+    """Return `True` if `array` is a view on a memory mapped file (for instance a
+    column of a binary file, see `load_column_arrays`)."""
+    base = array
+
+    while isinstance(base, np.ndarray):
+        if isinstance(base, np.memmap):
+            return True
+
+        base = base.base
+
+    return isinstance(base, mmap)
+
+
+def get_nb_bytes(tile: Tile) -> int:
+    """Return the size, in bytes, of the memory held by the arrays of `tile`, so
+    arrays which are views on memory mapped files are not counted.
+
+    For arrays of objects (datetimes for instance), only pointers are counted.
+    """
+    xs, ys_columns = tile
+
+    return sum(
+        array.nbytes for array in (xs, *ys_columns) if not is_memory_mapped(array)
+    )
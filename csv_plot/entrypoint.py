@@ -1,13 +1,14 @@
 import json
+import sys
 from csv import DictReader
-from datetime import datetime
-from multiprocessing import Pipe, cpu_count
+from multiprocessing import Event, Pipe, Process, cpu_count
 from pathlib import Path
-from threading import Thread
-from typing import Dict, Iterator, List, Optional, Tuple
+from signal import SIGTERM, signal
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import yaml  # type: ignore
-from click import Choice
+from click import Choice, Context, Group
 from click.utils import echo
 from pydantic import ValidationError
 from pyqtgraph import (
@@ -20,25 +21,108 @@ from pyqtgraph import (
     setConfigOptions,
 )
 from pyqtgraph.graphicsItems.PlotCurveItem import PlotCurveItem
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QIcon
 from typer import Argument, Exit, Option, Typer, colors, get_app_dir, prompt, secho
 
-from .background_processor import BackgroundProcessor
-from .csv import pad_and_sample, pseudo_hash
-from .csv.selector import Selected
+from .background_processor import BackgroundProcessor, Result
+from .csv import (
+    SAMPLING_PERIOD,
+    HashMode,
+    Storage,
+    find_processed_prefix,
+    follow,
+    get_dir_path,
+    get_string,
+    pad_and_sample,
+)
+from .csv.files_cache import get_entries, prune, touch
 from .interfaces import COLOR_NAME_TO_HEXA, Configuration
+from .shared_memory_ring import Header, Release, SharedMemoryRing
 
 setConfigOptions(background="#141830", foreground="#D1D4DC", antialias=True)
 
 ICON_PATH = Path(__file__).parent / "assets" / "icon-256.png"
 
-app = Typer()
+
+class MainByDefaultGroup(Group):
+    """Run the `main` command unless another command is given, so
+    `csv-plot <CSV file>` keeps working next to `csv-plot cache ...`. `csv-plot
+    --help` shows the help of the `main` command too."""
+
+    def parse_args(self, ctx: Context, args: List[str]) -> List[str]:
+        options = {
+            opt
+            for param in self.get_params(ctx)
+            for opt in param.opts
+            if opt not in ctx.help_option_names
+        }
+
+        if args != [] and args[0] not in self.commands and args[0] not in options:
+            args = ["main", *args]
+
+        return super().parse_args(ctx, args)
+
+
+app = Typer(cls=MainByDefaultGroup)
+cache_app = Typer(help="Manage files written while processing CSV files.")
+app.add_typer(cache_app, name="cache")
 
 APP_DIR = Path(get_app_dir("csv-plot"))
 FILES_DIR = APP_DIR / "files"
 FILES_DIR.mkdir(parents=True, exist_ok=True)
 CONFIG_PATH = APP_DIR / "config.json"
 
+# Default maximum size (in GB) of processed files kept in `FILES_DIR`
+FILES_BUDGET = 50.0
+
+# While the CSV file is displayed, its processing is checked for a failure every
+# `PROCESSING_CHECK_PERIOD` milliseconds
+PROCESSING_CHECK_PERIOD = 500
+
+
+def files_dir_option() -> Any:
+    return Option(
+        FILES_DIR,
+        envvar="CSV_PLOT_FILES_DIR",
+        help=(
+            "Directory where processed CSV files are kept, so they are not processed "
+            "again. Use a fast disk for big files."
+        ),
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    )
+
+
+def files_budget_option() -> Any:
+    return Option(
+        FILES_BUDGET,
+        envvar="CSV_PLOT_FILES_BUDGET",
+        help=(
+            "Maximum size (in GB) of processed CSV files kept in the files directory. "
+            "Least recently used ones are removed first."
+        ),
+    )
+
+
+def format_size(nb_bytes: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if nb_bytes < 1024:
+            return f"{nb_bytes:.1f} {unit}"
+
+        nb_bytes /= 1024
+
+    return f"{nb_bytes:.1f} TB"
+
+
+def run_until_terminated(function: Callable, *args: Any, **kwargs: Any) -> None:
+    """Call `function` with `args` and `kwargs`. If the process is terminated
+    meanwhile, exit instead of being killed, so pools of workers are terminated too,
+    and temporary files are removed."""
+    signal(SIGTERM, lambda *_: sys.exit(1))
+    function(*args, **kwargs)
+
 
 def default_configuration_directory_callback(
     default_configuration_directory: Optional[Path],
@@ -168,6 +252,72 @@ def main(
         is_eager=True,
         callback=default_configuration_directory_callback,
     ),
+    storage: Storage = Option(
+        Storage.Text,
+        help=(
+            "How the processed CSV file is stored on disk. With `binary`, values are "
+            "stored as typed binary records, so they are read without any parsing. "
+            "This is faster for big files. With `columns`, each column is stored in "
+            "its own binary files, so only plotted columns are read. This is faster "
+            "for files with many columns. With `indexed`, lines are not padded but "
+            "indexed, so files with a few long lines take much less disk space. "
+            "With `fields`, each field is padded to the width of its column, so "
+            "plotted columns are read without splitting lines."
+        ),
+    ),
+    hash_mode: HashMode = Option(
+        HashMode.Metadata,
+        help=(
+            "How an already processed CSV file is recognized. With `metadata`, its "
+            "size and its last modification date are used, so a copied or touched "
+            "file is processed again. With `content`, its size and blocks of its "
+            "content are used, so identical content is processed only once."
+        ),
+    ),
+    sampling_period: int = Option(
+        SAMPLING_PERIOD,
+        min=2,
+        help=(
+            "Number of lines of a level merged into one line of the next (coarser) "
+            "level. A higher period leads to fewer levels and fewer files, at the cost "
+            "of reading a few more lines when zooming. Useful for huge files."
+        ),
+    ),
+    append_only: bool = Option(
+        False,
+        help=(
+            "If the CSV file has already been processed and lines have only been "
+            "appended since, only process appended lines. This is faster for big "
+            "growing files, like logs."
+        ),
+    ),
+    follow_file: bool = Option(
+        False,
+        "--follow",
+        help=(
+            "Keep watching the CSV file while it is plotted: appended lines are "
+            "processed and plotted as they arrive. If the end of the file is visible, "
+            "the view scrolls to follow it."
+        ),
+    ),
+    files_dir: Path = files_dir_option(),
+    files_budget: float = files_budget_option(),
+    cache_size: int = Option(
+        256,
+        help=(
+            "Size (in MB) of the memory used to keep already read lines, so panning "
+            "back and forth does not read them again from disk. Lines read without "
+            "any copy from memory mapped files are not counted."
+        ),
+    ),
+    latency_budget: float = Option(
+        1.0,
+        help=(
+            "Maximum time (in seconds) to refine a view. When lines are not in memory, "
+            "a coarse view is displayed first, then refined. If refining takes longer, "
+            "the coarse view is kept."
+        ),
+    ),
 ):
     """🌊 CSV Plot - Plot CSV files without headaches! 🏄
 
@@ -179,6 +329,9 @@ def main(
     CSV Plot does respect your computer memory. This means CSV Plot only loads into
     memory the portion of file which has to be plotted. CSV Plot is able to plot files
     which are bigger than your memory, and has been tested with file larger than 100GB.
+
+    Processed CSV files are kept, so they are not processed again: see
+    `csv-plot cache --help` to manage them.
     """
 
     # Get CSV file columns names corresponding to floats
@@ -274,10 +427,83 @@ def main(
         chosen_configuration = configurations[int(choice)]
 
     x = chosen_configuration.general.variable
+    date_time_formats = chosen_configuration.general.date_time_formats
+
+    dir_path = get_dir_path(
+        csv_path, files_dir, x, storage, date_time_formats, hash_mode, sampling_period
+    )
+
+    # Only columns used by the configuration are processed
+    used_columns = sorted(chosen_configuration.variables | {x})
+
+    # Make room for the CSV file, without removing its already processed files, nor
+    # the ones of a previous version of it, from which it could be appended
+    files_dir.mkdir(parents=True, exist_ok=True)
+    touch(dir_path)
+    keep = {dir_path}
+
+    if append_only or follow_file:
+        string = get_string(x, storage, date_time_formats, sampling_period)
+
+        processed_prefix = find_processed_prefix(
+            csv_path, files_dir, string, used_columns
+        )
+
+        if processed_prefix is not None:
+            prefix_dir_path, _ = processed_prefix
+            keep.add(prefix_dir_path)
+
+    for entry in prune(files_dir, int(files_budget * 1024**3), keep=keep):
+        secho(
+            f"Removed {entry.source_path} ({format_size(entry.size)}) from "
+            f"{files_dir}",
+            fg=colors.BRIGHT_BLACK,
+        )
+
+    # The CSV file is processed while already displayed: levels are shown as soon as
+    # they are ready
+    stop_following, following = Event(), Event()
+
+    processing = (
+        Process(
+            target=run_until_terminated,
+            args=(
+                follow,
+                csv_path,
+                dir_path,
+                x,
+                cpu_count(),
+                storage,
+                date_time_formats,
+            ),
+            kwargs=dict(
+                is_stopped=stop_following.is_set,
+                hash_mode=hash_mode,
+                columns=used_columns,
+                period=sampling_period,
+                on_following=following.set,
+            ),
+        )
+        if follow_file
+        else Process(
+            target=run_until_terminated,
+            args=(
+                pad_and_sample,
+                csv_path,
+                files_dir,
+                x,
+                cpu_count(),
+                storage,
+                date_time_formats,
+                append_only,
+                hash_mode,
+                used_columns,
+                sampling_period,
+            ),
+        )
+    )
 
-    secho("Process CSV file... ", fg=colors.BRIGHT_GREEN, bold=True, nl=False)
-    pad_and_sample(csv_path, FILES_DIR, x, cpu_count())
-    secho("OK", fg=colors.BRIGHT_GREEN, bold=True)
+    processing.start()
 
     win = GraphicsLayoutWidget(show=True, title=f"🌊 CSV PLOT 🏄")
     win.showMaximized()
@@ -345,65 +571,194 @@ def main(
     for plot in plots:
         plot.setXLink(first_plot)
 
-    date_time_formats = chosen_configuration.general.date_time_formats
-
-    def date_time_parser(x: str, date_time_formats: List[str]) -> datetime:
-        for date_time_format in date_time_formats:
-            try:
-                return datetime.strptime(x, date_time_format)
-            except ValueError:
-                pass
-
-        raise ValueError(
-            f"time data '{x}' does not match any format in " "{date_time_formats}"
-        )
-
-    parser = (
-        (lambda x: date_time_parser(x, date_time_formats))
-        if date_time_formats is not None
-        else float
-    )
-
     connector, background_connector = Pipe()
+    ring = SharedMemoryRing()
 
     background_processor = BackgroundProcessor(
-        FILES_DIR / pseudo_hash(csv_path, x),
-        (x, parser),  # type: ignore
+        dir_path,
+        # If `x` is a datetime, it is stored as epoch seconds while preprocessing
+        (x, float),
         list(chosen_configuration.variables),
         background_connector,
+        ring,
+        cache_size * 1024 * 1024,
+        latency_budget,
+        follow_file,
     )
 
+    # `connector` is used both by the Qt thread and by the update thread
+    send_lock = Lock()
+
+    def send(item: Any):
+        with send_lock:
+            connector.send(item)
+
     def on_sig_x_range_changed():
         x_range, _ = first_plot.viewRange()
         x_min, x_max = x_range
 
-        connector.send((x_min, x_max, int(first_plot.width())))
+        send((x_min, x_max, int(first_plot.width())))
 
     def update():
+        displayed_header: Optional[Header] = None
+        displayed: Tuple[int, bool] = (0, False)
+
+        # While following the file, the visible range and the last displayed `x`, if
+        # the end of the file is visible
+        anchor: Optional[Tuple[List[float], float]] = None
+
         while True:
-            item: Optional[Tuple[List[float], Dict[str, Selected.Y]]] = connector.recv()
+            result: Optional[Result] = connector.recv()
 
-            if item is None:
+            if result is None:
                 return
 
-            xs, variable_to_y = item
+            # Drop results older than the displayed one (and coarse results of the
+            # displayed generation once its exact result is displayed)
+            if (result.generation, result.exact) < displayed:
+                if isinstance(result.data, Header):
+                    send(Release(result.data.index))
+
+                continue
 
+            xs, variable_to_y = (
+                ring.read(result.data)
+                if isinstance(result.data, Header)
+                else result.data
+            )
+
+            # `setData` does not copy arrays: views on the ring buffer are used as is
             for variable, y in variable_to_y.items():
                 low, high = variable_to_low_high[variable]
                 low.setData(xs, y.mins)
                 high.setData(xs, y.maxs)
 
+            # The previously displayed buffer is not referenced by curves any more
+            if displayed_header is not None:
+                send(Release(displayed_header.index))
+
+            displayed_header = result.data if isinstance(result.data, Header) else None
+            displayed = result.generation, result.exact
+
+            if not follow_file or not result.exact or len(xs) == 0:
+                continue
+
+            x_range, _ = first_plot.viewRange()
+            x_min, x_max = x_range
+            stop = float(xs[-1])
+
+            # Lines have been appended while the end of the file was visible: scroll
+            if anchor is not None and anchor[0] == x_range and stop > anchor[1]:
+                delta = stop - anchor[1]
+                anchor = None
+                first_plot.setXRange(x_min + delta, x_max + delta, padding=0)
+            else:
+                anchor = (x_range, stop) if stop <= x_max else None
+
     update_thread = Thread(target=update)
     update_thread.start()
 
+    processing_failed = False
+
+    # If the processing fails, nothing more would ever be displayed
+    def check_processing():
+        nonlocal processing_failed
+
+        if processing.exitcode in (None, 0):
+            return
+
+        processing_failed = True
+        processing_timer.stop()
+        secho("❌ ERROR: ", fg=colors.BRIGHT_RED, bold=True, nl=False)
+
+        secho(
+            f"Processing {csv_path} failed (exit code {processing.exitcode}) ❌",
+            fg=colors.BRIGHT_RED,
+        )
+
+        win.close()
+
+    processing_timer = QTimer()
+    processing_timer.timeout.connect(check_processing)
+
     try:
         first_plot.sigXRangeChanged.connect(on_sig_x_range_changed)
         background_processor.start()
-        connector.send((None, None, int(first_plot.width())))
+        send((None, None, int(first_plot.width())))
+        processing_timer.start(PROCESSING_CHECK_PERIOD)
 
         app = mkQApp()
         app.setWindowIcon(QIcon(str(ICON_PATH)))
         app.exec()
     finally:
-        connector.send(None)
+        send(None)
         background_processor.join()
+        ring.unlink()
+
+        # Following stops between two extensions of levels, so they are left
+        # consistent, whereas a processing (even the first one of a followed file) is
+        # interrupted (and done again next time)
+        stop_following.set()
+
+        if processing.is_alive() and not following.is_set():
+            processing.terminate()
+
+        processing.join()
+
+        secho(
+            f"Cache: {background_processor.cache_hits} hits, "
+            f"{background_processor.cache_misses} misses",
+            fg=colors.BRIGHT_BLACK,
+        )
+
+    if processing_failed:
+        raise Exit(code=1)
+
+
+@cache_app.command("list")
+def cache_list(files_dir: Path = files_dir_option()):
+    """List processed CSV files, from the least recently used to the most recently
+    used one."""
+    for entry in get_entries(files_dir):
+        secho(
+            f"{entry.last_access:%Y-%m-%d %H:%M:%S}  {format_size(entry.size):>10}  "
+            f"{entry.source_path}",
+        )
+
+        secho(f"    {entry.path}", fg=colors.BRIGHT_BLACK)
+
+
+@cache_app.command("size")
+def cache_usage(
+    files_dir: Path = files_dir_option(),
+    files_budget: float = files_budget_option(),
+):
+    """Show the size of processed CSV files, and the maximum size allowed."""
+    entries = get_entries(files_dir)
+    size = sum(entry.size for entry in entries)
+
+    secho(
+        f"{len(entries)} processed files: {format_size(size)} used out of "
+        f"{format_size(files_budget * 1024 ** 3)} in {files_dir}",
+    )
+
+
+@cache_app.command("prune")
+def cache_prune(
+    files_dir: Path = files_dir_option(),
+    files_budget: float = files_budget_option(),
+    remove_all: bool = Option(False, "--all", help="Remove all processed CSV files."),
+):
+    """Remove least recently used processed CSV files, until the others fit into the
+    maximum size allowed."""
+    removed_entries = prune(
+        files_dir, 0 if remove_all else int(files_budget * 1024**3)
+    )
+
+    for entry in removed_entries:
+        secho(f"Removed {entry.source_path} ({format_size(entry.size)})")
+
+    secho(
+        f"{format_size(sum(entry.size for entry in removed_entries))} freed",
+        fg=colors.BRIGHT_GREEN,
+    )
@@ -1,4 +1,5 @@
 #include <Python.h>
+#include <ctype.h>
 #include <math.h>
 
 typedef struct
@@ -11,16 +12,22 @@ static PyObject *method_pad(PyObject *self, PyObject *args)
 {
     char *input_path, *output_path = NULL;
     long int start_byte, stop_byte;
+    long int width = -1;
     int len = 0;
     int max_len = 0;
     int nb_bytes_read = 0;
 
     char line[1000];
-    char format[10];
+    char format[24];
 
     /* Parse arguments */
-    if (!PyArg_ParseTuple(
-            args, "ssll", &input_path, &output_path, &start_byte, &stop_byte))
+    if (!PyArg_ParseTuple(args,
+                          "ssll|l",
+                          &input_path,
+                          &output_path,
+                          &start_byte,
+                          &stop_byte,
+                          &width))
         return NULL;
 
     long int amplitude = stop_byte - start_byte;
@@ -29,10 +36,13 @@ static PyObject *method_pad(PyObject *self, PyObject *args)
     FILE *input_fptr = fopen(input_path, "r");
     FILE *output_fptr = fopen(output_path, "w");
 
-    /* Get file max length */
+    /* Get file max length, unless it is already known (see `sample`) */
     fseek(input_fptr, start_byte, SEEK_SET);
 
-    while (nb_bytes_read < amplitude)
+    if (width >= 0)
+        max_len = (int)width + 1;
+
+    while (width < 0 && nb_bytes_read < amplitude)
     {
         fgets(line, sizeof(line), input_fptr);
         len = strlen(line);
@@ -61,15 +71,487 @@ static PyObject *method_pad(PyObject *self, PyObject *args)
     return PyLong_FromLong(0);
 }
 
+/* Read a whole line of `input_fptr` (whatever its length) into `*line`, growing it
+   if needed. Return the number of bytes read (0 at the end of the file). */
+static size_t read_line(FILE *input_fptr, char **line, size_t *capacity)
+{
+    size_t len = 0;
+
+    while (fgets(*line + len, (int)(*capacity - len), input_fptr))
+    {
+        len += strlen(*line + len);
+
+        if ((*line)[len - 1] == '\n')
+            break;
+
+        if (len + 1 >= *capacity)
+        {
+            *capacity *= 2;
+            *line = (char *)realloc(*line, *capacity);
+        }
+    }
+
+    return len;
+}
+
+/* Write into `projected` the fields of `line` whose indexes are in the sorted
+   `indexes`, separated by commas. Return the length of `projected`. */
+static size_t project(const char *line, size_t len, const long *indexes,
+                      Py_ssize_t nb_indexes, char *projected)
+{
+    size_t projected_len = 0;
+    size_t field_start = 0;
+    long field_index = 0;
+    Py_ssize_t next = 0;
+
+    if (len > 0 && line[len - 1] == '\n')
+        len--;
+
+    for (size_t i = 0; i <= len && next < nb_indexes; i++)
+    {
+        if (i < len && line[i] != ',')
+            continue;
+
+        if (field_index == indexes[next])
+        {
+            if (next > 0)
+                projected[projected_len++] = ',';
+
+            memcpy(projected + projected_len, line + field_start, i - field_start);
+            projected_len += i - field_start;
+            next++;
+        }
+
+        field_index++;
+        field_start = i + 1;
+    }
+
+    return projected_len;
+}
+
+/* Return a newly allocated array containing the integers of the Python list
+   `py_list`, and write its length into `nb_items`. Return NULL (with a Python
+   exception set) if an item is not an integer. */
+static long *parse_indexes(PyObject *py_list, Py_ssize_t *nb_items)
+{
+    *nb_items = PyList_Size(py_list);
+    long *items = (long *)calloc(*nb_items > 0 ? *nb_items : 1, sizeof(long));
+
+    for (Py_ssize_t i = 0; i < *nb_items; i++)
+    {
+        PyObject *item = PyList_GetItem(py_list, i);
+
+        if (!PyLong_Check(item))
+        {
+            PyErr_SetString(PyExc_TypeError, "Indexes must be integers");
+            free(items);
+            return NULL;
+        }
+
+        items[i] = PyLong_AsLong(item);
+    }
+
+    return items;
+}
+
+/* Write into `starts` and `lens` the start and the length, in `line`, of the fields
+   whose indexes are in the sorted `indexes`. Missing fields are empty. */
+static void split_fields(const char *line, size_t len, const long *indexes,
+                         Py_ssize_t nb_indexes, size_t *starts, size_t *lens)
+{
+    size_t field_start = 0;
+    long field_index = 0;
+    Py_ssize_t next = 0;
+
+    if (len > 0 && line[len - 1] == '\n')
+        len--;
+
+    for (Py_ssize_t i = 0; i < nb_indexes; i++)
+    {
+        starts[i] = len;
+        lens[i] = 0;
+    }
+
+    for (size_t i = 0; i <= len && next < nb_indexes; i++)
+    {
+        if (i < len && line[i] != ',')
+            continue;
+
+        if (field_index == indexes[next])
+        {
+            starts[next] = field_start;
+            lens[next] = i - field_start;
+            next++;
+        }
+
+        field_index++;
+        field_start = i + 1;
+    }
+}
+
+static PyObject *method_field_widths(PyObject *self, PyObject *args)
+{
+    char *input_path = NULL;
+    long int start_byte, stop_byte;
+    PyObject *py_indexes;
+    Py_ssize_t nb_indexes;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTuple(
+            args, "sllO", &input_path, &start_byte, &stop_byte, &py_indexes))
+        return NULL;
+
+    long *indexes = parse_indexes(py_indexes, &nb_indexes);
+
+    if (indexes == NULL)
+        return NULL;
+
+    size_t *starts = (size_t *)calloc(nb_indexes + 1, sizeof(size_t));
+    size_t *lens = (size_t *)calloc(nb_indexes + 1, sizeof(size_t));
+    size_t *widths = (size_t *)calloc(nb_indexes + 1, sizeof(size_t));
+
+    long amplitude = stop_byte - start_byte;
+    long nb_bytes_read = 0;
+    size_t capacity = 1024;
+    char *line = (char *)malloc(capacity);
+
+    FILE *input_fptr = fopen(input_path, "r");
+    fseek(input_fptr, start_byte, SEEK_SET);
+
+    /* Get fields max lengths */
+    while (nb_bytes_read < amplitude)
+    {
+        size_t len = read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        split_fields(line, len, indexes, nb_indexes, starts, lens);
+
+        for (Py_ssize_t i = 0; i < nb_indexes; i++)
+            widths[i] = lens[i] > widths[i] ? lens[i] : widths[i];
+
+        nb_bytes_read += (long)len;
+    }
+
+    fclose(input_fptr);
+
+    PyObject *py_widths = PyList_New(nb_indexes);
+
+    for (Py_ssize_t i = 0; i < nb_indexes; i++)
+        PyList_SetItem(py_widths, i, PyLong_FromSize_t(widths[i]));
+
+    free(line);
+    free(widths);
+    free(lens);
+    free(starts);
+    free(indexes);
+
+    return py_widths;
+}
+
+static PyObject *method_pad_fields(PyObject *self, PyObject *args)
+{
+    char *input_path, *output_path = NULL;
+    long int start_byte, stop_byte;
+    PyObject *py_indexes, *py_widths;
+    Py_ssize_t nb_indexes, nb_widths;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTuple(args,
+                          "ssllOO",
+                          &input_path,
+                          &output_path,
+                          &start_byte,
+                          &stop_byte,
+                          &py_indexes,
+                          &py_widths))
+        return NULL;
+
+    long *indexes = parse_indexes(py_indexes, &nb_indexes);
+
+    if (indexes == NULL)
+        return NULL;
+
+    long *widths = parse_indexes(py_widths, &nb_widths);
+
+    if (widths == NULL)
+    {
+        free(indexes);
+        return NULL;
+    }
+
+    if (nb_widths != nb_indexes)
+    {
+        PyErr_SetString(PyExc_ValueError, "Expected one width per index");
+        free(widths);
+        free(indexes);
+        return NULL;
+    }
+
+    size_t *starts = (size_t *)calloc(nb_indexes + 1, sizeof(size_t));
+    size_t *lens = (size_t *)calloc(nb_indexes + 1, sizeof(size_t));
+
+    long amplitude = stop_byte - start_byte;
+    long nb_bytes_read = 0;
+    size_t capacity = 1024;
+    char *line = (char *)malloc(capacity);
+
+    FILE *input_fptr = fopen(input_path, "r");
+    FILE *output_fptr = fopen(output_path, "w");
+    fseek(input_fptr, start_byte, SEEK_SET);
+
+    /* Pad each field to the width of its column */
+    while (nb_bytes_read < amplitude)
+    {
+        size_t len = read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        split_fields(line, len, indexes, nb_indexes, starts, lens);
+
+        for (Py_ssize_t i = 0; i < nb_indexes; i++)
+        {
+            int padding = (int)widths[i] - (int)lens[i];
+
+            fprintf(output_fptr, "%.*s%*s%c", (int)lens[i], line + starts[i],
+                    padding > 0 ? padding : 0, "", i < nb_indexes - 1 ? ',' : '\n');
+        }
+
+        nb_bytes_read += (long)len;
+    }
+
+    fclose(output_fptr);
+    fclose(input_fptr);
+
+    free(line);
+    free(lens);
+    free(starts);
+    free(widths);
+    free(indexes);
+
+    return PyLong_FromLong(0);
+}
+
+static PyObject *method_pad_columns(PyObject *self, PyObject *args)
+{
+    char *input_path, *output_path = NULL;
+    long int start_byte, stop_byte;
+    long int width = -1;
+    PyObject *py_indexes;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTuple(args,
+                          "ssllO|l",
+                          &input_path,
+                          &output_path,
+                          &start_byte,
+                          &stop_byte,
+                          &py_indexes,
+                          &width))
+        return NULL;
+
+    Py_ssize_t nb_indexes;
+    long *indexes = parse_indexes(py_indexes, &nb_indexes);
+
+    if (indexes == NULL)
+        return NULL;
+
+    long amplitude = stop_byte - start_byte;
+    long nb_bytes_read = 0;
+    size_t max_len = 0;
+    size_t capacity = 1024;
+    char *line = (char *)malloc(capacity);
+    char *projected = (char *)malloc(capacity);
+
+    FILE *input_fptr = fopen(input_path, "r");
+    FILE *output_fptr = fopen(output_path, "w");
+
+    /* Get projected lines max length, unless it is already known (see `sample`) */
+    fseek(input_fptr, start_byte, SEEK_SET);
+
+    if (width >= 0)
+        max_len = (size_t)width;
+
+    while (width < 0 && nb_bytes_read < amplitude)
+    {
+        size_t len = read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        projected = (char *)realloc(projected, capacity);
+        size_t projected_len = project(line, len, indexes, nb_indexes, projected);
+        max_len = projected_len > max_len ? projected_len : max_len;
+        nb_bytes_read += (long)len;
+    }
+
+    nb_bytes_read = 0;
+
+    /* Pad */
+    fseek(input_fptr, start_byte, SEEK_SET);
+
+    while (nb_bytes_read < amplitude)
+    {
+        size_t len = read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        projected = (char *)realloc(projected, capacity);
+        size_t projected_len = project(line, len, indexes, nb_indexes, projected);
+        fprintf(output_fptr, "%.*s%*s\n", (int)projected_len, projected,
+                (int)(max_len - projected_len), "");
+        nb_bytes_read += (long)len;
+    }
+
+    fclose(output_fptr);
+    fclose(input_fptr);
+
+    free(projected);
+    free(line);
+    free(indexes);
+
+    return PyLong_FromLong(0);
+}
+
+static PyObject *method_write_indexed(PyObject *self, PyObject *args)
+{
+    char *input_path, *output_path = NULL;
+    long int start_byte, stop_byte;
+    PyObject *py_indexes = Py_None;
+    Py_ssize_t nb_indexes = 0;
+    long *indexes = NULL;
+
+    /* Parse arguments */
+    if (!PyArg_ParseTuple(args,
+                          "ssll|O",
+                          &input_path,
+                          &output_path,
+                          &start_byte,
+                          &stop_byte,
+                          &py_indexes))
+        return NULL;
+
+    if (py_indexes != Py_None)
+    {
+        indexes = parse_indexes(py_indexes, &nb_indexes);
+
+        if (indexes == NULL)
+            return NULL;
+    }
+
+    long amplitude = stop_byte - start_byte;
+    long nb_bytes_read = 0;
+    size_t capacity = 1024;
+    char *line = (char *)malloc(capacity);
+    char *projected = (char *)malloc(capacity);
+
+    size_t nb_offsets = 1;
+    size_t offsets_capacity = 1024;
+    uint64_t *offsets = (uint64_t *)malloc(offsets_capacity * sizeof(uint64_t));
+    offsets[0] = 0;
+
+    FILE *input_fptr = fopen(input_path, "r");
+    FILE *output_fptr = fopen(output_path, "w");
+    fseek(input_fptr, start_byte, SEEK_SET);
+
+    /* Write lines without trailing white spaces, and the offset following each one */
+    while (nb_bytes_read < amplitude)
+    {
+        size_t len = read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        nb_bytes_read += (long)len;
+
+        const char *content = line;
+        size_t content_len = len;
+
+        if (indexes != NULL)
+        {
+            projected = (char *)realloc(projected, capacity);
+            content_len = project(line, len, indexes, nb_indexes, projected);
+            content = projected;
+        }
+
+        while (content_len > 0 && isspace((unsigned char)content[content_len - 1]))
+            content_len--;
+
+        fprintf(output_fptr, "%.*s\n", (int)content_len, content);
+
+        if (nb_offsets == offsets_capacity)
+        {
+            offsets_capacity *= 2;
+            offsets = (uint64_t *)realloc(offsets, offsets_capacity * sizeof(uint64_t));
+        }
+
+        offsets[nb_offsets] = offsets[nb_offsets - 1] + content_len + 1;
+        nb_offsets++;
+    }
+
+    fclose(output_fptr);
+    fclose(input_fptr);
+
+    PyObject *py_offsets = PyBytes_FromStringAndSize(
+        (const char *)offsets, (Py_ssize_t)(nb_offsets * sizeof(uint64_t)));
+
+    free(offsets);
+    free(projected);
+    free(line);
+    free(indexes);
+
+    return py_offsets;
+}
+
+/* Update `widths` with `line`: with no `indexes`, its length (without its new line
+   character). Else, if `by_field`, the length of each of its fields whose indexes are
+   in `indexes`, else the length of the line projected on these fields (see
+   `project`). */
+static void measure(const char *line, size_t len, const long *indexes,
+                    Py_ssize_t nb_indexes, int by_field, size_t *widths,
+                    size_t *starts, size_t *lens)
+{
+    if (indexes == NULL)
+    {
+        size_t content_len = len > 0 && line[len - 1] == '\n' ? len - 1 : len;
+        widths[0] = content_len > widths[0] ? content_len : widths[0];
+        return;
+    }
+
+    split_fields(line, len, indexes, nb_indexes, starts, lens);
+
+    if (by_field)
+    {
+        for (Py_ssize_t i = 0; i < nb_indexes; i++)
+            widths[i] = lens[i] > widths[i] ? lens[i] : widths[i];
+
+        return;
+    }
+
+    /* Projected fields are separated by commas */
+    size_t projected_len = nb_indexes > 0 ? (size_t)nb_indexes - 1 : 0;
+
+    for (Py_ssize_t i = 0; i < nb_indexes; i++)
+        projected_len += lens[i];
+
+    widths[0] = projected_len > widths[0] ? projected_len : widths[0];
+}
+
 static PyObject *method_sample(PyObject *self, PyObject *args)
 {
     char *input_path, *output_path = NULL;
     long int x_index, nb_values, period, start_byte, stop_byte;
+    long int measure_start_byte = -1;
     PyObject *py_deltas;
+    PyObject *py_measure_indexes = Py_None;
+    int by_field = 0;
 
     /* Parse arguments */
     if (!PyArg_ParseTuple(args,
-                          "sslOllll",
+                          "sslOllll|lOp",
                           &input_path,
                           &output_path,
                           &x_index,
@@ -77,7 +559,10 @@ static PyObject *method_sample(PyObject *self, PyObject *args)
                           &nb_values,
                           &period,
                           &start_byte,
-                          &stop_byte))
+                          &stop_byte,
+                          &measure_start_byte,
+                          &py_measure_indexes,
+                          &by_field))
         return NULL;
 
     Py_ssize_t deltas_len = PyList_Size(py_deltas);
@@ -93,6 +578,25 @@ static PyObject *method_sample(PyObject *self, PyObject *args)
         deltas[i] = PyLong_AsLong(delta);
     }
 
+    Py_ssize_t nb_measure_indexes = 1;
+    long *measure_indexes = NULL;
+
+    if (py_measure_indexes != Py_None)
+    {
+        measure_indexes = parse_indexes(py_measure_indexes, &nb_measure_indexes);
+
+        if (measure_indexes == NULL)
+        {
+            free(deltas);
+            return NULL;
+        }
+    }
+
+    Py_ssize_t nb_widths = measure_indexes != NULL && by_field ? nb_measure_indexes : 1;
+    size_t *widths = (size_t *)calloc(nb_widths + 1, sizeof(size_t));
+    size_t *starts = (size_t *)calloc(nb_measure_indexes + 1, sizeof(size_t));
+    size_t *lens = (size_t *)calloc(nb_measure_indexes + 1, sizeof(size_t));
+
     min_max *min_max_tuples = (min_max *)calloc(nb_values, sizeof(min_max));
 
     for (int i = 0; i < nb_values; i++)
@@ -102,21 +606,49 @@ static PyObject *method_sample(PyObject *self, PyObject *args)
     }
 
     long line_num = 0;
+    long nb_lines = 0;
     long nb_bytes_read = 0;
     long amplitude = stop_byte - start_byte;
 
-    char line[1000];
+    size_t capacity = 1024;
+    char *line = (char *)malloc(capacity);
     char x_value[50];
 
     FILE *input_fptr = fopen(input_path, "r");
     FILE *output_fptr = fopen(output_path, "a");
 
+    /* Lines before `start_byte` (the header) are measured but not sampled */
+    if (measure_start_byte < 0)
+        measure_start_byte = start_byte;
+
+    fseek(input_fptr, measure_start_byte, SEEK_SET);
+
+    for (long position = measure_start_byte; position < start_byte;)
+    {
+        size_t len = read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        measure(line, len, measure_indexes, nb_measure_indexes, by_field, widths,
+                starts, lens);
+
+        position += (long)len;
+    }
+
     fseek(input_fptr, start_byte, SEEK_SET);
 
     while (nb_bytes_read < amplitude)
     {
-        fgets(line, sizeof(line), input_fptr);
-        long len = (long)strlen(line);
+        long len = (long)read_line(input_fptr, &line, &capacity);
+
+        if (len == 0)
+            break;
+
+        /* Measured before being split by `strtok` */
+        measure(line, (size_t)len, measure_indexes, nb_measure_indexes, by_field,
+                widths, starts, lens);
+
         char *value_string = strtok(line, ",");
 
         for (int i = 0; i < deltas_len; i++)
@@ -133,7 +665,7 @@ static PyObject *method_sample(PyObject *self, PyObject *args)
                 float current_max_value = min_max_tuples[i].max;
 
                 min_max_tuples[i].min = value < current_min_value ? value : current_min_value;
-                min_max_tuples[i].max = value > current_max_value ? value : current_min_value;
+                min_max_tuples[i].max = value > current_max_value ? value : current_max_value;
             }
             else if (line_num % period == 0)
                 strcpy(x_value, value_string);
@@ -151,6 +683,8 @@ static PyObject *method_sample(PyObject *self, PyObject *args)
                     min_max_tuples[nb_values - 1].min,
                     min_max_tuples[nb_values - 1].max);
 
+            nb_lines++;
+
             for (int i = 0; i < nb_values; i++)
             {
                 min_max_tuples[i].min = INFINITY;
@@ -173,105 +707,183 @@ static PyObject *method_sample(PyObject *self, PyObject *args)
         fprintf(output_fptr, "%f,%f\n",
                 min_max_tuples[nb_values - 1].min,
                 min_max_tuples[nb_values - 1].max);
+
+        nb_lines++;
     }
 
     fclose(output_fptr);
     fclose(input_fptr);
 
+    PyObject *py_widths = PyList_New(nb_widths);
+
+    for (Py_ssize_t i = 0; i < nb_widths; i++)
+        PyList_SetItem(py_widths, i, PyLong_FromSize_t(widths[i]));
+
+    free(line);
     free(min_max_tuples);
+    free(lens);
+    free(starts);
+    free(widths);
+    free(measure_indexes);
     free(deltas);
-    return PyLong_FromLong(0);
+
+    return Py_BuildValue("(lN)", nb_lines, py_widths);
 }
 
-static PyObject *method_sample_sampled(PyObject *self, PyObject *args)
+/* A sampled level being written by `sample_levels` */
+typedef struct
+{
+    FILE *output_fptr;
+    float *values;
+    long line_num;
+    char x_value[50];
+    char *row;
+} level;
+
+static void feed_level(level *levels, long level_index, long nb_levels,
+                       long nb_y_values, long period, char *line);
+
+/* Write the pending line of `levels[level_index]`, and feed it to the next level */
+static void emit_level(level *levels, long level_index, long nb_levels,
+                       long nb_y_values, long period)
+{
+    level *current = &levels[level_index];
+    int len = sprintf(current->row, "%s,", current->x_value);
+
+    for (int i = 0; i < nb_y_values - 1; i++)
+        len += sprintf(current->row + len, "%f,", current->values[i]);
+
+    sprintf(current->row + len, "%f\n", current->values[nb_y_values - 1]);
+    fputs(current->row, current->output_fptr);
+
+    for (int i = 0; i < nb_y_values; i++)
+        current->values[i] = i % 2 == 0 ? INFINITY : -INFINITY;
+
+    /* The next level parses the written line, as if it were read from a file */
+    if (level_index + 1 < nb_levels)
+        feed_level(levels, level_index + 1, nb_levels, nb_y_values, period,
+                   current->row);
+}
+
+/* Merge `line` into the pending line of `levels[level_index]`: the first x value,
+   and the minimum (resp. maximum) of each y minimum (resp. maximum) value, of every
+   `period` lines. `line` is modified. */
+static void feed_level(level *levels, long level_index, long nb_levels,
+                       long nb_y_values, long period, char *line)
+{
+    level *current = &levels[level_index];
+    char *value_string = strtok(line, ",");
+
+    if (current->line_num % period == 0)
+        strcpy(current->x_value, value_string);
+
+    for (int i = 0; i < nb_y_values; i++)
+    {
+        value_string = strtok(NULL, ",");
+        float value = atof(value_string);
+        float current_value = current->values[i];
+
+        current->values[i] = i % 2 == 0 ? (value < current_value ? value : current_value)
+                                        : (value > current_value ? value : current_value);
+    }
+
+    current->line_num++;
+
+    if (current->line_num % period == 0)
+        emit_level(levels, level_index, nb_levels, nb_y_values, period);
+}
+
+static PyObject *method_sample_levels(PyObject *self, PyObject *args)
 {
     const char *input_path;
-    const char *output_path;
+    PyObject *py_output_paths;
     long int nb_y_values, period;
-    long int line_num = 0;
     int has_header;
 
-    char line[1000];
-    char x_value[50];
-
     /* Parse arguments */
     if (!PyArg_ParseTuple(args,
-                          //   "ssll",
-                          "ssllp",
+                          "sOllp",
                           &input_path,
-                          &output_path,
+                          &py_output_paths,
                           &nb_y_values,
                           &period,
                           &has_header))
         return NULL;
 
-    FILE *input_fptr = fopen(input_path, "r");
-    FILE *output_fptr = fopen(output_path, "a");
+    long nb_levels = (long)PyList_Size(py_output_paths);
 
-    if (has_header)
-    {
-        fgets(line, sizeof(line), input_fptr);
-    }
-
-    float *values = (float *)calloc(nb_y_values, sizeof(float));
+    if (nb_levels == 0)
+        return PyLong_FromLong(0);
 
-    for (int i = 0; i < nb_y_values; i++)
-        values[i] = i % 2 == 0 ? INFINITY : -INFINITY;
+    level *levels = (level *)calloc(nb_levels, sizeof(level));
 
-    while (fgets(line, sizeof(line), input_fptr))
+    for (long k = 0; k < nb_levels; k++)
     {
-        char *value_string = strtok(line, ",");
-
-        if (line_num % period == 0)
-            strcpy(x_value, value_string);
+        PyObject *py_output_path = PyList_GetItem(py_output_paths, k);
 
-        for (int i = 0; i < nb_y_values; i++)
+        if (!PyUnicode_Check(py_output_path))
         {
-            value_string = strtok(NULL, ",");
-            float value = atof(value_string);
-            float current_value = values[i];
+            PyErr_SetString(PyExc_TypeError, "Output paths must be strings");
 
-            values[i] = i % 2 == 0 ? (value < current_value ? value : current_value)
-                                   : (value > current_value ? value : current_value);
+            for (long j = 0; j < k; j++)
+            {
+                fclose(levels[j].output_fptr);
+                free(levels[j].values);
+                free(levels[j].row);
+            }
+
+            free(levels);
+            return NULL;
         }
 
-        if (line_num % period == period - 1)
-        {
-            fprintf(output_fptr, "%s,", x_value);
+        levels[k].output_fptr = fopen(PyUnicode_AsUTF8(py_output_path), "a");
+        levels[k].values = (float *)calloc(nb_y_values, sizeof(float));
+        levels[k].row = (char *)malloc(64 * (nb_y_values + 2));
 
-            for (int i = 0; i < nb_y_values - 1; i++)
-                fprintf(output_fptr, "%f,", values[i]);
+        for (int i = 0; i < nb_y_values; i++)
+            levels[k].values[i] = i % 2 == 0 ? INFINITY : -INFINITY;
+    }
 
-            fprintf(output_fptr, "%f\n", values[nb_y_values - 1]);
+    size_t capacity = 1024;
+    char *line = (char *)malloc(capacity);
+    FILE *input_fptr = fopen(input_path, "r");
 
-            for (int i = 0; i < nb_y_values; i++)
-                values[i] = i % 2 == 0 ? INFINITY : -INFINITY;
-        }
+    if (has_header)
+        read_line(input_fptr, &line, &capacity);
 
-        line_num++;
-    }
+    /* All levels are written while the finest one is read only once */
+    while (read_line(input_fptr, &line, &capacity) > 0)
+        feed_level(levels, 0, nb_levels, nb_y_values, period, line);
 
-    if ((line_num - 1) % period != period - 1)
-    {
-        fprintf(output_fptr, "%s,", x_value);
+    /* Pending lines are written from the finest level, so they are fed to coarser
+       ones */
+    for (long k = 0; k < nb_levels; k++)
+        if (levels[k].line_num % period != 0)
+            emit_level(levels, k, nb_levels, nb_y_values, period);
 
-        for (int i = 0; i < nb_y_values - 1; i++)
-            fprintf(output_fptr, "%f,", values[i]);
+    fclose(input_fptr);
+    free(line);
 
-        fprintf(output_fptr, "%f\n", values[nb_y_values - 1]);
+    for (long k = 0; k < nb_levels; k++)
+    {
+        fclose(levels[k].output_fptr);
+        free(levels[k].values);
+        free(levels[k].row);
     }
 
-    fclose(output_fptr);
-    fclose(input_fptr);
-    free(values);
+    free(levels);
 
     return PyLong_FromLong(0);
 }
 
 static PyMethodDef FpadAndSampleMethods[] = {
     {"pad", method_pad, METH_VARARGS, "Fast pad"},
+    {"pad_columns", method_pad_columns, METH_VARARGS, "Fast pad, only some columns"},
+    {"field_widths", method_field_widths, METH_VARARGS, "Fast fields max widths"},
+    {"pad_fields", method_pad_fields, METH_VARARGS, "Fast pad, field by field"},
+    {"write_indexed", method_write_indexed, METH_VARARGS, "Fast write without padding"},
     {"sample", method_sample, METH_VARARGS, "Fast sample"},
-    {"sample_sampled", method_sample_sampled, METH_VARARGS, "Fast sample sampled"},
+    {"sample_levels", method_sample_levels, METH_VARARGS, "Fast sample all levels"},
     {NULL, NULL, 0, NULL}};
 
 static struct PyModuleDef fast_pad_and_sample_module = {
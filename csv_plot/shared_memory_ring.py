@@ -0,0 +1,147 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from .csv.selector import Selection
+
+NB_BUFFERS = 3
+BUFFER_SIZE = 16 * 1024 * 1024
+
+
+class Header(NamedTuple):
+    """Describe a result written into a `SharedMemoryRing` buffer.
+
+    index     : The index of the buffer in the ring
+    generation: A number incremented for each written result
+    length    : The number of values of `x`
+    names     : The names of ys, in the order they are written in the buffer
+    """
+
+    index: int
+    generation: int
+    length: int
+    names: List[str]
+
+
+class Release(NamedTuple):
+    """Tell the writer the buffer `index` is not used any more by the reader."""
+
+    index: int
+
+
+class SharedMemoryRing:
+    """A ring of reusable shared memory buffers, used to send results from a process to
+    another one without pickling nor copying them.
+
+    The writer writes `xs` and `(mins, maxs)` of each `y` contiguously into a free
+    buffer, then only sends the returned `Header` to the reader. The reader gets NumPy
+    views on this buffer, and sends back a `Release` once it does not use them any
+    more. Until then, the writer does not reuse this buffer.
+
+    Usage:
+    ======
+
+    ring = SharedMemoryRing(3, 16 * 1024 * 1024)
+
+    # Writer side
+    header = ring.write(xs, name_to_y)
+
+    if header is not None:
+        connection.send(header)
+    else:
+        # No free buffer, or result too big for a buffer
+        connection.send((xs, name_to_y))
+
+    # Reader side
+    xs, name_to_y = ring.read(connection.recv())
+    ...
+    connection.send(Release(header.index))
+
+    # Writer side, once `Release` is received
+    ring.release(header.index)
+
+    # Owner side, once both sides are done
+    ring.unlink()
+    """
+
+    def __init__(self, nb_buffers: int = NB_BUFFERS, size: int = BUFFER_SIZE) -> None:
+        """Initializer.
+
+        nb_buffers: The number of buffers of the ring
+        size      : The size of each buffer, in bytes
+        """
+        self.__buffers = [
+            SharedMemory(create=True, size=size) for _ in range(nb_buffers)
+        ]
+
+        self.__size = size
+        self.__free_indexes: Set[int] = set(range(nb_buffers))
+        self.__generation = 0
+
+    def write(
+        self, xs: np.ndarray, name_to_y: Dict[str, Selection.Y]
+    ) -> Optional[Header]:
+        """Write `xs` and `name_to_y` into a free buffer, and return the corresponding
+        header.
+
+        Return `None` if there is no free buffer, or if the result does not fit into
+        one buffer.
+        """
+        length = len(xs)
+        nb_bytes = length * np.dtype(np.float64).itemsize * (1 + 2 * len(name_to_y))
+
+        if self.__free_indexes == set() or nb_bytes > self.__size:
+            return None
+
+        index = min(self.__free_indexes)
+        self.__free_indexes.remove(index)
+        self.__generation += 1
+
+        header = Header(index, self.__generation, length, list(name_to_y))
+        views = self.__views(header)
+
+        views[0][:] = xs
+
+        for (mins, maxs), y in zip(zip(views[1::2], views[2::2]), name_to_y.values()):
+            mins[:] = y.mins
+            maxs[:] = y.maxs
+
+        return header
+
+    def read(self, header: Header) -> Tuple[np.ndarray, Dict[str, Selection.Y]]:
+        """Return views on `xs` and `name_to_y` written into the buffer described by
+        `header`.
+
+        Views are valid until `Release(header.index)` is sent to the writer.
+        """
+        xs, *mins_and_maxs = self.__views(header)
+
+        name_to_y = {
+            name: Selection.Y(mins=mins, maxs=maxs)
+            for name, mins, maxs in zip(
+                header.names, mins_and_maxs[::2], mins_and_maxs[1::2]
+            )
+        }
+
+        return xs, name_to_y
+
+    def release(self, index: int) -> None:
+        """Mark the buffer `index` as free."""
+        self.__free_indexes.add(index)
+
+    def unlink(self) -> None:
+        """Destroy all buffers of the ring. Has to be called once by the owner."""
+        for buffer in self.__buffers:
+            buffer.unlink()
+
+    def __views(self, header: Header) -> List[np.ndarray]:
+        """Return the views on the buffer described by `header`: `xs` first, then
+        `mins` and `maxs` of each `y`."""
+        array = np.ndarray(
+            (1 + 2 * len(header.names), header.length),
+            dtype=np.float64,
+            buffer=self.__buffers[header.index].buf,
+        )
+
+        return list(array)
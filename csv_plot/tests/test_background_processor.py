@@ -1,12 +1,24 @@
 from datetime import datetime
 from multiprocessing import Pipe
 from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import numpy as np
 
 from pytest import fixture
 
-from ..background_processor import BackgroundProcessor
+from ..background_processor import BackgroundProcessor, Result
+from ..csv import follow, get_dir_path, pad_and_sample
+from ..csv.pad_and_sample import extend
+from ..csv.pad_and_sample import READY_FILE_NAME
 from ..tests import assets
-from ..csv.selector import Selected
+from ..csv.selector import Selected, Selection
+from ..shared_memory_ring import Header, Release, SharedMemoryRing
+
+
+def to_lists(item: Union[Result, Tuple[np.ndarray, Dict[str, Selection.Y]]]) -> Tuple:
+    xs, name_to_y = item.data if isinstance(item, Result) else item
+    return xs.tolist(), {name: y.to_selected() for name, y in name_to_y.items()}
 
 
 @fixture
@@ -14,6 +26,20 @@ def source_dir() -> Path:
     return Path(assets.__file__).parent / "8e473f7e2ae6e79501a25895afe3756e"
 
 
+@fixture
+def big_dir(tmp_path: Path) -> Path:
+    csv_path = tmp_path / "big.csv"
+
+    with csv_path.open("w") as file_descriptor:
+        file_descriptor.write("x,y\n")
+
+        for index in range(10_000):
+            file_descriptor.write(f"{index / 100},{index % 7}\n")
+
+    pad_and_sample(csv_path, tmp_path, "x", 2)
+    return get_dir_path(csv_path, tmp_path, "x")
+
+
 def test_background_processor_1(source_dir: Path):
     connector, background_connector = Pipe()
 
@@ -58,7 +84,7 @@ def test_background_processor_3(source_dir: Path):
     connector.send((None, None, 1000))
     background_processor.start()
 
-    assert connector.recv() == (
+    assert to_lists(connector.recv()) == (
         [
             1565877786.595,
             1565877786.595,
@@ -124,7 +150,7 @@ def test_background_processor_4(source_dir: Path):
     )
 
     background_processor.start()
-    assert connector.recv() == (
+    assert to_lists(connector.recv()) == (
         [
             1565877786.595,
             1565877786.595,
@@ -169,3 +195,179 @@ def test_background_processor_4(source_dir: Path):
     )
     connector.send(None)
     background_processor.join()
+
+
+def test_background_processor_ring(source_dir: Path):
+    connector, background_connector = Pipe()
+    ring = SharedMemoryRing(2, 1024)
+
+    background_processor = BackgroundProcessor(
+        source_dir,
+        ("time", lambda x: datetime.strptime(x, "%Y-%m-%d %H:%M:%S.%f+00")),  # type: ignore
+        ["size", "price"],
+        background_connector,
+        ring,
+    )
+
+    background_processor.start()
+
+    headers = []
+
+    for _ in range(3):
+        connector.send((None, None, 1000))
+        headers.append(connector.recv().data)
+
+    first_header, second_header, third_header = headers
+
+    assert isinstance(first_header, Header)
+    assert isinstance(second_header, Header)
+
+    # No free buffer any more, so the result is sent through the pipe
+    assert not isinstance(third_header, Header)
+    assert to_lists(ring.read(first_header)) == to_lists(third_header)
+
+    connector.send(Release(first_header.index))
+    connector.send((None, None, 1000))
+    fourth_header = connector.recv().data
+
+    assert isinstance(fourth_header, Header)
+    assert fourth_header.index == first_header.index
+    assert to_lists(ring.read(fourth_header)) == to_lists(third_header)
+
+    connector.send(None)
+    background_processor.join()
+    ring.unlink()
+
+
+def test_background_processor_progressive(big_dir: Path):
+    connector, background_connector = Pipe()
+
+    background_processor = BackgroundProcessor(
+        big_dir, ("x", float), ["y"], background_connector
+    )
+
+    background_processor.start()
+    connector.send((10, 60, 100))
+
+    coarse_result = connector.recv()
+    assert (coarse_result.generation, coarse_result.exact) == (1, False)
+
+    exact_result = connector.recv()
+    assert (exact_result.generation, exact_result.exact) == (1, True)
+
+    coarse_xs, _ = coarse_result.data
+    exact_xs, _ = exact_result.data
+    assert len(coarse_xs) < len(exact_xs)
+
+    connector.send(None)
+    assert connector.recv() is None
+    background_processor.join()
+
+
+def test_background_processor_latency_budget(big_dir: Path):
+    connector, background_connector = Pipe()
+
+    background_processor = BackgroundProcessor(
+        big_dir, ("x", float), ["y"], background_connector, latency_budget=0
+    )
+
+    background_processor.start()
+    connector.send((10, 60, 100))
+
+    coarse_result = connector.recv()
+    assert (coarse_result.generation, coarse_result.exact) == (1, False)
+
+    # The exact result is abandoned
+    connector.send(None)
+    assert connector.recv() is None
+    background_processor.join()
+
+
+def test_background_processor_partial(big_dir: Path):
+    level_paths = [path for path in big_dir.iterdir() if path.name.isdigit()]
+
+    # As if the file was still being processed
+    for level_path in level_paths:
+        (level_path / READY_FILE_NAME).unlink()
+
+    connector, background_connector = Pipe()
+
+    background_processor = BackgroundProcessor(
+        big_dir, ("x", float), ["y"], background_connector
+    )
+
+    background_processor.start()
+    connector.send((10, 60, 100))
+
+    # Only the overview is ready
+    overview_result = connector.recv()
+    assert (overview_result.generation, overview_result.exact) == (1, True)
+
+    for level_path in level_paths:
+        (level_path / READY_FILE_NAME).touch()
+
+    # The same request is served again, once all levels are ready
+    coarse_result = connector.recv()
+    assert (coarse_result.generation, coarse_result.exact) == (2, False)
+
+    exact_result = connector.recv()
+    assert (exact_result.generation, exact_result.exact) == (2, True)
+
+    overview_xs, _ = overview_result.data
+    exact_xs, _ = exact_result.data
+    assert len(overview_xs) > 0
+    assert len(exact_xs) > 0
+
+    connector.send(None)
+    assert connector.recv() is None
+    background_processor.join()
+
+
+def test_background_processor_follow(tmp_path: Path):
+    csv_path = tmp_path / "growing.csv"
+    dir_path = tmp_path / "followed"
+
+    def write(mode: str, indexes: range):
+        with csv_path.open(mode) as file_descriptor:
+            if mode == "w":
+                file_descriptor.write("x,y\n")
+
+            for index in indexes:
+                file_descriptor.write(f"{index},{index % 13}\n")
+
+    write("w", range(100))
+    follow(csv_path, dir_path, "x", 2, is_stopped=lambda: True)
+
+    connector, background_connector = Pipe()
+
+    background_processor = BackgroundProcessor(
+        dir_path, ("x", float), ["y"], background_connector, follow=True
+    )
+
+    background_processor.start()
+    connector.send((0, 200, 1000))
+
+    result = connector.recv()
+    assert (result.generation, result.exact) == (1, True)
+    xs, _ = result.data
+    assert xs.tolist() == list(range(100))
+
+    write("a", range(100, 150))
+    assert extend(csv_path, dir_path, "x")
+
+    # The same request is served again, with appended lines
+    result = connector.recv()
+
+    while not result.exact:
+        result = connector.recv()
+
+    assert result.generation == 2
+    xs, _ = result.data
+    assert xs.tolist() == list(range(150))
+
+    connector.send(None)
+
+    while connector.recv() is not None:
+        pass
+
+    background_processor.join()
@@ -0,0 +1,54 @@
+import os
+import time
+from multiprocessing import Pool, Process
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from ..entrypoint import app, run_until_terminated  # noqa: E402
+
+
+def touch_later(path: Path) -> None:
+    path.with_suffix(".started").touch()
+    time.sleep(1)
+    path.touch()
+
+
+def touch_later_in_pool(paths: list) -> None:
+    with Pool(len(paths)) as pool:
+        pool.map(touch_later, paths)
+
+
+def test_help():
+    # The help of the default `main` command
+    result = CliRunner().invoke(app, ["--help"])
+
+    assert result.exit_code == 0
+    assert "Usage: " in result.output and " main [OPTIONS] CSV_PATH" in result.output
+    assert "--follow" in result.output
+    assert "cache --help" in result.output
+
+    result = CliRunner().invoke(app, ["cache", "--help"])
+
+    assert result.exit_code == 0
+    assert "prune" in result.output
+
+
+def test_run_until_terminated(tmp_path: Path):
+    paths = [tmp_path / "0", tmp_path / "1"]
+
+    process = Process(target=run_until_terminated, args=(touch_later_in_pool, paths))
+
+    process.start()
+
+    while not all(path.with_suffix(".started").exists() for path in paths):
+        time.sleep(0.01)
+
+    process.terminate()
+    process.join()
+
+    # Workers have been terminated with the process
+    time.sleep(1.5)
+    assert not any(path.exists() for path in paths)
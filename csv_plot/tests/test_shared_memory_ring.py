@@ -0,0 +1,63 @@
+import numpy as np
+from pytest import fixture
+
+from ..csv.selector import Selection
+from ..shared_memory_ring import SharedMemoryRing
+
+
+@fixture
+def ring():
+    ring = SharedMemoryRing(2, 1024)
+    yield ring
+    ring.unlink()
+
+
+def test_write_read(ring: SharedMemoryRing):
+    xs = np.array([1.0, 2.0, 3.0])
+
+    name_to_y = {
+        "a": Selection.Y(
+            mins=np.array([4.0, 5.0, 6.0]), maxs=np.array([7.0, 8.0, 9.0])
+        ),
+        "b": Selection.Y(
+            mins=np.array([0.0, 1.0, 0.0]), maxs=np.array([1.0, 1.0, 1.0])
+        ),
+    }
+
+    header = ring.write(xs, name_to_y)
+    assert header is not None
+    assert header.length == 3
+    assert header.names == ["a", "b"]
+
+    read_xs, read_name_to_y = ring.read(header)
+    assert read_xs.tolist() == [1.0, 2.0, 3.0]
+
+    assert {name: y.to_selected() for name, y in read_name_to_y.items()} == {
+        name: y.to_selected() for name, y in name_to_y.items()
+    }
+
+
+def test_release(ring: SharedMemoryRing):
+    xs = np.array([1.0])
+    name_to_y = {"a": Selection.Y(mins=xs, maxs=xs)}
+
+    first_header = ring.write(xs, name_to_y)
+    second_header = ring.write(xs, name_to_y)
+
+    assert first_header is not None and second_header is not None
+    assert first_header.index != second_header.index
+    assert first_header.generation < second_header.generation
+
+    # No free buffer any more
+    assert ring.write(xs, name_to_y) is None
+
+    ring.release(first_header.index)
+    third_header = ring.write(xs, name_to_y)
+
+    assert third_header is not None
+    assert third_header.index == first_header.index
+
+
+def test_too_big(ring: SharedMemoryRing):
+    xs = np.zeros(100)
+    assert ring.write(xs, {"a": Selection.Y(mins=xs, maxs=xs)}) is None